@@ -0,0 +1,211 @@
+import re
+
+from etl.dimensions import MISSING_TEXT, NO_CATEGORY, NO_CONTINENT, NO_MEDAL
+
+# Athlete-event rows of the RENDIMIENTO_ATLETICO fact with the attributes of
+# its dimensions, under the column names of the cleaned dataset, and one
+# additive measure per row:
+# - Rows: 1 per athlete-event entry
+# - Athletes: 1 on the athlete's first appearance (fact ids follow the order
+#   of the source rows), so they add up to the distinct athletes
+# - Medal Events: 1 on the first medal entry of a team event, so team medals
+#   are counted once
+MEDALLAS_SQL = f"""
+CREATE OR REPLACE VIEW MEDALLAS AS
+WITH fact AS (
+    SELECT
+        r.IDHECHORENDIMIENTO,
+        r.IDATLETA,
+        r.IDMODALIDAD,
+        r.EQUIPO,
+        NULLIF(e.NOCENTIDAD, '{MISSING_TEXT}') AS "NOC",
+        NULLIF(e.ALPHA3ENTIDAD, '{MISSING_TEXT}') AS "Region (ISO)",
+        NULLIF(c.CONTINENTE, '{NO_CONTINENT}') AS "Continent",
+        NULLIF(ev.CODIGOPAISEVENTO, '{MISSING_TEXT}') AS "Host Country (ISO)",
+        r.IDANIO AS "Year",
+        ev.TEMPORADAEVENTO AS "Season",
+        d.NOMBREDEPORTE AS "Sport",
+        CONCAT_WS(
+            ' ', d.NOMBREDEPORTE, NULLIF(m.CATEGORIA, '{NO_CATEGORY}'), m.NOMBREMODALIDAD
+        ) AS "Event",
+        a.SEXOATLETA AS "Sex",
+        a.NOMBREATLETA AS "Name",
+        r.EDAD AS "Age",
+        NULLIF(r.TIPOPODIO, '{NO_MEDAL}') AS "Medal"
+    FROM RENDIMIENTO_ATLETICO r
+    JOIN ENTIDAD e USING (IDENTIDAD)
+    JOIN CONTINENTE c USING (IDCONTINENTE)
+    JOIN EVENTO_DEPORTIVO ev USING (IDEVENTODEPORTIVO)
+    JOIN MODALIDAD m USING (IDMODALIDAD)
+    JOIN DEPORTE d USING (IDDEPORTE)
+    JOIN ATLETA a USING (IDATLETA)
+)
+SELECT
+    * EXCLUDE (IDATLETA, IDMODALIDAD, EQUIPO),
+    1 AS "Rows",
+    (ROW_NUMBER() OVER (
+        PARTITION BY IDATLETA ORDER BY IDHECHORENDIMIENTO
+    ) = 1)::INTEGER AS "Athletes",
+    ("Medal" IS NOT NULL AND ROW_NUMBER() OVER (
+        PARTITION BY "Medal" IS NULL, EQUIPO, IDMODALIDAD, "Year", "Season"
+        ORDER BY IDHECHORENDIMIENTO
+    ) = 1)::INTEGER AS "Medal Events"
+FROM fact
+"""
+
+MEASURES = ["Rows", "Athletes", "Medal Events"]
+
+# Columns of MEDALLAS a query can group or filter by
+COLUMNS = [
+    "IDHECHORENDIMIENTO",
+    "NOC",
+    "Region (ISO)",
+    "Continent",
+    "Host Country (ISO)",
+    "Year",
+    "Season",
+    "Sport",
+    "Event",
+    "Sex",
+    "Name",
+    "Age",
+    "Medal",
+]
+
+# Materialized roll-ups of MEDALLAS -> the columns they keep. AGG_CUBO is the
+# cube of the Olympics charts
+AGGREGATES = {
+    "AGG_CUBO": [
+        "NOC",
+        "Region (ISO)",
+        "Host Country (ISO)",
+        "Year",
+        "Season",
+        "Sport",
+        "Event",
+        "Sex",
+        "Medal",
+    ],
+    "AGG_ENTIDAD_ANIO": ["NOC", "Region (ISO)", "Continent", "Year", "Season", "Medal"],
+    "AGG_DEPORTE_SEXO": ["Sport", "Sex", "Season", "Medal"],
+    "AGG_CONTINENTE_TEMPORADA": ["Continent", "Season", "Medal"],
+    "AGG_EDAD": ["Age", "Sex", "Medal"],
+}
+
+# A roll-up gives the same result as the fact rows only for sums of the
+# measures and for the minimum or maximum of a column it keeps. Any other
+# function call (counts, averages, sums of other expressions, window functions)
+# needs the rows
+ADDITIVE = re.compile(
+    r'\bSUM\s*\(\s*(?P<measure>"[^"]+"|\w+)\s*\)'
+    r'|\b(MIN|MAX)\s*\(\s*(?P<column>"[^"]+"|\w+)\s*\)',
+    re.IGNORECASE,
+)
+CALL = re.compile(r"\b(\w+)\s*\(")
+STRING = re.compile(r"'(?:[^']|'')*'")
+QUOTED = re.compile(r'"[^"]*"')
+
+# Scalar functions, which give the same value over the groups of a roll-up,
+# and keywords that may be followed by a parenthesis
+SCALAR = {"COALESCE", "NULLIF", "ROUND", "ABS", "LOWER", "UPPER", "CONCAT", "CAST"}
+KEYWORDS = {"AND", "OR", "NOT", "IN", "WHERE", "HAVING", "ON", "FILTER"}
+
+# Only these query shapes fold the fact rows into groups
+GROUPED = re.compile(r"\bGROUP\s+BY\b|\bDISTINCT\b", re.IGNORECASE)
+
+ALIAS = re.compile(r'\bAS\s+("[^"]*"|\w+)', re.IGNORECASE)
+TABLE = re.compile(r"\bMEDALLAS\b", re.IGNORECASE)
+
+
+def quote(column):
+    return f'"{column}"'
+
+
+def aggregate_sql(table, columns):
+    keys = ", ".join(map(quote, columns))
+    sums = ", ".join(
+        f"SUM({quote(measure)})::BIGINT AS {quote(measure)}" for measure in MEASURES
+    )
+    return f"""
+CREATE OR REPLACE TABLE {table} AS
+SELECT {keys}, {sums}
+FROM MEDALLAS
+GROUP BY {keys}
+"""
+
+
+def refresh_aggregates(con):
+    # Rebuilds every roll-up from the fact and records its size, which the
+    # router uses to pick the smallest one. Returns the rows written
+    con.execute(MEDALLAS_SQL)
+    sizes = {}
+    for table, columns in AGGREGATES.items():
+        con.execute(aggregate_sql(table, columns))
+        sizes[table] = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    con.execute("DELETE FROM AGREGADOS")
+    con.executemany("INSERT INTO AGREGADOS VALUES (?, ?)", list(sizes.items()))
+    return sum(sizes.values())
+
+
+def aggregate_sizes(con):
+    return dict(con.execute("SELECT TABLA, FILAS FROM AGREGADOS").fetchall())
+
+
+def strip_additive(sql):
+    # Removes the sums of the measures, so they are not taken for uses of the
+    # measures, and leaves the column of each minimum or maximum, which the
+    # roll-up must keep. Returns None when any other function is called
+    def additive(match):
+        if match.group("measure"):
+            return "" if match.group("measure").strip('"') in MEASURES else match[0]
+        column = match.group("column").strip('"')
+        return quote(column) if column in COLUMNS else match[0]
+
+    stripped = ADDITIVE.sub(additive, sql)
+
+    # Quoted names such as "Region (ISO)" may hold parentheses too
+    for name in CALL.findall(QUOTED.sub('""', stripped)):
+        if name.upper() not in SCALAR | KEYWORDS:
+            return None
+    return stripped
+
+
+def referenced_columns(sql):
+    # Columns of MEDALLAS the query mentions, quoted or not
+    return {
+        column
+        for column in COLUMNS + MEASURES
+        if re.search(rf'(?<!\w)"?{re.escape(column)}"?(?!\w)', sql, re.IGNORECASE)
+    }
+
+
+def route(sql, sizes):
+    # Rewrites a query over MEDALLAS to the smallest roll-up that keeps every
+    # column it uses. Any other query is returned unchanged
+    if not TABLE.search(sql) or "*" in sql:
+        return sql
+
+    # String literals may hold parentheses or column names
+    text = ALIAS.sub("", STRING.sub("''", sql))
+    stripped = strip_additive(text)
+    if stripped is None:
+        return sql
+
+    # Without aggregates or groups the query reads single fact rows
+    if stripped == text and not GROUPED.search(text):
+        return sql
+
+    columns = referenced_columns(stripped)
+    if columns & set(MEASURES):
+        # A measure used outside of a sum
+        return sql
+
+    candidates = [
+        table
+        for table, kept in AGGREGATES.items()
+        if table in sizes and columns <= set(kept)
+    ]
+    if not candidates:
+        return sql
+    return TABLE.sub(min(candidates, key=sizes.get), sql)
@@ -4,53 +4,194 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from charts.explore import (
+    SCATTER_METHODS,
+    box_figure,
+    histogram_figure,
+    scatter_figure,
+)
 from charts.hdi import get_hdi_charts
 from charts.income import get_income_charts
 from charts.olympics import get_olympics_charts
 from charts.population import get_population_charts
 from charts.schooling import get_schooling_charts
-from statistics_calc import descriptors, qualitative_stats
+from data_store import (
+    dataset_version,
+    get_load_stats,
+    get_memory_report,
+    load_dataset,
+)
+from descriptor_store import load_descriptors
+from figure_cache import clear as clear_figures
+from olympics_cube import load_cube
+from value_index import load_value_index
 
 warnings.filterwarnings("ignore")
 
+# Define the datasets and their corresponding titles and qualitative variables
+CHOSEN_DATASETS = {
+    "🏅 Olympics (Cleaned)": "olympics-cleaned.csv",
+    "🏅 Olympics": "olympics.csv",
+    "🎓 Schooling (Cleaned)": "expected-years-of-schooling-cleaned.csv",
+    "🎓 Schooling": "expected-years-of-schooling.csv",
+    "💰 Income (Cleaned)": "gross-national-income-per-capita-cleaned.csv",
+    "💰 Income": "gross-national-income-per-capita.csv",
+    "🌍 Human Development Index (HDI) (Cleaned)": "human-development-index-cleaned.csv",
+    "🌍 Human Development Index (HDI)": "human-development-index.csv",
+    "👦🏻 Population (Cleaned)": "population_total_long-cleaned.csv",
+    "👦🏻 Population": "population_total_long.csv",
+    "📍 ISO-NOC Merged": "iso_noc-merged.csv",
+    "🗺️ Country Data Merged": "country-data-merged.csv",
+}
+
+OTHER_DATASETS = {
+    "🔄 HDI Comparison": "human-development-index-comparison.csv",
+    "💹 HDI vs. GDP per capita": "hdi-vs-gdp-per-capita.csv",
+    "🌐 HDI Without GDP vs GDP per capita": "hdi-without-gdp-vs-gdp-per-capita.csv",
+    "📈 HDI - Escosura": "human-development-index-escosura.csv",
+    "📚 Mean Years of Schooling Long Run": "mean-years-of-schooling-long-run.csv",
+}
+
+# Number of unique values shown per page
+UNIQUE_VALUES_PAGE_SIZE = 100
+
 
 def load_and_display_data(title, filename):
     st.markdown(f"## :red[{title}]")
-    data = pd.read_csv(f"datasets/{filename}")
+    data = load_dataset(filename)
     st.dataframe(data, hide_index=True, use_container_width=True)
     st.caption(
         f"Total de filas: **{data.shape[0]}** | Total de columnas: **{data.shape[1]}**"
     )
 
+    load_stats = get_load_stats(filename)
+    st.caption(
+        f"Cargado desde **{load_stats['source']}** en **{load_stats['seconds'] * 1000:.1f} ms** \
+        | Bytes leídos: **{load_stats['bytes_read']:,}**"
+    )
+
+    # Memory used with the compact types of the schema vs. the default types
+    memory_report = get_memory_report(filename)
+    memory_before = memory_report["Antes (bytes)"].sum()
+    memory_after = memory_report["Después (bytes)"].sum()
+    memory_label = (
+        f"Memoria: **{memory_after / 2**20:.2f} MiB** "
+        f"(sin esquema: {memory_before / 2**20:.2f} MiB, "
+        f"{1 - memory_after / memory_before:.0%} menos)"
+    )
+    with st.expander(memory_label):
+        st.dataframe(memory_report, hide_index=True, use_container_width=True)
+
     col1, col2 = st.columns(2)
 
+    # Precomputed profile tables, rebuilt only when the source file changes
+    profile = load_descriptors(filename)
+
     st.markdown("### Variables cualitativas")
-    qualitative_vars = data.select_dtypes(include=["object"]).columns.tolist()
-    qualitative = qualitative_stats(data, qualitative_vars)
-    st.dataframe(qualitative, hide_index=True, use_container_width=True)
+    st.dataframe(profile["qualitative"], hide_index=True, use_container_width=True)
+
+    # Each section below is a fragment: its widgets rerun only the section,
+    # not the charts of the other sections. A fragment gets the filename and
+    # reloads the dataset and its descriptors from the in-memory store, so a
+    # rerun never works on the frame of an older full run
+    describe_section(filename)
+    unique_values_section(filename)
+    plot_section(filename)
+
+    if title == "🏅 Olympics (Cleaned)":
+        st.caption(
+            "📢 **Nota:** Puede haber más Comités Olímpicos Nacionales (NOCs) que países porque algunos territorios autónomos \
+            tienen sus propios NOCs. Por ejemplo, Puerto Rico, Guam o Hong Kong."
+        )
+
+        st.markdown("### Posible discrepancia de datos")
+        st.markdown("""
+        Los datos del dataset son proporcionados por [Olympedia](https://www.olympedia.org/), una base de datos especializada en \
+        la historia de los Juegos Olímpicos. A continuación, se presenta una explicación sobre la posible discrepancia de datos \
+        con otras fuentes:
+        
+        Olympedia.org tiene una larga trayectoria como la base de datos más completa y confiable sobre la historia de los Juegos Olímpicos. \
+        Fundada en la década de 1990 por un grupo de apasionados historiadores deportivos y estrechamente asociada con la Sociedad \
+        Internacional de Historiadores Olímpicos (ISOH), Olympedia ha pasado décadas recopilando, verificando y actualizando \
+        meticulosamente cada detalle relacionado con los atletas, eventos y medallas olímpicos desde la era moderna de los \
+        Juegos que comenzó en 1896. A diferencia de fuentes más generalistas como Wikipedia, que dependen de contribuciones abiertas, \
+        el equipo de Olympedia, que trabaja en colaboración con la ISOH, se dedica exclusivamente a mantener la base de datos \
+        olímpica más precisa y actualizada posible. Por lo tanto, es normal que puedan existir algunas discrepancias menores entre \
+        los datos de Olympedia y los de otros sitios web, ya que Olympedia realiza un mayor nivel de investigación y validación para \
+        asegurar la integridad de sus registros, incluyendo la incorporación de correcciones y cambios retroactivos realizados por \
+        el Comité Olímpico Internacional a lo largo de los años.
+        """)
+
+        olympics_section()
+    elif title == "🎓 Schooling (Cleaned)":
+        get_schooling_charts(data, dataset_version(data))
+    elif title == "💰 Income (Cleaned)":
+        get_income_charts(data, dataset_version(data))
+    elif title == "🌍 Human Development Index (HDI) (Cleaned)":
+        get_hdi_charts(data, dataset_version(data))
+    elif title == "👦🏻 Population (Cleaned)":
+        get_population_charts(data, dataset_version(data))
+
+
+@st.experimental_fragment
+def describe_section(filename):
+    data = load_dataset(filename)
+    profile = load_descriptors(filename)
 
     st.markdown("### Variables cuantitativas")
-    data_descriptors = descriptors(data)
+    numeric_vars = data.select_dtypes(include="number").columns.tolist()
+    selected_numeric_vars = st.multiselect(
+        "Selecciona las variables a describir", numeric_vars, default=numeric_vars
+    )
+    data_descriptors = profile["quantitative"].reindex(columns=selected_numeric_vars)
     st.dataframe(data_descriptors, hide_index=False, use_container_width=True)
 
+
+@st.experimental_fragment
+def unique_values_section(filename):
+    data = load_dataset(filename)
+
     st.markdown("## :green[Valores únicos]")
     # Add a selectbox for the user to select a column
     selected_column = st.selectbox(
         "Selecciona una columna para ver sus valores únicos", data.columns
     )
 
-    # Display all unique values of the selected column
-    st.write(f"Valores únicos para {selected_column}:")
+    # Sorted distinct values and frequencies, indexed once per dataset version
+    value_index = load_value_index(filename, selected_column)
+
+    ucol1, ucol2 = st.columns([3, 1])
+    with ucol1:
+        prefix = st.text_input(
+            "Buscar valores que comiencen con", key=f"prefix-{selected_column}"
+        )
+    total_matches = value_index.count(prefix)
+    total_pages = max(1, -(-total_matches // UNIQUE_VALUES_PAGE_SIZE))
+    with ucol2:
+        page_number = st.number_input(
+            f"Página (de {total_pages})",
+            min_value=1,
+            max_value=total_pages,
+            value=1,
+            key=f"page-{selected_column}-{prefix}",
+        )
 
-    # Get all unique values of the selected column
-    unique_values = data[selected_column].unique()
+    # Display one page of the unique values of the selected column
+    st.write(f"Valores únicos para {selected_column}:")
+    unique_values_df, _ = value_index.page(
+        page_number - 1, UNIQUE_VALUES_PAGE_SIZE, prefix
+    )
+    unique_values_df = unique_values_df.rename(columns={"Valor": selected_column})
+    st.dataframe(unique_values_df, hide_index=True, use_container_width=True)
+    st.write(f"Total de valores únicos: **{len(value_index)}**")
+    if prefix:
+        st.caption(f"Coincidencias con '{prefix}': **{total_matches}**")
 
-    # Convert the unique values to a DataFrame
-    unique_values_df = pd.DataFrame(unique_values, columns=[selected_column])
 
-    # Display the DataFrame
-    st.dataframe(unique_values_df, use_container_width=True)
-    st.write(f"Total de valores únicos: **{len(unique_values)}**")
+@st.experimental_fragment
+def plot_section(filename):
+    data = load_dataset(filename)
+    profile = load_descriptors(filename)
 
     st.markdown("## :violet[Graficar]")
     # Add a selectbox for the user to select a plot type
@@ -65,101 +206,73 @@ def load_and_display_data(title, filename):
 
     # Plot the selected plot type
     if selected_plot == "Histograma":
-        fig = px.histogram(
-            data,
-            x=selected_var,
-            nbins=50,
-            labels={"x": selected_var, "y": "Frecuencia"},
-            text_auto=True,
-        )
-        fig.update_xaxes(title_text=selected_var)
-        fig.update_yaxes(title_text="Frecuencia")
+        # Bins are computed on the server, only the 50 bars reach the browser
+        fig = histogram_figure(data, dataset_version(data), selected_var, nbins=50)
     elif selected_plot == "Box Plot":
-        fig = px.box(data, x=selected_var)
-        fig.update_xaxes(title_text=selected_var)
-        fig.update_yaxes(title_text="Value")
+        if pd.api.types.is_numeric_dtype(data[selected_var]):
+            # Box statistics are computed on the server from the descriptors
+            fig = box_figure(
+                data, dataset_version(data), selected_var, profile["quantitative"]
+            )
+        else:
+            fig = px.box(data, x=selected_var)
+            fig.update_xaxes(title_text=selected_var)
+            fig.update_yaxes(title_text="Value")
     elif selected_plot == "Scatter Plot":
         selected_var2 = st.selectbox(
             "Selecciona una segunda variable para el gráfico de dispersión",
             quantitative_vars,
         )
-        fig = px.scatter(data, x=selected_var, y=selected_var2)
-        fig.update_xaxes(title_text=selected_var)
-        fig.update_yaxes(title_text=selected_var2)
+        scatter_method = st.radio(
+            "Modo de visualización",
+            list(SCATTER_METHODS),
+            horizontal=True,
+            help="Con muchas filas se muestra una muestra estratificada o un mapa de densidad.",
+        )
+        fig, scatter_note = scatter_figure(
+            data,
+            dataset_version(data),
+            selected_var,
+            selected_var2,
+            method=SCATTER_METHODS[scatter_method],
+        )
 
     fig.update_layout(title_text=f"{selected_plot} de {selected_var}", title_x=0.5)
     st.plotly_chart(fig, use_container_width=True)
+    if selected_plot == "Scatter Plot" and scatter_note:
+        st.caption(f"📉 {scatter_note}")
 
-    if title == "🏅 Olympics (Cleaned)":
-        st.caption(
-            "📢 **Nota:** Puede haber más Comités Olímpicos Nacionales (NOCs) que países porque algunos territorios autónomos \
-            tienen sus propios NOCs. Por ejemplo, Puerto Rico, Guam o Hong Kong."
-        )
 
-        st.markdown("### Posible discrepancia de datos")
-        st.markdown("""
-        Los datos del dataset son proporcionados por [Olympedia](https://www.olympedia.org/), una base de datos especializada en \
-        la historia de los Juegos Olímpicos. A continuación, se presenta una explicación sobre la posible discrepancia de datos \
-        con otras fuentes:
-        
-        Olympedia.org tiene una larga trayectoria como la base de datos más completa y confiable sobre la historia de los Juegos Olímpicos. \
-        Fundada en la década de 1990 por un grupo de apasionados historiadores deportivos y estrechamente asociada con la Sociedad \
-        Internacional de Historiadores Olímpicos (ISOH), Olympedia ha pasado décadas recopilando, verificando y actualizando \
-        meticulosamente cada detalle relacionado con los atletas, eventos y medallas olímpicos desde la era moderna de los \
-        Juegos que comenzó en 1896. A diferencia de fuentes más generalistas como Wikipedia, que dependen de contribuciones abiertas, \
-        el equipo de Olympedia, que trabaja en colaboración con la ISOH, se dedica exclusivamente a mantener la base de datos \
-        olímpica más precisa y actualizada posible. Por lo tanto, es normal que puedan existir algunas discrepancias menores entre \
-        los datos de Olympedia y los de otros sitios web, ya que Olympedia realiza un mayor nivel de investigación y validación para \
-        asegurar la integridad de sus registros, incluyendo la incorporación de correcciones y cambios retroactivos realizados por \
-        el Comité Olímpico Internacional a lo largo de los años.
-        """)
+@st.experimental_fragment
+def olympics_section():
+    # The toggle only redraws the Olympics charts. Their figures are cached by
+    # the version of the datamart and drawn here on every run
+    webgl = st.toggle(
+        "Renderizar gráficos de líneas con WebGL",
+        help="Recomendado al comparar muchos países o bloques a la vez.",
+    )
+    tables = load_cube()
+    get_olympics_charts(tables, dataset_version(tables["cube"]), webgl)
 
-        get_olympics_charts(data)
-    elif title == "🎓 Schooling (Cleaned)":
-        get_schooling_charts(data)
-    elif title == "💰 Income (Cleaned)":
-        get_income_charts(data)
-    elif title == "🌍 Human Development Index (HDI) (Cleaned)":
-        get_hdi_charts(data)
-    elif title == "👦🏻 Population (Cleaned)":
-        get_population_charts(data)
+
+def clear_caches():
+    st.cache_data.clear()
+    clear_figures()
 
 
 def main():
     st.set_page_config(page_title="Datamart data", page_icon="📊", layout="wide")
 
     with st.sidebar:
-        # Define the datasets and their corresponding titles and qualitative variables
-        chosen_datasets = {
-            "🏅 Olympics (Cleaned)": "olympics-cleaned.csv",
-            "🏅 Olympics": "olympics.csv",
-            "🎓 Schooling (Cleaned)": "expected-years-of-schooling-cleaned.csv",
-            "🎓 Schooling": "expected-years-of-schooling.csv",
-            "💰 Income (Cleaned)": "gross-national-income-per-capita-cleaned.csv",
-            "💰 Income": "gross-national-income-per-capita.csv",
-            "🌍 Human Development Index (HDI) (Cleaned)": "human-development-index-cleaned.csv",
-            "🌍 Human Development Index (HDI)": "human-development-index.csv",
-            "👦🏻 Population (Cleaned)": "population_total_long-cleaned.csv",
-            "👦🏻 Population": "population_total_long.csv",
-            "📍 ISO-NOC Merged": "iso_noc-merged.csv",
-            "🗺️ Country Data Merged": "country-data-merged.csv",
-        }
-
-        other_datasets = {
-            "🔄 HDI Comparison": "human-development-index-comparison.csv",
-            "💹 HDI vs. GDP per capita": "hdi-vs-gdp-per-capita.csv",
-            "🌐 HDI Without GDP vs GDP per capita": "hdi-without-gdp-vs-gdp-per-capita.csv",
-            "📈 HDI - Escosura": "human-development-index-escosura.csv",
-            "📚 Mean Years of Schooling Long Run": "mean-years-of-schooling-long-run.csv",
-        }
-
         st.markdown("# 📊 Datamart data")
 
         st.warning(
             "⚠️ **IMPORTANTE:** Considerar que se usa un punto para valores decimales y una coma para separar miles."
         )
 
-        st.info("📢 **Nota:** La carga de un `scatter plot` puede tomar tiempo.")
+        st.info(
+            "📢 **Nota:** Los `scatter plot` de datasets grandes se muestran muestreados o como mapa de densidad."
+        )
 
         only_chosen_datasets = st.toggle(
             "Mostrar solo los datasets seleccionados",
@@ -169,9 +282,9 @@ def main():
 
         # Add a selectbox for the user to select a dataset
         datasets = (
-            chosen_datasets
+            CHOSEN_DATASETS
             if only_chosen_datasets
-            else {**chosen_datasets, **other_datasets}
+            else {**CHOSEN_DATASETS, **OTHER_DATASETS}
         )
         selected_dataset = st.selectbox("Elige un dataset", list(datasets.keys()))
 
@@ -179,7 +292,7 @@ def main():
 
         st.button(
             "Limpiar cache",
-            on_click=st.cache_data.clear(),
+            on_click=clear_caches,
             type="primary",
             use_container_width=True,
         )
@@ -0,0 +1,103 @@
+# Payload size and build time of the medals/athletes-by-age chart, comparing the
+# previous one-annotation-per-marker figure with the text-mode traces.
+#
+#   python -m benchmarks.age_chart
+#
+# Browser render time grows with the figure payload (plotly.js lays out every
+# annotation separately), so the JSON size is reported as its proxy.
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from charts.olympics import age_distribution_figure
+from data_store import DATASETS_DIR
+
+REPEAT = 20
+
+
+def annotated_age_figure(ages):
+    # Figure as built before, with one layout annotation per marker
+    medal_distribution = ages[ages["Medals"] > 0].reset_index(drop=True)
+    athlete_distribution = ages.reset_index(drop=True)
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=medal_distribution["Age"],
+            y=medal_distribution["Medals"],
+            mode="markers",
+            name="Medals",
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=athlete_distribution["Age"],
+            y=athlete_distribution["Athletes"],
+            mode="markers",
+            name="Atletas",
+        )
+    )
+    for distribution, column in (
+        (medal_distribution, "Medals"),
+        (athlete_distribution, "Athletes"),
+    ):
+        for i in range(len(distribution)):
+            age = distribution.loc[i, "Age"]
+            if age != "Unknown":
+                age = str(int(float(age)))
+            fig.add_annotation(
+                x=distribution.loc[i, "Age"],
+                y=distribution.loc[i, column],
+                text=age,
+                showarrow=False,
+                font=dict(size=11),
+                yshift=10,
+            )
+    fig.update_layout(
+        title="Distribución de Medals y atletas por edad",
+        xaxis_title="Edad",
+        yaxis_title="Número",
+        legend_title="Distribución",
+    )
+    return fig
+
+
+def load_ages():
+    if os.path.exists(os.path.join(DATASETS_DIR, "olympics-cleaned.csv")):
+        from olympics_cube import load_cube
+
+        return load_cube()["ages"]
+
+    # Synthetic ages with the same shape as the Olympics table (10 to 97 years)
+    rng = np.random.default_rng(0)
+    ages = np.arange(10, 98, dtype="float64")
+    athletes = rng.integers(1, 10_000, len(ages))
+    return pd.DataFrame({"Age": ages, "Medals": athletes // 7, "Athletes": athletes})
+
+
+def measure(build, ages):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        payload = build(ages).to_json()
+    elapsed = (time.perf_counter() - start) / REPEAT
+    return len(payload.encode()), elapsed
+
+
+def main():
+    ages = load_ages()
+    print(f"Edades: {len(ages)}")
+    for label, build in (
+        ("Anotaciones", annotated_age_figure),
+        ("Texto en trazas", age_distribution_figure),
+    ):
+        size, elapsed = measure(build, ages)
+        print(
+            f"{label:<16} payload: {size:>8,} bytes | figura + JSON: {elapsed * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Time of medal queries over the MEDALLAS view of the fact, compared with the
+# same queries routed to the smallest roll-up that answers them.
+#
+#   python -m benchmarks.aggregates
+import re
+import time
+
+from aggregates import route
+from datamart import open_datamart
+
+REPEAT = 20
+
+QUERIES = {
+    "Medallas por entidad y año": """
+        SELECT "NOC", "Year", SUM("Medal Events") AS "Medals"
+        FROM MEDALLAS
+        WHERE "Medal" IS NOT NULL
+        GROUP BY "NOC", "Year"
+    """,
+    "Atletas por deporte y sexo": """
+        SELECT "Sport", "Sex", SUM("Athletes") AS "Athletes"
+        FROM MEDALLAS
+        GROUP BY "Sport", "Sex"
+    """,
+    "Medallas por continente y temporada": """
+        SELECT "Continent", "Season", SUM("Medal Events") AS "Medals"
+        FROM MEDALLAS
+        WHERE "Medal" = 'Gold'
+        GROUP BY "Continent", "Season"
+    """,
+}
+
+
+def measure(con, sql):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        con.execute(sql).fetchall()
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    con, sizes = open_datamart()
+    for label, sql in QUERIES.items():
+        routed = route(sql, sizes)
+        table = re.search(r"FROM\s+(\w+)", routed).group(1)
+        fact = measure(con, sql)
+        rollup = measure(con, routed)
+        print(
+            f"{label:<38} hecho: {fact * 1000:7.2f} ms | {table}: {rollup * 1000:7.2f} ms"
+            f" ({fact / rollup:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
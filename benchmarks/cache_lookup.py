@@ -0,0 +1,70 @@
+# Latency of a cache hit of st.cache_data when the key is the DataFrame
+# itself (hashed on every call) and when it is the version token of the
+# dataset, for each dataset of the app and for the Olympics cube.
+#
+#   python -m benchmarks.cache_lookup
+import logging
+import os
+import time
+
+import streamlit as st
+
+from data_store import DATASETS_DIR, dataset_version, load_dataset
+
+REPEAT = 20
+
+DATASETS = [
+    "olympics-cleaned.csv",
+    "expected-years-of-schooling-cleaned.csv",
+    "gross-national-income-per-capita-cleaned.csv",
+    "human-development-index-cleaned.csv",
+    "population_total_long-cleaned.csv",
+    "country-data-merged.csv",
+]
+
+
+@st.cache_data
+def by_contents(data):
+    return len(data)
+
+
+@st.cache_data
+def by_version(_data, version):
+    return len(_data)
+
+
+def measure(cached, *args):
+    # The first call fills the cache; the rest are hits
+    cached(*args)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        cached(*args)
+    return (time.perf_counter() - start) / REPEAT
+
+
+def report(label, data):
+    contents = measure(by_contents, data)
+    version = measure(by_version, data, dataset_version(data))
+    print(
+        f"{label:<45} {len(data):>9,} filas | contenido: {contents * 1000:8.3f} ms"
+        f" | versión: {version * 1000:6.3f} ms ({contents / version:6.1f}x)"
+    )
+
+
+def main():
+    # Outside of `streamlit run` every cached call warns about the missing
+    # runtime
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    for filename in DATASETS:
+        if os.path.exists(os.path.join(DATASETS_DIR, filename)):
+            report(filename, load_dataset(filename))
+
+    if os.path.exists(os.path.join(DATASETS_DIR, "olympics-cleaned.csv")):
+        from olympics_cube import load_cube
+
+        report("cubo de los Juegos Olímpicos", load_cube()["cube"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Rows per second of each ETL transformation with every load method, using the
+# counters of the Pentaho step log (LINES_READ / LINES_WRITTEN) for comparison.
+# Then the hits and misses of the dimension key cache, and the cost of revising
+# one year of the entity metrics, applied incrementally to the datamart instead
+# of rebuilding it.
+#
+#   python -m benchmarks.etl
+import os
+import tempfile
+
+import duckdb
+import pandas as pd
+
+from datamart import SCHEMA_SQL, build_datamart
+from etl.dimensions import LAST_YEAR
+from etl.jobs import read_sources, run_general, run_metricas
+from etl.keys import KeyCache
+from etl.load import LOAD_METHODS
+
+COLUMNS = [
+    "TRANSNAME",
+    "LINES_READ",
+    "LINES_WRITTEN",
+    "LINES_UPDATED",
+    "LINES_DELETED",
+    "SECONDS",
+    "ROWS_PER_SECOND",
+]
+
+
+def print_log(log):
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(log.to_string(index=False, float_format=lambda value: f"{value:,.3f}"))
+
+
+def one_year_revision(countries):
+    # The indicators of the last year of the metrics revised by 1%
+    indicators = countries.columns[countries.dtypes.map(pd.api.types.is_float_dtype)]
+    revised = countries.copy()
+    rows = revised["Year"] == LAST_YEAR
+    revised.loc[rows, indicators] = revised.loc[rows, indicators] * 1.01
+    return revised
+
+
+def measure_incremental(path, method):
+    sources = read_sources(["countries"])
+    if "countries" not in sources:
+        return None
+
+    sources["countries"] = one_year_revision(sources["countries"])
+    log = []
+    with duckdb.connect(path) as con:
+        run_metricas(con, sources, log, KeyCache(con, method), method)
+    return pd.DataFrame(log)
+
+
+def measure_keys():
+    # Hits and misses of the key cache over a full run, in memory
+    with duckdb.connect() as con:
+        con.execute(SCHEMA_SQL)
+        keys = KeyCache(con)
+        run_general(con, keys=keys)
+    return keys.stats()
+
+
+def main():
+    runs = []
+    revisions = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for method in LOAD_METHODS:
+            path = os.path.join(tmp_dir, method, f"datamart-{method}.duckdb")
+            log = build_datamart(path, method)
+            log.insert(0, "METHOD", method)
+            runs.append(log)
+
+            revision = measure_incremental(path, method)
+            if revision is not None:
+                revision.insert(0, "METHOD", method)
+                revisions.append(revision.assign(TRANSNAME="incremental"))
+
+    log = pd.concat(runs, ignore_index=True)
+    print_log(log[["METHOD", *COLUMNS]])
+
+    print()
+    totals = log.groupby("METHOD", sort=False)[["LINES_WRITTEN", "SECONDS"]].sum()
+    totals["ROWS_PER_SECOND"] = totals["LINES_WRITTEN"] / totals["SECONDS"]
+    print(totals.to_string(float_format=lambda value: f"{value:,.3f}"))
+
+    print()
+    print("Búsquedas en el cache de claves:")
+    print(measure_keys().to_string(index=False))
+
+    if not revisions:
+        return
+
+    print()
+    print(f"Revisión de {LAST_YEAR} en METRICAS_ENTIDADES:")
+    full = log[log["TABLE"] == "METRICAS_ENTIDADES"].assign(TRANSNAME="carga completa")
+    print_log(pd.concat([full, *revisions])[["METHOD", *COLUMNS]])
+
+
+if __name__ == "__main__":
+    main()
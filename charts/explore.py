@@ -0,0 +1,243 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from statistics_calc import descriptors
+
+
+# The data argument is not hashed (leading underscore): the cache is keyed by
+# the dataset version, the column and the number of bins
+@st.cache_data
+def histogram_bins(_data, version, column, nbins=50):
+    values = _data[column].dropna()
+
+    # Categorical columns: one bar per value
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        counts = values.value_counts()
+        return pd.DataFrame(
+            {"Valor": counts.index.astype(str), "Frecuencia": counts.to_numpy()}
+        )
+
+    # Numeric columns: edges and counts computed here, only the bars are sent
+    counts, edges = np.histogram(values.to_numpy(dtype="float64"), bins=nbins)
+    return pd.DataFrame(
+        {
+            "Desde": edges[:-1],
+            "Hasta": edges[1:],
+            "Frecuencia": counts,
+        }
+    )
+
+
+def histogram_figure(data, version, column, nbins=50):
+    bins = histogram_bins(data, version, column, nbins)
+
+    if "Valor" in bins:
+        fig = go.Figure(
+            go.Bar(
+                x=bins["Valor"],
+                y=bins["Frecuencia"],
+                text=bins["Frecuencia"],
+            )
+        )
+    else:
+        fig = go.Figure(
+            go.Bar(
+                x=(bins["Desde"] + bins["Hasta"]) / 2,
+                y=bins["Frecuencia"],
+                width=bins["Hasta"] - bins["Desde"],
+                text=bins["Frecuencia"],
+                customdata=bins[["Desde", "Hasta"]],
+                hovertemplate="[%{customdata[0]:.4g}, %{customdata[1]:.4g}): %{y}<extra></extra>",
+            )
+        )
+
+    fig.update_xaxes(title_text=column)
+    fig.update_yaxes(title_text="Frecuencia")
+    return fig
+
+
+@st.cache_data
+def box_stats(_data, version, column, q1, median, q3, max_outliers=500):
+    values = _data[column].dropna().to_numpy(dtype="float64")
+
+    # Tukey fences: the whiskers end at the most extreme values within 1.5 IQR
+    iqr = q3 - q1
+    lower_limit = q1 - 1.5 * iqr
+    upper_limit = q3 + 1.5 * iqr
+    inside = (values >= lower_limit) & (values <= upper_limit)
+
+    # Outliers are capped to a fixed-size sample so the payload does not grow
+    # with the number of rows
+    outliers = values[~inside]
+    total_outliers = len(outliers)
+    if total_outliers > max_outliers:
+        rng = np.random.default_rng(0)
+        outliers = rng.choice(outliers, max_outliers, replace=False)
+
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": values[inside].min() if inside.any() else q1,
+        "upperfence": values[inside].max() if inside.any() else q3,
+        "outliers": np.sort(outliers),
+        "total_outliers": total_outliers,
+    }
+
+
+def box_figure(data, version, column, quantitative):
+    # Quartiles come from the descriptors table; compute them only if missing
+    if column not in quantitative:
+        quantitative = descriptors(data, [column])
+    quartiles = quantitative[column]
+    stats = box_stats(
+        data,
+        version,
+        column,
+        float(quartiles["25%"]),
+        float(quartiles["50%"]),
+        float(quartiles["75%"]),
+    )
+
+    fig = go.Figure(
+        [
+            go.Box(
+                y=[column],
+                q1=[stats["q1"]],
+                median=[stats["median"]],
+                q3=[stats["q3"]],
+                lowerfence=[stats["lowerfence"]],
+                upperfence=[stats["upperfence"]],
+                orientation="h",
+                name=column,
+                showlegend=False,
+            ),
+            go.Scatter(
+                x=stats["outliers"],
+                y=[column] * len(stats["outliers"]),
+                mode="markers",
+                name="Valores atípicos",
+                showlegend=False,
+            ),
+        ]
+    )
+
+    if len(stats["outliers"]) < stats["total_outliers"]:
+        fig.add_annotation(
+            text=f"Muestra de {len(stats['outliers'])} de {stats['total_outliers']} valores atípicos",
+            xref="paper",
+            yref="paper",
+            x=1,
+            y=0,
+            showarrow=False,
+        )
+
+    fig.update_xaxes(title_text=column)
+    fig.update_yaxes(title_text="Value")
+    return fig
+
+
+SCATTER_METHODS = {
+    "Muestreo estratificado": "stratified",
+    "Densidad (heatmap 2D)": "density",
+    "Todos los puntos": "all",
+}
+
+
+@st.cache_data
+def scatter_points(_data, version, x, y, method="stratified", max_points=20_000):
+    # Positional columns, so x and y may be the same variable
+    points = pd.DataFrame({"x": _data[x], "y": _data[y]}).dropna()
+    total = len(points)
+
+    if method == "all" or total <= max_points:
+        return points, total
+
+    if not _numeric_axes(points, "x", "y"):
+        # Categorical axes have no grid to stratify on: uniform sample
+        return points.sample(max_points, random_state=0), total
+
+    # Stratify on a 50x50 grid: every occupied cell keeps at least one point
+    # and the rest of the budget is spread proportionally, so sparse regions
+    # and outliers survive the sampling
+    x_cells = _grid_cells(points["x"].to_numpy(dtype="float64"), 50)
+    y_cells = _grid_cells(points["y"].to_numpy(dtype="float64"), 50)
+    cells = pd.Series(x_cells * 50 + y_cells, index=points.index)
+
+    shuffled = cells.sample(frac=1, random_state=0)
+    rank = shuffled.groupby(shuffled).cumcount()
+    counts = shuffled.map(shuffled.value_counts())
+    quota = np.maximum(1, np.floor(counts * max_points / total))
+    return points.loc[shuffled.index[rank < quota]], total
+
+
+@st.cache_data
+def density_grid(_data, version, x, y, nbins=100):
+    # Cell centers and counts of the 2-D histogram; empty cells are NaN so
+    # they are left transparent
+    points = pd.DataFrame({"x": _data[x], "y": _data[y]}).dropna()
+    counts, x_edges, y_edges = np.histogram2d(
+        points["x"].to_numpy(dtype="float64"),
+        points["y"].to_numpy(dtype="float64"),
+        bins=nbins,
+    )
+    return {
+        "x": (x_edges[:-1] + x_edges[1:]) / 2,
+        "y": (y_edges[:-1] + y_edges[1:]) / 2,
+        "z": np.where(counts.T > 0, counts.T, np.nan),
+        "total": len(points),
+    }
+
+
+def _numeric_axes(data, x, y):
+    return pd.api.types.is_numeric_dtype(data[x]) and pd.api.types.is_numeric_dtype(
+        data[y]
+    )
+
+
+def _grid_cells(values, nbins):
+    edges = np.linspace(values.min(), values.max(), nbins + 1)
+    return np.clip(np.searchsorted(edges, values, side="right") - 1, 0, nbins - 1)
+
+
+def scatter_figure(
+    data, version, x, y, method="stratified", max_points=20_000, webgl_threshold=5_000
+):
+    # Returns the figure and, when the view is not the full data, a note for the UI
+    note = None
+
+    if method == "density" and _numeric_axes(data, x, y):
+        grid = density_grid(data, version, x, y)
+        fig = go.Figure(
+            go.Heatmap(
+                x=grid["x"],
+                y=grid["y"],
+                z=grid["z"],
+                colorscale="Viridis",
+                colorbar=dict(title="Filas"),
+            )
+        )
+        note = f"Mapa de densidad de {grid['total']:,} filas en una grilla de 100x100."
+    else:
+        if method == "density":
+            method = "stratified"
+        points, total = scatter_points(data, version, x, y, method, max_points)
+
+        # WebGL keeps the browser responsive with many points
+        scatter = go.Scattergl if len(points) > webgl_threshold else go.Scatter
+        fig = go.Figure(scatter(x=points["x"], y=points["y"], mode="markers"))
+        if len(points) < total:
+            sampling = (
+                "muestreo estratificado en una grilla de 50x50"
+                if _numeric_axes(data, x, y)
+                else "muestreo aleatorio"
+            )
+            note = (
+                f"Vista muestreada: {len(points):,} de {total:,} puntos ({sampling})."
+            )
+
+    fig.update_xaxes(title_text=x)
+    fig.update_yaxes(title_text=y)
+    return fig, note
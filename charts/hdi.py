@@ -1,84 +1,54 @@
 import plotly.express as px
 import streamlit as st
 
-
-def get_hdi_charts(data):
+from figure_cache import cached_figure
+from world_geometry import map_config
+
+
+def hdi_map(data, year):
+    # Choropleth map of HDI in a year
+    fig = px.choropleth(
+        data[data["Year"] == year],
+        title=f"Índice de Desarrollo Humano en {year}",
+        locations="Code",
+        locationmode="ISO-3",
+        color="Human Development Index (UNDP)",
+        hover_name="Entity",
+        color_continuous_scale="Viridis",
+        range_color=(0, 1),
+    )
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="Black",
+        showcoastlines=False,
+    )
+    return fig
+
+
+def hdi_top_10(data, year):
+    # Bar chart of the countries with the highest hdi in a year
+    return px.bar(
+        data[data["Year"] == year].nlargest(10, "Human Development Index (UNDP)"),
+        x="Human Development Index (UNDP)",
+        y="Entity",
+        title=f"Top 10 países con mayor indice de desarrollo humano en {year}",
+        orientation="h",
+        text="Human Development Index (UNDP)",
+    )
+
+
+def get_hdi_charts(data, version):
     st.markdown("## :blue[Otros gráficos de interés]")
     col1, col2 = st.columns(2)
 
     data = data.dropna()
     data["Year"] = data["Year"].astype(int)
 
-    # Choropleth map of HDI in early times
-    with col1:
-        # Find the earliest year in the data
-        earliest_year = data["Year"].min()
-
-        # Filter the data to only include the earliest year
-        data_earliest_year = data[data["Year"] == earliest_year]
-
-        # Add a choropleth map showing the expected years of schooling
-        fig = px.choropleth(
-            data_earliest_year,
-            title=f"Índice de Desarrollo Humano en {earliest_year}",
-            locations="Entity",
-            locationmode="country names",
-            color="Human Development Index (UNDP)",
-            hover_name="Entity",
-            color_continuous_scale="Viridis",
-            range_color=(0, 1),
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Add a bar chart showing the top countries with the highest hdi
-        fig = px.bar(
-            data_earliest_year.nlargest(10, "Human Development Index (UNDP)"),
-            x="Human Development Index (UNDP)",
-            y="Entity",
-            title=f"Top 10 países con mayor indice de desarrollo humano en {earliest_year}",
-            orientation="h",
-            text="Human Development Index (UNDP)",
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Choropleth map of HDI in modern times
-    with col2:
-        # Find the latest year in the data
-        latest_year = data["Year"].max()
-
-        # Filter the data to only include the latest year
-        data_latest_year = data[data["Year"] == latest_year]
-
-        # Add a choropleth map showing the expected years of schooling
-        fig = px.choropleth(
-            data_latest_year,
-            title=f"Índice de Desarrollo Humano en {latest_year}",
-            locations="Entity",
-            locationmode="country names",
-            color="Human Development Index (UNDP)",
-            hover_name="Entity",
-            color_continuous_scale="Viridis",
-            range_color=(0, 1),
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    # Figures are cached on disk by dataset version (figure_cache.py)
+    for column, year in ((col1, data["Year"].min()), (col2, data["Year"].max())):
+        with column:
+            fig = cached_figure(hdi_map, version, data, year)
+            st.plotly_chart(fig, use_container_width=True, config=map_config())
 
-        # Add a bar chart showing the top countries with the highest hdi
-        fig = px.bar(
-            data_latest_year.nlargest(10, "Human Development Index (UNDP)"),
-            x="Human Development Index (UNDP)",
-            y="Entity",
-            title=f"Top 10 países con mayor indice de desarrollo humano en {latest_year}",
-            orientation="h",
-            text="Human Development Index (UNDP)",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            fig = cached_figure(hdi_top_10, version, data, year)
+            st.plotly_chart(fig, use_container_width=True)
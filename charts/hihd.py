@@ -1,6 +1,8 @@
 import plotly.express as px
 import streamlit as st
 
+from world_geometry import map_config
+
 
 def get_hihd_charts(data):
     st.markdown("## :blue[Otros gráficos de interés]")
@@ -20,8 +22,8 @@ def get_hihd_charts(data):
         fig = px.choropleth(
             data_earliest_year,
             title=f"Índice Histórico de Desarrollo Humano en {earliest_year}",
-            locations="Entity",
-            locationmode="country names",
+            locations="Code",
+            locationmode="ISO-3",
             color="Population (historical estimates)",
             hover_name="Entity",
             color_continuous_scale="Viridis",
@@ -31,4 +33,4 @@ def get_hihd_charts(data):
             countrycolor="Black",
             showcoastlines=False,
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=map_config())
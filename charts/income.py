@@ -1,92 +1,71 @@
 import plotly.express as px
 import streamlit as st
 
+from figure_cache import cached_figure
+from world_geometry import map_config
 
-def get_income_charts(data):
+GNI = "GNI per capita, PPP (constant 2017 international $)"
+
+# Last year with data for every country
+LATEST_YEAR = 2017
+
+
+def income_map(data, year):
+    # Choropleth map of the gross national income per capita in a year
+    fig = px.choropleth(
+        data[data["Year"] == year],
+        title=f"{GNI} en {year}",
+        locations="Code",
+        locationmode="ISO-3",
+        color=GNI,
+        hover_name="Entity",
+        color_continuous_scale="Viridis",
+        range_color=(10_000, 100_000),
+    )
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="Black",
+        showcoastlines=False,
+    )
+    return fig
+
+
+def income_top_10(data, year):
+    # Bar chart of the countries with the highest income in a year
+    top_10 = data[data["Year"] == year].nlargest(10, GNI)
+    return px.bar(
+        top_10,
+        x=GNI,
+        y="Entity",
+        title=f"Top 10 países con mayor {GNI} en {year}",
+        orientation="h",
+        text=top_10[GNI].round(2),
+    )
+
+
+def get_income_charts(data, version):
     st.markdown("## :blue[Otros gráficos de interés]")
     col1, col2 = st.columns(2)
 
-    # Choropleth map of income in early times
+    # Income in early times. Figures are cached on disk by dataset version
+    # (figure_cache.py)
     with col1:
-        # Find the earliest year in the data
         earliest_year = data["Year"].min()
 
-        # Filter the data to only include the earliest year
-        data_earliest_year = data[data["Year"] == earliest_year]
+        fig = cached_figure(income_map, version, data, earliest_year)
+        st.plotly_chart(fig, use_container_width=True, config=map_config())
 
-        # Add a choropleth map showing the gross national income per capita
-        fig = px.choropleth(
-            data_earliest_year,
-            title=f"GNI per capita, PPP (constant 2017 international $) en {earliest_year}",
-            locations="Entity",
-            locationmode="country names",
-            color="GNI per capita, PPP (constant 2017 international $)",
-            hover_name="Entity",
-            color_continuous_scale="Viridis",
-            range_color=(10_000, 100_000),
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
+        fig = cached_figure(income_top_10, version, data, earliest_year)
         st.plotly_chart(fig, use_container_width=True)
 
-        # Add a bar chart showing the top countries with the highest income
-        fig = px.bar(
-            data_earliest_year.nlargest(
-                10, "GNI per capita, PPP (constant 2017 international $)"
-            ),
-            x="GNI per capita, PPP (constant 2017 international $)",
-            y="Entity",
-            title=f"Top 10 países con mayor GNI per capita, PPP (constant 2017 international $) en {earliest_year}",
-            orientation="h",
-            text=data_earliest_year.nlargest(
-                10, "GNI per capita, PPP (constant 2017 international $)"
-            )["GNI per capita, PPP (constant 2017 international $)"].round(2),
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Choropleth map of income in modern times
+    # Income in modern times
     with col2:
         st.caption(
             "Si bien el ultimo Year del dataset es 2020, se muestra el Year 2017, ya que este es el último Year con datos de todos los países."
         )
-        # Find the latest year in the data
-        latest_year = 2017
-
-        # Filter the data to only include the latest year
-        data_latest_year = data[data["Year"] == latest_year]
 
-        # Add a choropleth map showing the gross national income per capita
-        fig = px.choropleth(
-            data_latest_year,
-            title=f"GNI per capita, PPP (constant 2017 international $) en {latest_year}",
-            locations="Entity",
-            locationmode="country names",
-            color="GNI per capita, PPP (constant 2017 international $)",
-            hover_name="Entity",
-            color_continuous_scale="Viridis",
-            range_color=(10_000, 100_000),
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        fig = cached_figure(income_map, version, data, LATEST_YEAR)
+        st.plotly_chart(fig, use_container_width=True, config=map_config())
 
-        # Add a bar chart showing the top countries with the highest income
-        fig = px.bar(
-            data_latest_year.nlargest(
-                10, "GNI per capita, PPP (constant 2017 international $)"
-            ),
-            x="GNI per capita, PPP (constant 2017 international $)",
-            y="Entity",
-            title=f"Top 10 países con mayor GNI per capita, PPP (constant 2017 international $) en {latest_year}",
-            orientation="h",
-            text=data_latest_year.nlargest(
-                10, "GNI per capita, PPP (constant 2017 international $)"
-            )["GNI per capita, PPP (constant 2017 international $)"].round(2),
-        )
+        fig = cached_figure(income_top_10, version, data, LATEST_YEAR)
         st.plotly_chart(fig, use_container_width=True)
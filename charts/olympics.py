@@ -3,34 +3,54 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from olympics_cube import medals_and_athletes, rollup
+from world_geometry import map_config
+
 
 @st.cache_data
-def get_olympics_charts(data):
-    og_data = data.copy()
+def olympics_figures(_tables, version, webgl=False):
+    # Every chart reads its series from the precomputed cube (see olympics_cube).
+    # Cached by the datamart version of the tables, not by their contents.
+    # Only the figures and their data are cached; get_olympics_charts draws
+    # them, so nothing of the page is replayed from the cache
+    tables = _tables
+    cube = tables["cube"]
+
+    # Medals and athletes per country and year, shared by the WWII and Cold War charts
+    performance = performance_pivot(cube)
+
+    return {
+        **gender_figures(cube),
+        **country_figures(cube),
+        **ww2_figures(performance, webgl),
+        **cold_war_figures(performance, webgl),
+        **extra_figures(cube, tables),
+    }
+
 
-    # Assuming 'ID' is the unique identifier for each athlete
-    data = data.drop_duplicates(subset="ID")
+def get_olympics_charts(tables, version, webgl=False):
+    figures = olympics_figures(tables, version, webgl)
 
     st.markdown("## :yellow[Diferencias de género en los Juegos Olímpicos]")
-    gender_charts(data, og_data)
+    gender_charts(figures)
 
     st.markdown("## :green[Rendimiento por país]")
-    country_charts(data, og_data)
+    country_charts(figures)
 
     st.markdown("## :red[Segunda Guerra Mundial]")
     st.markdown(
         "El periodo de la Segunda Guerra Mundial se considera de 1939 a 1945 y se encuentra resaltado en los gráficos a continuación."
     )
-    ww2_charts(data, og_data)
+    ww2_charts(figures)
 
     st.markdown("## :blue[Guerra Fría]")
     st.markdown(
         "El periodo de la Guerra Fría se considera de 1947 a 1991 y se encuentra resaltado en los gráficos a continuación."
     )
-    cold_war_charts(data, og_data)
+    cold_war_charts(figures)
 
     st.markdown("## :blue[Otros gráficos de interés]")
-    extra_charts(data, og_data)
+    extra_charts(figures)
 
     st.markdown("## :green[Información adicional]")
     st.markdown("""
@@ -45,81 +65,203 @@ def get_olympics_charts(data):
         """)
 
 
-def gender_charts(data, og_data):
-    male_color = "steelblue"
-    female_color = "orchid"
-
+def gender_charts(figures):
     gcol1, gcol2 = st.columns(2)
 
     with gcol1:
-        gender_distribution = data["Sex"].value_counts()
-        fig = px.pie(
-            names=gender_distribution.index,
-            values=gender_distribution.values,
-            title="Distribución de género",
-            labels={"names": "Sex", "values": "Total"},
-            color=gender_distribution.index,
-            color_discrete_map={"F": female_color, "M": male_color},
-        )
-        fig.update_traces(textinfo="value+percent")
-        st.plotly_chart(fig)
+        st.plotly_chart(figures["gender"])
 
     with gcol2:
-        # Group by season and gender
-        season_gender_distribution = (
-            data.groupby(["Season", "Sex"])["Sex"].count().unstack().reset_index()
+        st.plotly_chart(figures["season_gender"])
+
+    with gcol1:
+        st.plotly_chart(figures["sport_medals_gender"])
+
+    # Display sports played only by each gender
+    st.write(
+        "Deportes jugados solo por atletas :red[femeninas]: ",
+        str(figures["female_only_sports"]),
+    )
+    st.write(
+        "Deportes jugados solo por atletas :blue[masculinos]: ",
+        str(figures["male_only_sports"]),
+    )
+
+
+def country_charts(figures):
+    ccol1, ccol2 = st.columns(2)
+
+    with ccol1:
+        st.plotly_chart(figures["medals_map"], config=map_config())
+        st.plotly_chart(figures["medals_top"])
+
+    with ccol2:
+        st.plotly_chart(figures["athletes_map"], config=map_config())
+        st.plotly_chart(figures["athletes_top"])
+
+    with ccol1:
+        st.plotly_chart(
+            figures["hosts_map"], use_container_width=True, config=map_config()
         )
-        season_gender_distribution.columns = ["Season", "F", "M"]
-
-        # Create a stacked bar chart to show gender distribution by season
-        fig = px.bar(
-            season_gender_distribution,
-            x="Season",
-            y=["F", "M"],
-            title="Distribución de género por termporada",
-            labels={"value": "Total", "variable": "Género", "Season": "Temporada"},
-            barmode="stack",
-            color_discrete_map={"F": female_color, "M": male_color},
-            text_auto=True,
+
+    with ccol2:
+        st.plotly_chart(
+            figures["average_medals_map"], use_container_width=True, config=map_config()
         )
 
-        st.plotly_chart(fig)
 
-    with gcol1:
-        medal_distribution = (
-            data[data["Medal"].isin(["Bronze", "Silver", "Gold"])]
-            .groupby(["Sport", "Sex", "Medal"])["Medal"]
-            .count()
-            .unstack()
-            .reset_index()
-        )
-        medal_distribution.columns = ["Sport", "Sex", "Bronze", "Silver", "Gold"]
-        medal_distribution["Total"] = medal_distribution[
-            ["Bronze", "Silver", "Gold"]
-        ].sum(axis=1)
-        medal_distribution = medal_distribution.sort_values("Total", ascending=False)
-
-        fig = px.bar(
-            medal_distribution,
-            x="Sport",
-            y=["Bronze", "Silver", "Gold"],
-            color="Sex",
-            title="Distribución de medallas dentro de cada deporte por género",
-            labels={
-                "value": "Número de Medals",
-                "variable": "Tipo de Medal",
-                "Sport": "Sport",
-                "Sex": "Género",
-            },
-            barmode="group",
-            color_discrete_map={"F": female_color, "M": male_color},
+def ww2_charts(figures):
+    xcol1, xcol2, xcol3 = st.columns(3)
+
+    with xcol1:
+        st.plotly_chart(figures["axis"])
+
+    with xcol2:
+        st.plotly_chart(figures["allies"])
+
+    with xcol3:
+        st.plotly_chart(figures["neutral"])
+
+
+def cold_war_charts(figures):
+    xcol1, xcol2 = st.columns(2)
+
+    with xcol1:
+        st.plotly_chart(figures["western_bloc"])
+
+        st.markdown("### Boicot estadounidense de los Juegos Olímpicos de 1980")
+        st.markdown("""
+    Las Olimpiadas de 1980 se celebraron en Moscú, Unión Soviética (actual Rusia) del 19 de julio al 3 de agosto de 1980. \
+    Fue la primera vez que los Juegos Olímpicos se llevaron a cabo en un país comunista.
+
+    Estas Olimpiadas fueron muy polémicas debido a un boicot liderado por los Estados Unidos. \
+    En enero de 1980, el presidente estadounidense Jimmy Carter anunció que EEUU boicotearía los Juegos si \
+    la Unión Soviética no retiraba sus tropas de Afganistán en un plazo de un mes. \
+    Cuando la URSS no retiró sus tropas, EEUU, junto con más de 60 países, finalmente se negaron a participar en las Olimpiadas de Moscú.
+
+    La ausencia de EEUU y sus aliados, incluyendo potencias deportivas como Alemania Occidental, Canadá y Japón, \
+    fue un duro golpe para estos Juegos. \
+    La Unión Soviética y sus países del bloque comunista dominaron las competencias, ganando la mayor parte de las Medals de Gold. \
+    Sin embargo, los Juegos de Moscú se vieron opacados por la controversia y la baja participación.
+        """)
+
+    with xcol2:
+        st.plotly_chart(figures["eastern_bloc"])
+
+        st.markdown("### Boicot soviético de los Juegos Olímpicos de 1984")
+        st.markdown("""
+Las Olimpiadas de 1984 se llevaron a cabo del 28 de julio al 12 de agosto de 1984 en Los Ángeles, Estados Unidos. \
+A diferencia de 1980, en esta ocasión fue la Unión Soviética y sus países aliados los que boicotearon los Juegos, \
+en respuesta al boicot de 1980 liderado por EEUU.
+
+A pesar de la ausencia de la URSS y sus países del bloque comunista, los Juegos de Los Ángeles 1984 fueron un gran éxito, \
+con la participación de 140 países y la asistencia de más de 5 millones de espectadores. La competencia fue intensa y \
+Estados Unidos dominó el medallero.    
+        """)
+
+
+def extra_charts(figures):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.plotly_chart(figures["seasons"])
+
+    with col2:
+        st.plotly_chart(figures["ages"])
+        st.caption("No se incluyen los atletas de edad desconocida.")
+
+    with col1:
+        st.plotly_chart(figures["medal_types"])
+
+    with col2:
+        st.plotly_chart(figures["oldest_sports"])
+
+    with col1:
+        st.plotly_chart(figures["sport_participation"])
+
+    with col2:
+        st.plotly_chart(figures["event_participation"])
+
+    with col1:
+        st.plotly_chart(figures["top_athletes"])
+
+    with col2:
+        st.plotly_chart(figures["discontinued_sports"])
+
+
+def gender_figures(cube):
+    figures = {}
+    male_color = "steelblue"
+    female_color = "orchid"
+
+    gender_distribution = rollup(cube, "Sex", "Athletes").sort_values(ascending=False)
+    fig = px.pie(
+        names=gender_distribution.index,
+        values=gender_distribution.values,
+        title="Distribución de género",
+        labels={"names": "Sex", "values": "Total"},
+        color=gender_distribution.index,
+        color_discrete_map={"F": female_color, "M": male_color},
+    )
+    fig.update_traces(textinfo="value+percent")
+    figures["gender"] = fig
+
+    # Group by season and gender
+    season_gender_distribution = (
+        rollup(cube, ["Season", "Sex"], "Athletes").unstack().reset_index()
+    )
+    season_gender_distribution.columns = ["Season", "F", "M"]
+
+    # Create a stacked bar chart to show gender distribution by season
+    fig = px.bar(
+        season_gender_distribution,
+        x="Season",
+        y=["F", "M"],
+        title="Distribución de género por termporada",
+        labels={"value": "Total", "variable": "Género", "Season": "Temporada"},
+        barmode="stack",
+        color_discrete_map={"F": female_color, "M": male_color},
+        text_auto=True,
+    )
+
+    figures["season_gender"] = fig
+
+    medal_distribution = (
+        rollup(
+            cube[cube["Medal"].isin(["Bronze", "Silver", "Gold"])],
+            ["Sport", "Sex", "Medal"],
+            "Athletes",
         )
+        .unstack()
+        .reset_index()
+    )
+    medal_distribution.columns = ["Sport", "Sex", "Bronze", "Silver", "Gold"]
+    medal_distribution["Total"] = medal_distribution[["Bronze", "Silver", "Gold"]].sum(
+        axis=1
+    )
+    medal_distribution = medal_distribution.sort_values("Total", ascending=False)
+
+    fig = px.bar(
+        medal_distribution,
+        x="Sport",
+        y=["Bronze", "Silver", "Gold"],
+        color="Sex",
+        title="Distribución de medallas dentro de cada deporte por género",
+        labels={
+            "value": "Número de Medals",
+            "variable": "Tipo de Medal",
+            "Sport": "Sport",
+            "Sex": "Género",
+        },
+        barmode="group",
+        color_discrete_map={"F": female_color, "M": male_color},
+    )
 
-        st.plotly_chart(fig)
+    figures["sport_medals_gender"] = fig
 
     # Group by sport and gender
     gender_distribution = (
-        data.groupby(["Sport", "Sex"])["Sex"].count().unstack().reset_index()
+        rollup(cube, ["Sport", "Sex"], "Athletes").unstack().reset_index()
     )
     gender_distribution.columns = ["Sport", "F", "M"]
 
@@ -133,147 +275,169 @@ def gender_charts(data, og_data):
         "Sport"
     ].tolist()
 
-    # Display sports played only by each gender
-    st.write(
-        "Deportes jugados solo por atletas :red[femeninas]: ", str(female_only_sports)
-    )
-    st.write(
-        "Deportes jugados solo por atletas :blue[masculinos]: ", str(male_only_sports)
-    )
+    figures["female_only_sports"] = female_only_sports
+    figures["male_only_sports"] = male_only_sports
+    return figures
 
 
-def country_charts(data, og_data):
-    ccol1, ccol2 = st.columns(2)
+def country_figures(cube):
+    figures = {}
 
     # Create a choropleth map to show the distribution of medals by country
-    with ccol1:
-        # Filter out rows where Medal is NaN
-        medal_data = og_data.dropna(subset=["Medal"])
-
-        # Drop duplicates for team events
-        medal_data = medal_data.drop_duplicates(
-            subset=["Team", "Event", "Year", "Season", "Sport"]
-        )
-
-        # Count the number of medals for each NOC
-        medal_distribution = medal_data["Region (ISO)"].value_counts().reset_index()
-        medal_distribution.columns = ["Region (ISO)", "Count"]
-
-        fig = px.choropleth(
-            medal_distribution,
-            locations="Region (ISO)",
-            locationmode="ISO-3",
-            color="Count",
-            title="Distribución de medallas por país",
-            labels={"Region": "País", "Count": "Número de Medallas"},
-            color_continuous_scale=px.colors.sequential.Viridis,
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig)
-
-        # Create a bar chart to show the distribution of medals by country
-        fig = px.bar(
-            medal_distribution.head(25),
-            x="Region (ISO)",
-            y="Count",
-            title="Top 25 países con más medallas",
-            labels={"Region (ISO)": "País", "Count": "Número de Medallas"},
-            text_auto=True,
-        )
-        st.plotly_chart(fig)
+    # Count the number of medals for each NOC, counting team events once
+    medal_distribution = (
+        rollup(cube, "Region (ISO)", "Medal Events")
+        .sort_values(ascending=False)
+        .reset_index()
+    )
+    medal_distribution.columns = ["Region (ISO)", "Count"]
+
+    fig = px.choropleth(
+        medal_distribution,
+        locations="Region (ISO)",
+        locationmode="ISO-3",
+        color="Count",
+        title="Distribución de medallas por país",
+        labels={"Region": "País", "Count": "Número de Medallas"},
+        color_continuous_scale=px.colors.sequential.Viridis,
+    )
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="Black",
+        showcoastlines=False,
+    )
+    figures["medals_map"] = fig
+
+    # Create a bar chart to show the distribution of medals by country
+    fig = px.bar(
+        medal_distribution.head(25),
+        x="Region (ISO)",
+        y="Count",
+        title="Top 25 países con más medallas",
+        labels={"Region (ISO)": "País", "Count": "Número de Medallas"},
+        text_auto=True,
+    )
+    figures["medals_top"] = fig
 
     # Create a choropleth map to show the distribution of athletes by country
-    with ccol2:
-        country_distribution = data["Region (ISO)"].value_counts().reset_index()
-        country_distribution.columns = ["Region (ISO)", "Count"]
-        fig = px.choropleth(
-            country_distribution,
-            locations="Region (ISO)",
-            locationmode="ISO-3",
-            color="Count",
-            title="Distribución de atletas por país",
-            labels={"Region (ISO)": "Pais", "Count": "Número de atletas"},
-            color_continuous_scale=px.colors.sequential.Viridis,
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig)
-
-        # Create a bar chart for the top 25 countries with the most athletes
-        fig = px.bar(
-            country_distribution.head(25),
-            x="Region (ISO)",
-            y="Count",
-            title="Top 25 países con más atletas",
-            labels={"Region (ISO)": "País", "Count": "Número de atletas"},
-            text_auto=True,
-        )
+    country_distribution = (
+        rollup(cube, "Region (ISO)", "Athletes")
+        .sort_values(ascending=False)
+        .reset_index()
+    )
+    country_distribution.columns = ["Region (ISO)", "Count"]
+    fig = px.choropleth(
+        country_distribution,
+        locations="Region (ISO)",
+        locationmode="ISO-3",
+        color="Count",
+        title="Distribución de atletas por país",
+        labels={"Region (ISO)": "Pais", "Count": "Número de atletas"},
+        color_continuous_scale=px.colors.sequential.Viridis,
+    )
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="Black",
+        showcoastlines=False,
+    )
+    figures["athletes_map"] = fig
+
+    # Create a bar chart for the top 25 countries with the most athletes
+    fig = px.bar(
+        country_distribution.head(25),
+        x="Region (ISO)",
+        y="Count",
+        title="Top 25 países con más atletas",
+        labels={"Region (ISO)": "País", "Count": "Número de atletas"},
+        text_auto=True,
+    )
 
-        st.plotly_chart(fig)
+    figures["athletes_top"] = fig
 
     # Count the number of unique years each country has hosted the Olympics
-    with ccol1:
-        city_distribution = (
-            data.drop_duplicates(subset=["Host Country (ISO)", "Year"])[
-                "Host Country (ISO)"
-            ]
-            .value_counts()
-            .reset_index()
-        )
-        city_distribution.columns = ["Host Country (ISO)", "Count"]
-
-        fig = px.choropleth(
-            city_distribution,
-            locations="Host Country (ISO)",
-            locationmode="ISO-3",
-            color="Count",
-            title="Países anfitriones de los Juegos Olímpicos",
-            labels={"Host Country (ISO)": "Pais", "Count": "Número de olímpiadas"},
-            color_continuous_scale=px.colors.sequential.Viridis,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    city_distribution = (
+        rollup(cube, ["Host Country (ISO)", "Year"], "Athletes")
+        .reset_index()["Host Country (ISO)"]
+        .value_counts()
+        .reset_index()
+    )
+    city_distribution.columns = ["Host Country (ISO)", "Count"]
+
+    fig = px.choropleth(
+        city_distribution,
+        locations="Host Country (ISO)",
+        locationmode="ISO-3",
+        color="Count",
+        title="Países anfitriones de los Juegos Olímpicos",
+        labels={"Host Country (ISO)": "Pais", "Count": "Número de olímpiadas"},
+        color_continuous_scale=px.colors.sequential.Viridis,
+    )
+    figures["hosts_map"] = fig
 
     # Create a bar chart to show the average number of medals won per Olympics by each country
-    with ccol2:
-        # Calculate the total number of medals won by each country
-        total_medals = data.groupby("Region (ISO)")["Medal"].count().reset_index()
-        total_medals.columns = ["Region (ISO)", "Total Medals"]
-
-        # Calculate the total number of Olympics each country has participated in
-        total_olympics = data["Region (ISO)"].value_counts().reset_index()
-        total_olympics.columns = ["Region (ISO)", "Total Olympics"]
+    # Calculate the total number of medals won by each country and the
+    # total number of Olympics each country has participated in
+    avg_medals = medals_and_athletes(cube, "Region (ISO)").reset_index()
+    avg_medals.columns = ["Region (ISO)", "Total Medals", "Total Olympics"]
+
+    # Calculate the average number of medals won per Olympics
+    avg_medals["Promedio"] = avg_medals["Total Medals"] / avg_medals["Total Olympics"]
+
+    # Create the Plotly Express bar chart
+    fig = px.choropleth(
+        avg_medals.sort_values("Promedio", ascending=False),
+        locations="Region (ISO)",
+        locationmode="ISO-3",
+        color="Promedio",
+        title="Promedio de medallas ganadas de cada país por Olimpiada",
+        color_continuous_scale=px.colors.sequential.Viridis,
+    )
 
-        # Merge the two DataFrames
-        avg_medals = pd.merge(total_medals, total_olympics, on="Region (ISO)")
+    figures["average_medals_map"] = fig
+    return figures
 
-        # Calculate the average number of medals won per Olympics
-        avg_medals["Promedio"] = (
-            avg_medals["Total Medals"] / avg_medals["Total Olympics"]
-        )
 
-        # Create the Plotly Express bar chart
-        fig = px.choropleth(
-            avg_medals.sort_values("Promedio", ascending=False),
-            locations="Region (ISO)",
-            locationmode="ISO-3",
-            color="Promedio",
-            title="Promedio de medallas ganadas de cada país por Olimpiada",
-            color_continuous_scale=px.colors.sequential.Viridis,
-        )
+def performance_pivot(cube):
+    # Group the data by country and Olympic year
+    grouped_data = medals_and_athletes(cube, ["NOC", "Year"])
+
+    # Filter the data to consider only up to 1993
+    grouped_data = grouped_data[grouped_data.index.get_level_values("Year") <= 1993]
+
+    # One column per (measure, country), one row per year
+    return grouped_data.unstack("NOC")
+
+
+def country_lines_figure(performance, countries, colors, webgl=False):
+    # Build all the traces first and hand them to the figure in one batch
+    scatter = go.Scattergl if webgl else go.Scatter
+    medals = performance["Medals"].reindex(columns=countries)
+    athletes = performance["Atletas"].reindex(columns=countries)
+
+    traces = []
+    for country in countries:
+        color = colors.get(country, "blue")
+        for series, label, dash in (
+            (medals[country], "Medallas", "solid"),
+            (athletes[country], "Atletas", "dash"),
+        ):
+            # Only the years in which the country took part
+            series = series.dropna().astype("int64")
+            traces.append(
+                scatter(
+                    x=series.index,
+                    y=series.values,
+                    mode="lines",
+                    name=f"{country} {label}",
+                    line=dict(dash=dash, color=color),
+                )
+            )
 
-        # Display the chart in Streamlit
-        st.plotly_chart(fig, use_container_width=True)
+    return go.Figure(data=traces)
 
 
-def ww2_charts(data, og_data):
-    xcol1, xcol2, xcol3 = st.columns(3)
+def ww2_figures(performance, webgl=False):
+    figures = {}
     # Create a list of the countries that were involved in WWII as Axis powers
     axis_countries = ["GER", "ITA", "JPN"]
 
@@ -283,22 +447,6 @@ def ww2_charts(data, og_data):
     # Create a list of the countries that were neutral during WWII
     neutral_countries = ["SWE", "SUI", "ESP"]
 
-    # Group the data by country and Olympic year
-    grouped_data = (
-        data.groupby(["NOC", "Year"])
-        .agg({"Medal": "count", "ID": pd.Series.nunique})
-        .reset_index()
-    )
-    grouped_data.columns = ["NOC", "Year", "Medals", "Atletas"]
-
-    # Filter the data to consider only up to 1994
-    grouped_data = grouped_data[grouped_data["Year"] <= 1993]
-
-    # Create separate dataframes for Axis, Allies, and Neutral countries
-    axis_data = grouped_data[grouped_data["NOC"].isin(axis_countries)]
-    allies_data = grouped_data[grouped_data["NOC"].isin(allies_countries)]
-    neutral_data = grouped_data[grouped_data["NOC"].isin(neutral_countries)]
-
     # Define a list of shapes to represent the WWII period
     shapes = [
         dict(
@@ -330,114 +478,37 @@ def ww2_charts(data, og_data):
     }
 
     # Create line plots to visualize the performance metrics of the WWII-involved countries over time
-    with xcol1:
-        fig = go.Figure()
-        for country in axis_countries:
-            country_data = axis_data[axis_data["NOC"] == country]
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Medals"],
-                    mode="lines",
-                    name=f"{country} Medallas",
-                    line=dict(dash="solid", color=colors.get(country, "blue")),
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Atletas"],
-                    mode="lines",
-                    name=f"{country} Atletas",
-                    line=dict(dash="dash", color=colors.get(country, "blue")),
-                )
-            )
-        fig.update_layout(
-            shapes=shapes,
-            title="Rendimiento de los países del Eje a lo largo del tiempo",
-        )
-        st.plotly_chart(fig)
+    fig = country_lines_figure(performance, axis_countries, colors, webgl)
+    fig.update_layout(
+        shapes=shapes,
+        title="Rendimiento de los países del Eje a lo largo del tiempo",
+    )
+    figures["axis"] = fig
 
-    with xcol2:
-        fig = go.Figure()
-        for country in allies_countries:
-            country_data = allies_data[allies_data["NOC"] == country]
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Medals"],
-                    mode="lines",
-                    name=f"{country} Medallas",
-                    line=dict(dash="solid", color=colors.get(country, "blue")),
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Atletas"],
-                    mode="lines",
-                    name=f"{country} Atletas",
-                    line=dict(dash="dash", color=colors.get(country, "blue")),
-                )
-            )
-        fig.update_layout(
-            shapes=shapes,
-            title="Rendimiento de los países aliados a lo largo del tiempo",
-        )
-        st.plotly_chart(fig)
+    fig = country_lines_figure(performance, allies_countries, colors, webgl)
+    fig.update_layout(
+        shapes=shapes,
+        title="Rendimiento de los países aliados a lo largo del tiempo",
+    )
+    figures["allies"] = fig
 
-    with xcol3:
-        fig = go.Figure()
-        for country in neutral_countries:
-            country_data = neutral_data[neutral_data["NOC"] == country]
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Medals"],
-                    mode="lines",
-                    name=f"{country} Medallas",
-                    line=dict(dash="solid", color=colors.get(country, "blue")),
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Atletas"],
-                    mode="lines",
-                    name=f"{country} Atletas",
-                    line=dict(dash="dash", color=colors.get(country, "blue")),
-                )
-            )
-        fig.update_layout(
-            shapes=shapes,
-            title="Rendimiento de los países neutrales a lo largo del tiempo",
-        )
-        st.plotly_chart(fig)
+    fig = country_lines_figure(performance, neutral_countries, colors, webgl)
+    fig.update_layout(
+        shapes=shapes,
+        title="Rendimiento de los países neutrales a lo largo del tiempo",
+    )
+    figures["neutral"] = fig
+    return figures
 
 
-def cold_war_charts(data, og_data):
-    xcol1, xcol2 = st.columns(2)
+def cold_war_figures(performance, webgl=False):
+    figures = {}
     # Create a list of the countries that were involved in the Cold War as Western Bloc
     western_bloc_countries = ["USA", "GBR", "FRA", "CAN", "AUS"]
 
     # Create a list of the countries that were involved in the Cold War as Eastern Bloc
     eastern_bloc_countries = ["URS", "GDR", "HUN", "POL", "CUB"]
 
-    # Group the data by country and Olympic year
-    grouped_data = (
-        data.groupby(["NOC", "Year"])
-        .agg({"Medal": "count", "ID": pd.Series.nunique})
-        .reset_index()
-    )
-    grouped_data.columns = ["NOC", "Year", "Medals", "Atletas"]
-
-    # Filter the data to consider only up to 1991
-    grouped_data = grouped_data[grouped_data["Year"] <= 1993]
-
-    # Create separate dataframes for Western Bloc and Eastern Bloc countries
-    western_bloc_data = grouped_data[grouped_data["NOC"].isin(western_bloc_countries)]
-    eastern_bloc_data = grouped_data[grouped_data["NOC"].isin(eastern_bloc_countries)]
-
     # Define a list of shapes to represent the Cold War period
     shapes = [
         dict(
@@ -496,355 +567,265 @@ def cold_war_charts(data, og_data):
     }
 
     # Create line plots to visualize the performance metrics of the Cold War-involved countries over time
-    with xcol1:
-        fig = go.Figure()
-        for country in western_bloc_countries:
-            country_data = western_bloc_data[western_bloc_data["NOC"] == country]
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Medals"],
-                    mode="lines",
-                    name=f"{country} Medallas",
-                    line=dict(dash="solid", color=colors.get(country, "blue")),
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Atletas"],
-                    mode="lines",
-                    name=f"{country} Atletas",
-                    line=dict(dash="dash", color=colors.get(country, "blue")),
-                )
-            )
-        fig.update_layout(
-            shapes=shapes,
-            annotations=annotations,
-            title="Rendimiento de los países del Bloque Occidental a lo largo del tiempo",
-        )
-        st.plotly_chart(fig)
-
-        st.markdown("### Boicot estadounidense de los Juegos Olímpicos de 1980")
-        st.markdown("""
-    Las Olimpiadas de 1980 se celebraron en Moscú, Unión Soviética (actual Rusia) del 19 de julio al 3 de agosto de 1980. \
-    Fue la primera vez que los Juegos Olímpicos se llevaron a cabo en un país comunista.
-
-    Estas Olimpiadas fueron muy polémicas debido a un boicot liderado por los Estados Unidos. \
-    En enero de 1980, el presidente estadounidense Jimmy Carter anunció que EEUU boicotearía los Juegos si \
-    la Unión Soviética no retiraba sus tropas de Afganistán en un plazo de un mes. \
-    Cuando la URSS no retiró sus tropas, EEUU, junto con más de 60 países, finalmente se negaron a participar en las Olimpiadas de Moscú.
-
-    La ausencia de EEUU y sus aliados, incluyendo potencias deportivas como Alemania Occidental, Canadá y Japón, \
-    fue un duro golpe para estos Juegos. \
-    La Unión Soviética y sus países del bloque comunista dominaron las competencias, ganando la mayor parte de las Medals de Gold. \
-    Sin embargo, los Juegos de Moscú se vieron opacados por la controversia y la baja participación.
-        """)
-
-    with xcol2:
-        fig = go.Figure()
-        for country in eastern_bloc_countries:
-            country_data = eastern_bloc_data[eastern_bloc_data["NOC"] == country]
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Medals"],
-                    mode="lines",
-                    name=f"{country} Medallas",
-                    line=dict(dash="solid", color=colors.get(country, "blue")),
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=country_data["Year"],
-                    y=country_data["Atletas"],
-                    mode="lines",
-                    name=f"{country} Atletas",
-                    line=dict(dash="dash", color=colors.get(country, "blue")),
-                )
-            )
-        fig.update_layout(
-            shapes=shapes,
-            annotations=annotations,
-            title="Rendimiento de los países del Bloque Oriental a lo largo del tiempo",
-        )
-        st.plotly_chart(fig)
-
-        st.markdown("### Boicot soviético de los Juegos Olímpicos de 1984")
-        st.markdown("""
-Las Olimpiadas de 1984 se llevaron a cabo del 28 de julio al 12 de agosto de 1984 en Los Ángeles, Estados Unidos. \
-A diferencia de 1980, en esta ocasión fue la Unión Soviética y sus países aliados los que boicotearon los Juegos, \
-en respuesta al boicot de 1980 liderado por EEUU.
-
-A pesar de la ausencia de la URSS y sus países del bloque comunista, los Juegos de Los Ángeles 1984 fueron un gran éxito, \
-con la participación de 140 países y la asistencia de más de 5 millones de espectadores. La competencia fue intensa y \
-Estados Unidos dominó el medallero.    
-        """)
+    fig = country_lines_figure(performance, western_bloc_countries, colors, webgl)
+    fig.update_layout(
+        shapes=shapes,
+        annotations=annotations,
+        title="Rendimiento de los países del Bloque Occidental a lo largo del tiempo",
+    )
+    figures["western_bloc"] = fig
 
+    fig = country_lines_figure(performance, eastern_bloc_countries, colors, webgl)
+    fig.update_layout(
+        shapes=shapes,
+        annotations=annotations,
+        title="Rendimiento de los países del Bloque Oriental a lo largo del tiempo",
+    )
+    figures["eastern_bloc"] = fig
 
-def extra_charts(data, og_data):
-    col1, col2 = st.columns(2)
+    return figures
 
-    # Create a pie chart to show the distribution of athletes across different Olympic seasons
-    with col1:
-        season_distribution = data["Season"].value_counts().reset_index()
-        season_distribution.columns = ["Season", "Count"]
-
-        fig = px.pie(
-            season_distribution,
-            names="Season",
-            values="Count",
-            title="Distribución de atletas por temporada olímpica",
-            labels={"Season": "Temporada", "Count": "Número de atletas"},
-            color=season_distribution["Season"],
-            color_discrete_map={"Summer": "khaki", "Winter": "lightblue"},
-        )
 
-        fig.update_traces(textinfo="value+percent")
-        st.plotly_chart(fig)
+def age_labels(age):
+    # Ages as whole numbers. Athletes of unknown age are not in the ages table
+    return age.astype("int64").astype(str)
 
-    # Create a dot chart showing the distribution of medals and athletes by age
-    with col2:
-        # Calculate the distribution of medals by age
-        medal_distribution = (
-            data[data["Medal"].notna()].groupby("Age")["Medal"].count().reset_index()
-        )
 
-        # Calculate the distribution of athletes by age
-        athlete_distribution = data.groupby("Age")["ID"].nunique().reset_index()
+def age_distribution_figure(ages):
+    # Calculate the distribution of medals by age
+    medal_distribution = ages[ages["Medals"] > 0]
 
-        # Create a figure
-        fig = go.Figure()
+    # The age labels are drawn as the text of each trace instead of one layout
+    # annotation per marker, which keeps the figure payload small
+    marker_text = dict(
+        mode="markers+text",
+        textposition="top center",
+        textfont=dict(size=11),
+    )
 
-        # Add a scatter trace for the distribution of medals by age
-        fig.add_trace(
+    fig = go.Figure(
+        data=[
+            # Scatter trace for the distribution of medals by age
             go.Scatter(
                 x=medal_distribution["Age"],
-                y=medal_distribution["Medal"],
-                mode="markers",
+                y=medal_distribution["Medals"],
+                text=age_labels(medal_distribution["Age"]),
                 name="Medals",
-            )
-        )
-
-        # Add a scatter trace for the distribution of athletes by age
-        fig.add_trace(
+                **marker_text,
+            ),
+            # Scatter trace for the distribution of athletes by age
             go.Scatter(
-                x=athlete_distribution["Age"],
-                y=athlete_distribution["ID"],
-                mode="markers",
+                x=ages["Age"],
+                y=ages["Athletes"],
+                text=age_labels(ages["Age"]),
                 name="Atletas",
-            )
-        )
+                **marker_text,
+            ),
+        ]
+    )
 
-        # Add annotations for each marker
-        for i in range(len(medal_distribution)):
-            age = medal_distribution.loc[i, "Age"]
-            if age != "Unknown":
-                age = str(int(float(age)))
-            fig.add_annotation(
-                x=medal_distribution.loc[i, "Age"],
-                y=medal_distribution.loc[i, "Medal"],
-                text=age,
-                showarrow=False,
-                font=dict(size=11),
-                yshift=10,
-            )
-        for i in range(len(athlete_distribution)):
-            age = athlete_distribution.loc[i, "Age"]
-            if age != "Unknown":
-                age = str(int(float(age)))
-            fig.add_annotation(
-                x=athlete_distribution.loc[i, "Age"],
-                y=athlete_distribution.loc[i, "ID"],
-                text=age,
-                showarrow=False,
-                font=dict(size=11),
-                yshift=10,
-            )
+    # Set the title and labels
+    fig.update_layout(
+        title="Distribución de Medals y atletas por edad",
+        xaxis_title="Edad",
+        yaxis_title="Número",
+        legend_title="Distribución",
+    )
+    return fig
 
-        # Set the title and labels
-        fig.update_layout(
-            title="Distribución de Medals y atletas por edad",
-            xaxis_title="Edad",
-            yaxis_title="Número",
-            legend_title="Distribución",
-        )
 
-        st.plotly_chart(fig)
+def extra_figures(cube, tables):
+    figures = {}
+
+    # Create a pie chart to show the distribution of athletes across different Olympic seasons
+    season_distribution = (
+        rollup(cube, "Season", "Athletes").sort_values(ascending=False).reset_index()
+    )
+    season_distribution.columns = ["Season", "Count"]
+
+    fig = px.pie(
+        season_distribution,
+        names="Season",
+        values="Count",
+        title="Distribución de atletas por temporada olímpica",
+        labels={"Season": "Temporada", "Count": "Número de atletas"},
+        color=season_distribution["Season"],
+        color_discrete_map={"Summer": "khaki", "Winter": "lightblue"},
+    )
+
+    fig.update_traces(textinfo="value+percent")
+    figures["seasons"] = fig
+
+    # Create a dot chart showing the distribution of medals and athletes by age
+    fig = age_distribution_figure(tables["ages"])
+    figures["ages"] = fig
 
     # Create a bar chart to show the distribution of medal types within each sport
-    with col1:
-        medal_distribution = (
-            og_data[og_data["Medal"].isin(["Bronze", "Silver", "Gold"])]
-            .groupby(["Sport", "Medal"])["Medal"]
-            .count()
-            .unstack()
-            .reset_index()
-        )
-        medal_distribution.columns = ["Sport", "Bronze", "Silver", "Gold"]
-        medal_distribution["Total"] = medal_distribution[
-            ["Bronze", "Silver", "Gold"]
-        ].sum(axis=1)
-        medal_distribution = medal_distribution.sort_values("Total", ascending=False)
-
-        fig = px.bar(
-            medal_distribution,
-            x="Sport",
-            y=["Bronze", "Silver", "Gold"],
-            title="Distribución de tipos de medallas dentro de cada deporte",
-            labels={
-                "value": "Número de medallas",
-                "variable": "Tipo de medalla",
-                "Sport": "Deporte",
-            },
-            barmode="stack",
-            text_auto=True,
-            color_discrete_sequence=[
-                "darkgoldenrod",
-                "aliceblue",
-                "gold",
-            ],
+    medal_distribution = (
+        rollup(
+            cube[cube["Medal"].isin(["Bronze", "Silver", "Gold"])],
+            ["Sport", "Medal"],
+            "Rows",
         )
+        .unstack()
+        .reset_index()
+    )
+    medal_distribution.columns = ["Sport", "Bronze", "Silver", "Gold"]
+    medal_distribution["Total"] = medal_distribution[["Bronze", "Silver", "Gold"]].sum(
+        axis=1
+    )
+    medal_distribution = medal_distribution.sort_values("Total", ascending=False)
+
+    fig = px.bar(
+        medal_distribution,
+        x="Sport",
+        y=["Bronze", "Silver", "Gold"],
+        title="Distribución de tipos de medallas dentro de cada deporte",
+        labels={
+            "value": "Número de medallas",
+            "variable": "Tipo de medalla",
+            "Sport": "Deporte",
+        },
+        barmode="stack",
+        text_auto=True,
+        color_discrete_sequence=[
+            "darkgoldenrod",
+            "aliceblue",
+            "gold",
+        ],
+    )
 
-        st.plotly_chart(fig)
+    figures["medal_types"] = fig
 
     # Display the oldest sports that are still played today in a line chart
-    with col2:
-        oldest_sports = og_data.groupby("Sport")["Year"].min().reset_index()
-        latest_sports = og_data.groupby("Sport")["Year"].max().reset_index()
+    oldest_sports = cube.groupby("Sport", observed=True)["Year"].min().reset_index()
+    latest_sports = cube.groupby("Sport", observed=True)["Year"].max().reset_index()
 
-        # Merge the two dataframes
-        sports = pd.merge(oldest_sports, latest_sports, on="Sport")
+    # Merge the two dataframes
+    sports = pd.merge(oldest_sports, latest_sports, on="Sport")
 
-        # Filter sports that are still played today
-        sports = sports[sports["Year_y"] == og_data["Year"].max()]
+    # Filter sports that are still played today
+    sports = sports[sports["Year_y"] == cube["Year"].max()]
 
-        # Sort by the oldest year
-        sports = sports.sort_values("Year_x", ascending=True)
+    # Sort by the oldest year
+    sports = sports.sort_values("Year_x", ascending=True)
 
-        fig = px.line(
-            sports,
-            x="Year_x",
-            y="Sport",
-            title="Deportes más antiguos que todavía se juegan hoy en día",
-            labels={"Sport": "Deporte", "Year_x": "Primer año de competencia"},
-        )
+    fig = px.line(
+        sports,
+        x="Year_x",
+        y="Sport",
+        title="Deportes más antiguos que todavía se juegan hoy en día",
+        labels={"Sport": "Deporte", "Year_x": "Primer año de competencia"},
+    )
 
-        st.plotly_chart(fig)
+    figures["oldest_sports"] = fig
 
     # Create a line plot to show the number of participants in each sport over time
-    with col1:
-        sport_participation = (
-            og_data.groupby(["Year", "Sport"])["Sport"]
-            .count()
-            .reset_index(name="Count")
-        )
-        fig = px.line(
-            sport_participation,
-            x="Year",
-            y="Count",
-            color="Sport",
-            title="Participación en cada deporte a lo largo del tiempo",
-            labels={"Count": "Número de atletas", "Year": "Año", "Sport": "Deporte"},
-        )
-        st.plotly_chart(fig)
+    sport_participation = rollup(cube, ["Year", "Sport"], "Rows").reset_index(
+        name="Count"
+    )
+    fig = px.line(
+        sport_participation,
+        x="Year",
+        y="Count",
+        color="Sport",
+        title="Participación en cada deporte a lo largo del tiempo",
+        labels={"Count": "Número de atletas", "Year": "Año", "Sport": "Deporte"},
+    )
+    figures["sport_participation"] = fig
 
     # Create a bar chart to show the number of participants in the top 25 events in the most recent year
-    with col2:
-        recent_year = data["Year"].max()
-        event_participation = (
-            data[data["Year"] == recent_year]["Event"]
-            .value_counts()
-            .nlargest(25)  # Select only the top 25 events
-            .reset_index(name="Atletas")
-        )
-        event_participation.columns = ["Event", "Atletas"]
-        fig = px.bar(
-            event_participation,
-            x="Event",
-            y="Atletas",
-            text_auto=True,
-            title=f"Participación en los 25 eventos principales en {recent_year}",
-        )
-        st.plotly_chart(fig)
+    athletes = cube[cube["Athletes"] > 0]
+    recent_year = athletes["Year"].max()
+    event_participation = (
+        rollup(athletes[athletes["Year"] == recent_year], "Event", "Athletes")
+        .nlargest(25)  # Select only the top 25 events
+        .reset_index(name="Atletas")
+    )
+    event_participation.columns = ["Event", "Atletas"]
+    fig = px.bar(
+        event_participation,
+        x="Event",
+        y="Atletas",
+        text_auto=True,
+        title=f"Participación en los 25 eventos principales en {recent_year}",
+    )
+    figures["event_participation"] = fig
 
     # Create a chart to show the athletes with the most participation in the Olympics
-    with col1:
-        # Group by athlete name and NOC, and count the number of participations for each
-        athlete_participation = (
-            og_data.groupby(["Name", "NOC"])
-            .size()
-            .nlargest(10)
-            .reset_index(name="Participaciones")
-        )
-
-        # Create a new column that combines the athlete name and NOC
-        athlete_participation["Name (NOC)"] = (
-            athlete_participation["Name"] + " (" + athlete_participation["NOC"] + ")"
-        )
+    # Group by athlete name and NOC, and count the number of participations for each
+    athlete_participation = tables["top_athletes"].head(10).copy()
+
+    # Create a new column that combines the athlete name and NOC
+    athlete_participation["Name (NOC)"] = (
+        athlete_participation["Name"]
+        + " ("
+        + athlete_participation["NOC"].astype(str)
+        + ")"
+    )
 
-        fig = px.bar(
-            athlete_participation,
-            x="Name (NOC)",
-            y="Participaciones",
-            title="Atletas con más participaciones en los Juegos Olímpicos",
-            text_auto=True,
-        )
-        st.plotly_chart(fig)
+    fig = px.bar(
+        athlete_participation,
+        x="Name (NOC)",
+        y="Participaciones",
+        title="Atletas con más participaciones en los Juegos Olímpicos",
+        text_auto=True,
+    )
+    figures["top_athletes"] = fig
 
     # Find sports that are no longer played in the Olympics
-    with col2:
-        # Find the most recent year for each sport and whether it's a Summer or Winter Olympics
-        latest_year = data.groupby(["Sport", "Season"])["Year"].max().reset_index()
+    # Find the most recent year for each sport and whether it's a Summer or Winter Olympics
+    latest_year = (
+        athletes.groupby(["Sport", "Season"], observed=True)["Year"].max().reset_index()
+    )
 
-        # Find the most recent year for Summer and Winter Olympics
-        latest_summer_year = data[data["Season"] == "Summer"]["Year"].max()
-        latest_winter_year = data[data["Season"] == "Winter"]["Year"].max()
+    # Find the most recent year for Summer and Winter Olympics
+    latest_summer_year = athletes[athletes["Season"] == "Summer"]["Year"].max()
+    latest_winter_year = athletes[athletes["Season"] == "Winter"]["Year"].max()
 
-        # Filter sports that are no longer played in Summer Olympics
-        discontinued_summer_sports = latest_year[
-            (latest_year["Year"] < latest_summer_year)
-            & (latest_year["Season"] == "Summer")
-        ]
+    # Filter sports that are no longer played in Summer Olympics
+    discontinued_summer_sports = latest_year[
+        (latest_year["Year"] < latest_summer_year) & (latest_year["Season"] == "Summer")
+    ]
 
-        # Filter sports that are no longer played in Winter Olympics
-        discontinued_winter_sports = latest_year[
-            (latest_year["Year"] < latest_winter_year)
-            & (latest_year["Season"] == "Winter")
-        ]
+    # Filter sports that are no longer played in Winter Olympics
+    discontinued_winter_sports = latest_year[
+        (latest_year["Year"] < latest_winter_year) & (latest_year["Season"] == "Winter")
+    ]
 
-        # Calculate years since each sport was last played
-        discontinued_summer_sports.loc[:, "Years desde la última vez que se jugó"] = (
-            latest_summer_year - discontinued_summer_sports["Year"]
-        )
-        discontinued_winter_sports.loc[:, "Years desde la última vez que se jugó"] = (
-            latest_winter_year - discontinued_winter_sports["Year"]
-        )
+    # Calculate years since each sport was last played
+    discontinued_summer_sports.loc[:, "Years desde la última vez que se jugó"] = (
+        latest_summer_year - discontinued_summer_sports["Year"]
+    )
+    discontinued_winter_sports.loc[:, "Years desde la última vez que se jugó"] = (
+        latest_winter_year - discontinued_winter_sports["Year"]
+    )
 
-        # Concatenate the two dataframes and create a new column for the type of sport
-        discontinued_sports = pd.concat(
-            [
-                discontinued_summer_sports.assign(Tipo="Summer"),
-                discontinued_winter_sports.assign(Tipo="Winter"),
-            ]
-        )
+    # Concatenate the two dataframes and create a new column for the type of sport
+    discontinued_sports = pd.concat(
+        [
+            discontinued_summer_sports.assign(Tipo="Summer"),
+            discontinued_winter_sports.assign(Tipo="Winter"),
+        ]
+    )
 
-        # Sort the dataframe by the "Years desde la última vez que se jugó" column
-        discontinued_sports = discontinued_sports.sort_values(
-            "Years desde la última vez que se jugó"
-        )
+    # Sort the dataframe by the "Years desde la última vez que se jugó" column
+    discontinued_sports = discontinued_sports.sort_values(
+        "Years desde la última vez que se jugó"
+    )
 
-        # Create a bar plot
-        fig = px.bar(
-            discontinued_sports,
-            x="Years desde la última vez que se jugó",
-            y="Sport",
-            color="Tipo",
-            color_discrete_map={"Summer": "khaki", "Winter": "lightblue"},
-            orientation="h",
-            title="Deportes que ya no se juegan en los Juegos Olímpicos",
-            text="Year",
-            text_auto=True,
-        )
+    # Create a bar plot
+    fig = px.bar(
+        discontinued_sports,
+        x="Years desde la última vez que se jugó",
+        y="Sport",
+        color="Tipo",
+        color_discrete_map={"Summer": "khaki", "Winter": "lightblue"},
+        orientation="h",
+        title="Deportes que ya no se juegan en los Juegos Olímpicos",
+        text="Year",
+        text_auto=True,
+    )
 
-        st.plotly_chart(fig)
+    figures["discontinued_sports"] = fig
+    return figures
@@ -1,83 +1,53 @@
 import plotly.express as px
 import streamlit as st
 
+from figure_cache import cached_figure
+from world_geometry import map_config
 
-def get_population_charts(data):
-    st.markdown("## :blue[Otros gráficos de interés]")
-    col1, col2 = st.columns(2)
 
-    # Calculate the global minimum and maximum population
-    global_min = data["Count"].min()
-    global_max = data["Count"].max()
+def population_map(data, year):
+    # Choropleth map of a year, on the color scale of every year
+    fig = px.choropleth(
+        data[data["Year"] == year],
+        locations="Code",
+        color="Count",
+        labels={"Count": "Población"},
+        title=f"Población del mundo en {year}",
+        hover_name="Country Name",
+        color_continuous_scale="Mint",
+        range_color=[data["Count"].min(), data["Count"].max()],
+    )
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="Black",
+        showcoastlines=False,
+    )
+    return fig
+
 
-    # Create a choropleth map for the oldest year
-    with col1:
-        oldest_year = data["Year"].min()
-        data_oldest_year = data[data["Year"] == oldest_year]
-        fig = px.choropleth(
-            data_oldest_year,
-            locations="Code",
-            color="Count",
-            labels={"Count": "Población"},
-            title=f"Población del mundo en {oldest_year}",
-            hover_name="Country Name",
-            color_continuous_scale="Mint",
-            range_color=[global_min, global_max],
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig)
+def population_top_10(data, year):
+    # Bar chart of the 10 countries with the most population in a year
+    return px.bar(
+        data[data["Year"] == year].sort_values("Count", ascending=False).head(10),
+        x="Count",
+        y="Country Name",
+        orientation="h",
+        labels={"Count": "Población", "Country Name": "País"},
+        text_auto=True,
+        title=f"Top 10 países con mayor población en {year}",
+    )
 
-        # Show the top 10 countries with the most population in the oldest year as a bar chart
-        top_10_oldest_year = data_oldest_year.sort_values(
-            "Count", ascending=False
-        ).head(10)
-        fig = px.bar(
-            top_10_oldest_year,
-            x="Count",
-            y="Country Name",
-            orientation="h",
-            labels={"Count": "Población", "Country Name": "País"},
-            text_auto=True,
-            title=f"Top 10 países con mayor población en {oldest_year}",
-        )
-        st.plotly_chart(fig, use_container_width=True)
 
-    # Create a choropleth map for the latest year
-    with col2:
-        latest_year = data["Year"].max()
-        data_latest_year = data[data["Year"] == latest_year]
-        fig = px.choropleth(
-            data_latest_year,
-            locations="Code",
-            color="Count",
-            labels={"Count": "Población"},
-            title=f"Población del mundo en {latest_year}",
-            hover_name="Country Name",
-            color_continuous_scale="Mint",
-            range_color=[global_min, global_max],
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig)
+def get_population_charts(data, version):
+    st.markdown("## :blue[Otros gráficos de interés]")
+    col1, col2 = st.columns(2)
+
+    # Oldest and latest year. Figures are cached on disk by dataset version
+    # (figure_cache.py)
+    for column, year in ((col1, data["Year"].min()), (col2, data["Year"].max())):
+        with column:
+            fig = cached_figure(population_map, version, data, year)
+            st.plotly_chart(fig, config=map_config())
 
-        # Show the top 10 countries with the most population in the latest year as a bar chart
-        top_10_latest_year = data_latest_year.sort_values(
-            "Count", ascending=False
-        ).head(10)
-        fig = px.bar(
-            top_10_latest_year,
-            x="Count",
-            y="Country Name",
-            orientation="h",
-            labels={"Count": "Población", "Country Name": "País"},
-            text_auto=True,
-            title=f"Top 10 países con mayor población en {latest_year}",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            fig = cached_figure(population_top_10, version, data, year)
+            st.plotly_chart(fig, use_container_width=True)
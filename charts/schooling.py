@@ -2,109 +2,82 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from figure_cache import cached_figure
+from world_geometry import map_config
 
-@st.cache_data
-def get_schooling_charts(data):
-    st.markdown("## :blue[Otros gráficos de interés]")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        # Find the earliest year in the data
-        earliest_year = data["Year"].min()
-
-        # Filter the data to only include the earliest year
-        data_earliest_year = data[data["Year"] == earliest_year]
-
-        # Add a choropleth map showing the expected years of schooling
-        fig = px.choropleth(
-            data_earliest_year,
-            title="Expected Years of Schooling (years) (1990)",
-            locations="Entity",
-            locationmode="country names",
-            color="Expected Years of Schooling (years)",
-            hover_name="Entity",
-            color_continuous_scale="Viridis",
-            range_color=(5, 20),
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+SCHOOLING = "Expected Years of Schooling (years)"
 
-        # Add a bar chart showing the top countries with the highest expected years of schooling in 1990
-        fig = px.bar(
-            data_earliest_year.nlargest(10, "Expected Years of Schooling (years)"),
-            x="Expected Years of Schooling (years)",
-            y="Entity",
-            title="Top 10 países con mayor Expected Years of Schooling (years) (1990)",
-            orientation="h",
-            text="Expected Years of Schooling (years)",
-        )
-        st.plotly_chart(fig, use_container_width=True)
 
-    with col2:
-        # Find the latest year in the data
-        latest_year = data["Year"].max()
-
-        # Filter the data to only include the latest year
-        data_latest_year = data[data["Year"] == latest_year]
-
-        # Add a choropleth map showing the expected years of schooling
-        fig = px.choropleth(
-            data_latest_year,
-            title="Expected Years of Schooling (years) (2017)",
-            locations="Entity",
-            locationmode="country names",
-            color="Expected Years of Schooling (years)",
-            hover_name="Entity",
-            color_continuous_scale="Viridis",
-            range_color=(5, 20),
-        )
-        fig.update_geos(
-            showcountries=True,
-            countrycolor="Black",
-            showcoastlines=False,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+def schooling_map(data, year):
+    # Choropleth map of the expected years of schooling in a year
+    fig = px.choropleth(
+        data[data["Year"] == year],
+        title=f"{SCHOOLING} ({year})",
+        locations="Code",
+        locationmode="ISO-3",
+        color=SCHOOLING,
+        hover_name="Entity",
+        color_continuous_scale="Viridis",
+        range_color=(5, 20),
+    )
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="Black",
+        showcoastlines=False,
+    )
+    return fig
 
-        # Add a bar chart showing the top countries with the highest expected years of schooling in 2017
-        fig = px.bar(
-            data_latest_year.nlargest(10, "Expected Years of Schooling (years)"),
-            x="Expected Years of Schooling (years)",
-            y="Entity",
-            title="Top 10 países con mayor Expected Years of Schooling (years) (2017)",
-            orientation="h",
-            text="Expected Years of Schooling (years)",
-        )
-        st.plotly_chart(fig, use_container_width=True)
 
-    # Identify the top 10 countries in 1990 and 2017
-    top_countries_1990 = data_earliest_year.nlargest(
-        10, "Expected Years of Schooling (years)"
-    )["Entity"]
-    top_countries_2017 = data_latest_year.nlargest(
-        10, "Expected Years of Schooling (years)"
-    )["Entity"]
+def schooling_top_10(data, year):
+    # Bar chart of the countries with the highest expected years of schooling
+    return px.bar(
+        data[data["Year"] == year].nlargest(10, SCHOOLING),
+        x=SCHOOLING,
+        y="Entity",
+        title=f"Top 10 países con mayor {SCHOOLING} ({year})",
+        orientation="h",
+        text=SCHOOLING,
+    )
 
-    # Combine the two sets of countries
-    top_countries = pd.concat([top_countries_1990, top_countries_2017]).unique()
 
-    # Filter the original data to only include these countries
-    data_top_countries = data[data["Entity"].isin(top_countries)]
+def schooling_lines(data, earliest_year, latest_year):
+    # Line chart of the top 10 countries of the earliest and the latest year
+    top_countries = pd.concat(
+        [
+            data[data["Year"] == year].nlargest(10, SCHOOLING)["Entity"]
+            for year in (earliest_year, latest_year)
+        ]
+    ).unique()
 
-    # Create a line chart
-    fig = px.line(
-        data_top_countries,
+    return px.line(
+        data[data["Entity"].isin(top_countries)],
         x="Year",
-        y="Expected Years of Schooling (years)",
+        y=SCHOOLING,
         color="Entity",
-        title="Diferencia en Expected Years of Schooling (years) entre 1990 y 2017",
+        title=f"Diferencia en {SCHOOLING} entre {earliest_year} y {latest_year}",
         labels={
             "Year": "Year",
-            "Expected Years of Schooling (years)": "Expected Years of Schooling (years)",
+            SCHOOLING: SCHOOLING,
             "Entity": "Entity",
         },
     )
+
+
+def get_schooling_charts(data, version):
+    st.markdown("## :blue[Otros gráficos de interés]")
+    col1, col2 = st.columns(2)
+
+    earliest_year = data["Year"].min()
+    latest_year = data["Year"].max()
+
+    # Figures are cached on disk by dataset version (figure_cache.py)
+    for column, year in ((col1, earliest_year), (col2, latest_year)):
+        with column:
+            fig = cached_figure(schooling_map, version, data, year)
+            st.plotly_chart(fig, use_container_width=True, config=map_config())
+
+            fig = cached_figure(schooling_top_10, version, data, year)
+            st.plotly_chart(fig, use_container_width=True)
+
+    fig = cached_figure(schooling_lines, version, data, earliest_year, latest_year)
     st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_store import DATASETS_DIR, STORE_DIR, dataset_hash, write_parquet
+
+KEY = ["Code", "Year"]
+
+# The merged table has one row per row of the base, in its order
+BASE = "population_total_long-cleaned.csv"
+MERGED = "country-data-merged.csv"
+
+# Indicator sources -> column taken from each, in the column order of the
+# merged table (country_data.ipynb)
+INDICATORS = {
+    "human-development-index-cleaned.csv": "Human Development Index (UNDP)",
+    "expected-years-of-schooling-cleaned.csv": "Expected Years of Schooling (years)",
+    "gross-national-income-per-capita-cleaned.csv": "GNI per capita, PPP (constant 2017 international $)",
+}
+
+# Aligned columns are cached on disk next to the Parquet copies of the datasets
+ALIGNED_DIR = os.path.join(STORE_DIR, "aligned")
+
+# Sorted key index of the base -> (content hash, base, index, order)
+_base = None
+
+# Aligned columns keyed by source filename -> (digest, values)
+_columns = {}
+
+_lock = threading.Lock()
+
+
+def read_source(filename, columns):
+    # The raw CSV values, so the merged file keeps the precision of the sources
+    return pd.read_csv(os.path.join(DATASETS_DIR, filename), usecols=columns)
+
+
+def key_index(data):
+    # Sorted (Code, Year) index of the rows and the order that sorts them
+    codes = data["Code"].astype(str).to_numpy()
+    years = data["Year"].to_numpy()
+    order = np.lexsort((years, codes))
+    index = pd.MultiIndex.from_arrays([codes[order], years[order]], names=KEY)
+    return index, order
+
+
+def load_base(filename=BASE):
+    global _base
+    digest = dataset_hash(filename)
+    if _base is None or _base[0] != digest:
+        base = read_source(filename, None)
+        _base = (digest, base, *key_index(base))
+    return _base
+
+
+def align(index, order, source, column):
+    # Values of a source column in the row order of the base; keys missing
+    # from the source stay NaN, like a left merge. A key repeated in the
+    # source keeps its first row
+    source = source.drop_duplicates(subset=KEY)
+    positions = index.get_indexer(
+        pd.MultiIndex.from_arrays(
+            [source["Code"].astype(str).to_numpy(), source["Year"].to_numpy()]
+        )
+    )
+    found = positions >= 0
+
+    in_index_order = np.full(len(index), np.nan)
+    in_index_order[positions[found]] = source[column].to_numpy(dtype="float64")[found]
+
+    aligned = np.empty(len(index))
+    aligned[order] = in_index_order
+    return aligned
+
+
+def aligned_path(filename, digest):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(ALIGNED_DIR, f"{stem}-{digest[:16]}.parquet")
+
+
+def aligned_column(filename, column, base):
+    # A source's column aligned to the base, rebuilt only when the source or
+    # the base changes. Returns it and whether it was rebuilt
+    base_hash, _, index, order = base
+    digest = hashlib.sha256(
+        f"{dataset_hash(filename)}:{base_hash}:{column}".encode()
+    ).hexdigest()
+
+    cached = _columns.get(filename)
+    if cached is not None and cached[0] == digest:
+        return cached[1], False
+
+    path = aligned_path(filename, digest)
+    if os.path.exists(path):
+        values = pd.read_parquet(path, engine="pyarrow")[column].to_numpy()
+        rebuilt = False
+    else:
+        values = align(index, order, read_source(filename, KEY + [column]), column)
+        write_parquet(pd.DataFrame({column: values}), path)
+        rebuilt = True
+
+    _columns[filename] = (digest, values)
+    return values, rebuilt
+
+
+def merge_sources(indicators=INDICATORS, base=BASE):
+    # Base columns plus one aligned column per indicator source. Adding or
+    # removing a source leaves the cached columns of the others untouched.
+    # Returns the merged table and the sources whose column was rebuilt
+    with _lock:
+        base = load_base(base)
+        columns = {}
+        rebuilt = []
+        for filename, column in indicators.items():
+            columns[column], was_rebuilt = aligned_column(filename, column, base)
+            if was_rebuilt:
+                rebuilt.append(filename)
+
+    return base[1].assign(**columns), rebuilt
+
+
+def main():
+    merged, rebuilt = merge_sources()
+    merged.to_csv(os.path.join(DATASETS_DIR, MERGED), index=False)
+
+    for filename in INDICATORS:
+        state = "reconstruida" if filename in rebuilt else "desde caché"
+        print(f"{filename}: columna {state}")
+    print(f"{MERGED}: {len(merged)} filas")
+
+
+if __name__ == "__main__":
+    main()
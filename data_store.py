@@ -0,0 +1,159 @@
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+from schema import SCHEMA_VERSION, apply_schema, get_schema, memory_report
+
+DATASETS_DIR = "datasets"
+
+# Columnar copies of the CSV files live next to the datasets
+STORE_DIR = os.path.join(DATASETS_DIR, ".store")
+
+# In-memory frames keyed by filename -> (fingerprint, DataFrame)
+_frames = {}
+
+# Content hashes keyed by filename -> (fingerprint, digest)
+_hashes = {}
+
+# Load statistics of the latest call for each dataset
+_load_stats = {}
+
+# Memory reports keyed by filename -> (fingerprint, DataFrame)
+_memory_reports = {}
+
+_lock = threading.Lock()
+
+
+def file_fingerprint(path):
+    # Cheap fingerprint based on modification time and size
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def content_hash(path, chunk_size=1 << 20):
+    # SHA-256 of the file contents, read in 1 MiB chunks
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataset_hash(filename):
+    # Content hash of a dataset, recomputed only when its mtime or size changes
+    csv_path = os.path.join(DATASETS_DIR, filename)
+    fingerprint = file_fingerprint(csv_path)
+    cached = _hashes.get(filename)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    digest = content_hash(csv_path)
+    _hashes[filename] = (fingerprint, digest)
+    return digest
+
+
+def schema_hash(filename):
+    # Content hash of a dataset combined with the version of the schema its
+    # columnar copy was written with
+    key = f"{dataset_hash(filename)}-{SCHEMA_VERSION}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def store_path(filename, digest):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(STORE_DIR, f"{stem}-{digest[:16]}.parquet")
+
+
+def write_parquet(data, parquet_path):
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+
+    # Write to a temporary file first so other workers never read a partial file
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    data.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+    os.replace(tmp_path, parquet_path)
+
+    # Remove stale copies of previous versions of the same dataset
+    store_dir, name = os.path.split(parquet_path)
+    stem = name.rsplit("-", 1)[0]
+    for old_name in os.listdir(store_dir):
+        if (
+            old_name != name
+            and old_name.endswith(".parquet")
+            and old_name.rsplit("-", 1)[0] == stem
+        ):
+            os.remove(os.path.join(store_dir, old_name))
+
+
+def _convert_to_parquet(filename, csv_path, parquet_path):
+    # The columnar copy is stored with the compact types of the schema
+    data = pd.read_csv(csv_path)
+    data = apply_schema(data, get_schema(filename, data))
+    write_parquet(data, parquet_path)
+    return data
+
+
+def load_dataset(filename):
+    csv_path = os.path.join(DATASETS_DIR, filename)
+    start = time.perf_counter()
+    fingerprint = file_fingerprint(csv_path)
+
+    with _lock:
+        cached = _frames.get(filename)
+        if cached is not None and cached[0] == fingerprint:
+            _load_stats[filename] = {
+                "source": "memoria",
+                "seconds": time.perf_counter() - start,
+                "bytes_read": 0,
+            }
+            return cached[1]
+
+        # The file changed (or was never loaded): look for its columnar copy
+        digest = schema_hash(filename)
+        parquet_path = store_path(filename, digest)
+        if os.path.exists(parquet_path):
+            data = pd.read_parquet(parquet_path, engine="pyarrow")
+            # Copies written before a schema change are converted on load
+            data = apply_schema(data, get_schema(filename, data))
+            source = "parquet"
+            bytes_read = os.path.getsize(parquet_path)
+        else:
+            data = _convert_to_parquet(filename, csv_path, parquet_path)
+            source = "csv"
+            bytes_read = os.path.getsize(csv_path)
+
+        # Cached functions key on this token instead of hashing the contents
+        data.attrs["version"] = digest
+        _frames[filename] = (fingerprint, data)
+        _load_stats[filename] = {
+            "source": source,
+            "seconds": time.perf_counter() - start,
+            "bytes_read": bytes_read,
+        }
+        return data
+
+
+def dataset_version(data):
+    # Version token of a loaded dataset: the content hash of its file and the
+    # schema version
+    return data.attrs.get("version")
+
+
+def get_load_stats(filename):
+    return _load_stats.get(filename)
+
+
+def get_memory_report(filename):
+    # Memory used by each column with the schema types and with the types
+    # read_csv would infer. Measuring object columns is slow, so the report is
+    # computed once per version of the file
+    data = load_dataset(filename)
+    fingerprint = file_fingerprint(os.path.join(DATASETS_DIR, filename))
+
+    cached = _memory_reports.get(filename)
+    if cached is None or cached[0] != fingerprint:
+        cached = (fingerprint, memory_report(data))
+        _memory_reports[filename] = cached
+    return cached[1]
@@ -0,0 +1,270 @@
+import hashlib
+import os
+import shutil
+import threading
+
+import duckdb
+import pandas as pd
+
+from aggregates import AGGREGATES, MEDALLAS_SQL, aggregate_sizes, route
+from data_store import DATASETS_DIR, STORE_DIR, dataset_hash
+from etl.jobs import INCREMENTAL_JOBS, SOURCES, run_general, run_incremental
+from etl.load import load_table
+
+# Star schema of `script database.sql`, in DuckDB syntax. The foreign key
+# indexes are left out: DuckDB scans the fact tables instead of looking rows up
+SCHEMA_SQL = """
+CREATE TABLE ANIO (
+    IDANIO INTEGER NOT NULL PRIMARY KEY
+);
+
+CREATE TABLE ATLETA (
+    IDATLETA INTEGER NOT NULL PRIMARY KEY,
+    NOMBREATLETA VARCHAR(120) NOT NULL,
+    SEXOATLETA VARCHAR(10) NOT NULL,
+    ANIONACIMIENTO INTEGER NOT NULL
+);
+
+CREATE TABLE CONTINENTE (
+    IDCONTINENTE INTEGER NOT NULL PRIMARY KEY,
+    CONTINENTE VARCHAR(120) NOT NULL
+);
+
+CREATE TABLE DEPORTE (
+    IDDEPORTE INTEGER NOT NULL PRIMARY KEY,
+    NOMBREDEPORTE VARCHAR(120) NOT NULL
+);
+
+CREATE TABLE ENTIDAD (
+    IDENTIDAD INTEGER NOT NULL PRIMARY KEY,
+    IDCONTINENTE INTEGER NOT NULL REFERENCES CONTINENTE (IDCONTINENTE),
+    ENTIDAD VARCHAR(60) NOT NULL,
+    ALPHA3ENTIDAD VARCHAR(3) NOT NULL,
+    NOCENTIDAD VARCHAR(3) NOT NULL
+);
+
+CREATE TABLE EVENTO_DEPORTIVO (
+    IDEVENTODEPORTIVO INTEGER NOT NULL PRIMARY KEY,
+    NOMBREEVENTO VARCHAR(120) NOT NULL,
+    TEMPORADAEVENTO VARCHAR(120) NOT NULL,
+    CIUDADEVENTO VARCHAR(120) NOT NULL,
+    PAISEVENTO VARCHAR(120) NOT NULL,
+    CODIGOPAISEVENTO VARCHAR(120) NOT NULL
+);
+
+-- IDH keeps the three decimals of the source (DECIMAL(8,2) in the DDL)
+CREATE TABLE METRICAS_ENTIDADES (
+    IDHECHOENTIDAD INTEGER NOT NULL PRIMARY KEY,
+    IDANIO INTEGER NOT NULL REFERENCES ANIO (IDANIO),
+    IDENTIDAD INTEGER NOT NULL REFERENCES ENTIDAD (IDENTIDAD),
+    IDH DECIMAL(8, 3) NOT NULL,
+    ESCOLARIDAD DECIMAL(8, 2) NOT NULL,
+    GNI DECIMAL(8, 2) NOT NULL,
+    POBLACION INTEGER NOT NULL
+);
+
+CREATE TABLE MODALIDAD (
+    IDMODALIDAD INTEGER NOT NULL PRIMARY KEY,
+    IDDEPORTE INTEGER NOT NULL REFERENCES DEPORTE (IDDEPORTE),
+    NOMBREMODALIDAD VARCHAR(120) NOT NULL,
+    CATEGORIA VARCHAR(120) NOT NULL
+);
+
+CREATE TABLE RENDIMIENTO_ATLETICO (
+    IDHECHORENDIMIENTO INTEGER NOT NULL PRIMARY KEY,
+    IDANIO INTEGER NOT NULL REFERENCES ANIO (IDANIO),
+    IDEVENTODEPORTIVO INTEGER NOT NULL REFERENCES EVENTO_DEPORTIVO (IDEVENTODEPORTIVO),
+    IDENTIDAD INTEGER NOT NULL REFERENCES ENTIDAD (IDENTIDAD),
+    IDATLETA INTEGER NOT NULL REFERENCES ATLETA (IDATLETA),
+    IDMODALIDAD INTEGER NOT NULL REFERENCES MODALIDAD (IDMODALIDAD),
+    ESTATURA DECIMAL NOT NULL,
+    PESO INTEGER NOT NULL,
+    IMC DECIMAL NOT NULL,
+    EDAD INTEGER NOT NULL,
+    TIPOPODIO VARCHAR(20) NOT NULL,
+    EQUIPO VARCHAR(120) NOT NULL,
+    RANGOETARIO VARCHAR(120) NOT NULL
+);
+
+-- Fingerprint of the values of each METRICAS_ENTIDADES row, to load only
+-- the rows that changed
+CREATE TABLE HUELLAS_METRICAS (
+    IDENTIDAD INTEGER NOT NULL,
+    IDANIO INTEGER NOT NULL,
+    HUELLA UBIGINT NOT NULL,
+    PRIMARY KEY (IDENTIDAD, IDANIO)
+);
+
+-- Surrogate keys of METRICAS_ENTIDADES. A sequence never hands out a key
+-- again, also after the incremental load deletes the rows that held it
+CREATE SEQUENCE SEQ_HECHOENTIDAD START 1;
+
+-- Roll-ups of RENDIMIENTO_ATLETICO (aggregates.py) and their size
+CREATE TABLE AGREGADOS (
+    TABLA VARCHAR NOT NULL PRIMARY KEY,
+    FILAS BIGINT NOT NULL
+);
+
+-- Watermark of each source: the content hash last loaded and when
+CREATE TABLE FUENTES (
+    ARCHIVO VARCHAR NOT NULL PRIMARY KEY,
+    HASH VARCHAR NOT NULL,
+    CARGADO TIMESTAMP NOT NULL
+);
+"""
+
+# (version, read-only connection, roll-up sizes) of this process
+_connection = None
+
+_lock = threading.Lock()
+
+# Changes with the definition of the tables, views and roll-ups
+SCHEMA_HASH = hashlib.sha256(
+    f"{SCHEMA_SQL}{MEDALLAS_SQL}{AGGREGATES}".encode()
+).hexdigest()[:8]
+
+
+def source_hashes():
+    return {
+        filename: dataset_hash(filename)
+        for filename in SOURCES.values()
+        if os.path.exists(os.path.join(DATASETS_DIR, filename))
+    }
+
+
+def datamart_version():
+    # Changes whenever one of the sources is added, removed or modified
+    digest = hashlib.sha256()
+    for filename, file_hash in sorted(source_hashes().items()):
+        digest.update(f"{filename}:{file_hash}\n".encode())
+    return digest.hexdigest()
+
+
+def datamart_path(version):
+    # Datamarts of another schema are never reused, even for the same sources
+    return os.path.join(STORE_DIR, f"datamart-{SCHEMA_HASH}-{version[:16]}.duckdb")
+
+
+def previous_datamart(path):
+    # Most recent datamart of another version of the sources, if any
+    store_dir, name = os.path.split(path)
+    paths = [
+        os.path.join(store_dir, old_name)
+        for old_name in os.listdir(store_dir)
+        if old_name != name
+        and old_name.startswith(f"datamart-{SCHEMA_HASH}-")
+        and old_name.endswith(".duckdb")
+    ]
+    return max(paths, key=os.path.getmtime, default=None)
+
+
+def record_sources(con, hashes, filenames):
+    # Moves the watermarks of the given sources to their current hash
+    con.execute(
+        f"DELETE FROM FUENTES WHERE ARCHIVO IN ({', '.join('?' * len(filenames))})",
+        filenames,
+    )
+    load_table(
+        con,
+        "FUENTES",
+        pd.DataFrame(
+            {
+                "ARCHIVO": filenames,
+                "HASH": [hashes[filename] for filename in filenames],
+                "CARGADO": pd.Timestamp.now(),
+            }
+        ),
+    )
+
+
+def changed_sources(con, hashes):
+    # Names of the sources added, removed or modified since the last load
+    loaded = dict(con.execute("SELECT ARCHIVO, HASH FROM FUENTES").fetchall())
+    return [
+        name
+        for name, filename in SOURCES.items()
+        if loaded.get(filename) != hashes.get(filename)
+    ]
+
+
+def refresh_datamart(previous, tmp_path, hashes, method):
+    # Applies the changed sources to a copy of the previous datamart. Returns
+    # None when one of them needs a full build
+    shutil.copyfile(previous, tmp_path)
+    with duckdb.connect(tmp_path) as con:
+        changed = changed_sources(con, hashes)
+        if changed and all(
+            name in INCREMENTAL_JOBS and SOURCES[name] in hashes for name in changed
+        ):
+            log = run_incremental(con, changed, method)
+            record_sources(con, hashes, [SOURCES[name] for name in changed])
+            return log
+
+    os.remove(tmp_path)
+    return None
+
+
+def build_datamart(path, method="arrow"):
+    # Returns the log of the ETL run
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Build into a temporary file, so other workers never open a partial one
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    hashes = source_hashes()
+    previous = previous_datamart(path)
+    log = refresh_datamart(previous, tmp_path, hashes, method) if previous else None
+
+    if log is None:
+        with duckdb.connect(tmp_path) as con:
+            con.execute(SCHEMA_SQL)
+            log = run_general(con, method)
+            record_sources(con, hashes, sorted(hashes))
+    os.replace(tmp_path, path)
+
+    # Remove the datamarts of previous versions of the sources
+    store_dir, name = os.path.split(path)
+    for old_name in os.listdir(store_dir):
+        if (
+            old_name != name
+            and old_name.startswith("datamart-")
+            and old_name.endswith(".duckdb")
+        ):
+            os.remove(os.path.join(store_dir, old_name))
+
+    return log
+
+
+def open_datamart():
+    # One read-only connection per process, reopened when a source changes.
+    # Returns it with the size of each roll-up
+    global _connection
+    version = datamart_version()
+
+    with _lock:
+        if _connection is not None and _connection[0] == version:
+            return _connection[1:]
+
+        path = datamart_path(version)
+        if not os.path.exists(path):
+            build_datamart(path)
+
+        if _connection is not None:
+            _connection[1].close()
+        con = duckdb.connect(path, read_only=True)
+        _connection = (version, con, aggregate_sizes(con))
+        return _connection[1:]
+
+
+def get_connection():
+    return open_datamart()[0]
+
+
+def query(sql, params=None):
+    # Queries over MEDALLAS are answered from the smallest roll-up that can.
+    # Each query gets its own cursor, so threads do not share a result set
+    con, sizes = open_datamart()
+    with con.cursor() as cursor:
+        return cursor.execute(route(sql, sizes), params).df()
@@ -0,0 +1,157 @@
+import os
+import threading
+
+import pandas as pd
+
+from data_store import DATASETS_DIR, content_hash, dataset_hash, load_dataset
+from statistics_calc import (
+    descriptors,
+    generate_domain_df,
+    generate_range_df,
+    qualitative_stats,
+)
+from streaming_stats import profile_file
+
+DESCRIPTORS_DIR = "descriptors"
+
+ARTIFACTS = ("quantitative", "qualitative", "domain", "range")
+
+# Files above this size are profiled in chunks (streaming_stats.py) instead of
+# being loaded whole. Their quartiles, distinct counts and modes are estimates
+STREAMING_MIN_BYTES = 256 * 1024 * 1024
+
+# Code the tables depend on besides the dataset: the column types and the
+# statistics. Editing either makes every stored table stale
+CODE_FILES = ("schema.py", "statistics_calc.py", "streaming_stats.py")
+
+# Content hashes of CODE_FILES, computed once per process
+_code_hashes = None
+
+
+def artifact_path(filename, kind):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(DESCRIPTORS_DIR, f"{stem}-{kind}.csv")
+
+
+def hash_path(filename):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(DESCRIPTORS_DIR, f"{stem}.sha256")
+
+
+def code_hashes():
+    global _code_hashes
+    if _code_hashes is None:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        _code_hashes = [
+            (content_hash(os.path.join(base_dir, name)), name) for name in CODE_FILES
+        ]
+    return _code_hashes
+
+
+def expected_hashes(filename):
+    # The hash file uses the `sha256sum` format, one "<digest>  <path>" line
+    # for the dataset and for each of CODE_FILES
+    lines = [f"{dataset_hash(filename)}  {DATASETS_DIR}/{filename}"]
+    lines += [f"{digest}  {name}" for digest, name in code_hashes()]
+    return "\n".join(lines) + "\n"
+
+
+def stored_hashes(filename):
+    try:
+        with open(hash_path(filename)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def is_stale(filename):
+    return stored_hashes(filename) != expected_hashes(filename)
+
+
+def write_text(path, text):
+    # Written to a temporary file first so a concurrent session never reads a
+    # partial table. Sessions are threads of the same process, hence the
+    # thread id in the name
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def compute_descriptors(data):
+    qualitative_vars = data.select_dtypes(include=["object", "category"]).columns
+    return {
+        "quantitative": descriptors(data),
+        "qualitative": qualitative_stats(data, qualitative_vars.tolist()),
+        "domain": generate_domain_df(data),
+        "range": generate_range_df(data),
+    }
+
+
+def stream_descriptors(path):
+    profiler = profile_file(path)
+    return {
+        "quantitative": profiler.descriptors(),
+        "qualitative": profiler.qualitative_stats(),
+        "domain": profiler.domain_df(),
+        "range": profiler.range_df(),
+    }
+
+
+def build_descriptors(filename):
+    csv_path = os.path.join(DATASETS_DIR, filename)
+    if os.path.getsize(csv_path) >= STREAMING_MIN_BYTES:
+        tables = stream_descriptors(csv_path)
+    else:
+        tables = compute_descriptors(load_dataset(filename))
+
+    os.makedirs(DESCRIPTORS_DIR, exist_ok=True)
+    write_text(
+        artifact_path(filename, "quantitative"),
+        tables["quantitative"].to_csv(decimal=","),
+    )
+    for kind in ("qualitative", "domain", "range"):
+        write_text(
+            artifact_path(filename, kind), tables[kind].to_csv(index=False, decimal=",")
+        )
+
+    # Written last, so an interrupted build is detected as stale
+    write_text(hash_path(filename), expected_hashes(filename))
+
+    return tables
+
+
+def load_descriptors(filename):
+    # Serve the precomputed tables while the source file and the code that
+    # computes them are unchanged
+    if is_stale(filename):
+        return build_descriptors(filename)
+
+    tables = {
+        "quantitative": pd.read_csv(
+            artifact_path(filename, "quantitative"), index_col=0, decimal=","
+        )
+    }
+    for kind in ("qualitative", "domain", "range"):
+        tables[kind] = pd.read_csv(artifact_path(filename, kind), decimal=",")
+    return tables
+
+
+def main():
+    from app import CHOSEN_DATASETS, OTHER_DATASETS
+
+    for title, filename in {**CHOSEN_DATASETS, **OTHER_DATASETS}.items():
+        if not os.path.exists(os.path.join(DATASETS_DIR, filename)):
+            print(f"Omitido {title}: no existe {DATASETS_DIR}/{filename}")
+            continue
+
+        if not is_stale(filename):
+            print(f"Sin cambios {title}")
+            continue
+
+        build_descriptors(filename)
+        print(f"Generado {title}")
+
+
+if __name__ == "__main__":
+    main()
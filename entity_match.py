@@ -0,0 +1,279 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from data_store import DATASETS_DIR, STORE_DIR, dataset_hash, write_parquet
+
+# Official ISO 3166 names -> ISO-3 codes the names are matched against
+REFERENCE = "iso_codes.csv"
+
+# Name columns of the OWID and World Bank sources
+SOURCES = {
+    "human-development-index.csv": "Entity",
+    "expected-years-of-schooling.csv": "Entity",
+    "gross-national-income-per-capita.csv": "Entity",
+    "population_total_long.csv": "Country Name",
+}
+
+# The only names resolved by hand: the matcher cannot tell them apart from a
+# similar name, or their ISO name shares too little with them. A bare "Korea"
+# is the Republic of Korea, as in the HDI and World Bank sources
+OVERRIDES = {
+    "Korea": "KOR",
+    "North Korea": "PRK",
+    "Laos": "LAO",
+    "Lao PDR": "LAO",
+    "Macao SAR, China": "MAC",
+    "West Bank and Gaza": "PSE",
+}
+
+# Continents, regions and country groups of the sources. They never resolve,
+# even when they look like a country ("Africa" / "South Africa"). Compared
+# after normalize(), so "&" and "and" or a different case are the same name.
+# The small-state groups have a code of their own in the reference and are
+# left out
+AGGREGATES = {
+    "Africa",
+    "Africa Eastern and Southern",
+    "Africa Western and Central",
+    "Americas",
+    "Arab World",
+    "Asia",
+    "Central Europe and the Baltics",
+    "Early-demographic dividend",
+    "East Asia & Pacific",
+    "East Asia & Pacific (IDA & IBRD)",
+    "East Asia & Pacific (excluding high income)",
+    "Euro area",
+    "Europe",
+    "Europe & Central Asia",
+    "Europe & Central Asia (IDA & IBRD)",
+    "Europe & Central Asia (excluding high income)",
+    "European Union",
+    "Fragile and conflict affected situations",
+    "Heavily indebted poor countries (HIPC)",
+    "High income",
+    "IBRD only",
+    "IDA & IBRD total",
+    "IDA blend",
+    "IDA only",
+    "IDA total",
+    "Late-demographic dividend",
+    "Latin America",
+    "Latin America & Caribbean",
+    "Latin America & Caribbean (IDA & IBRD)",
+    "Latin America & Caribbean (excluding high income)",
+    "Least developed countries: UN classification",
+    "Low & middle income",
+    "Low income",
+    "Lower middle income",
+    "Micronesia (region)",
+    "Middle East & North Africa",
+    "Middle East & North Africa (IDA & IBRD)",
+    "Middle East & North Africa (excluding high income)",
+    "Middle income",
+    "North America",
+    "Oceania",
+    "OECD members",
+    "Post-demographic dividend",
+    "Pre-demographic dividend",
+    "South America",
+    "South Asia",
+    "South Asia (IDA & IBRD)",
+    "Sub-Saharan Africa",
+    "Sub-Saharan Africa (IDA & IBRD)",
+    "Sub-Saharan Africa (excluding high income)",
+    "Upper middle income",
+    "World",
+}
+
+# Size of the character n-grams used to block and score candidates
+NGRAM = 3
+
+# Minimum score of a match; names below it stay unresolved
+MIN_SCORE = 0.45
+
+# Words that do not tell countries apart ("Korea, Rep." / "Korea, Republic of")
+STOPWORDS = {"and", "of", "the", "rep", "republic", "st", "saint"}
+
+# Resolved mappings are cached next to the Parquet copies of the datasets
+LOOKUP_DIR = os.path.join(STORE_DIR, "lookups")
+
+# (reference digest, NameIndex), built once per process
+_index = None
+
+# Resolved mappings keyed by source filename -> (digest, mapping)
+_resolved = {}
+
+_lock = threading.Lock()
+
+
+def normalize(name):
+    # Lowercase ASCII words without punctuation or stopwords
+    name = unicodedata.normalize("NFKD", str(name))
+    name = name.encode("ascii", "ignore").decode().lower()
+    words = re.findall(r"[a-z]{2,}", name)
+    return " ".join(word for word in words if word not in STOPWORDS)
+
+
+def ngrams(text, n=NGRAM):
+    padded = f" {text} "
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+class NameIndex:
+    # Inverted index from character n-grams to the reference names that
+    # contain them. A name is only scored against the references it shares
+    # an n-gram with (its block), not against every reference
+
+    def __init__(self, names, codes):
+        self.names = list(names)
+        self.codes = list(codes)
+        self.grams = [ngrams(normalize(name)) for name in self.names]
+        self.blocks = defaultdict(list)
+        for position, grams in enumerate(self.grams):
+            for gram in grams:
+                self.blocks[gram].append(position)
+
+    def score(self, grams, position):
+        # Mean of the Dice coefficient and of the share of the name's n-grams
+        # found in the reference, so a short name ("Iran") matches its longer
+        # official form ("Iran (Islamic Republic of)") over a similar one
+        common = len(grams & self.grams[position])
+        dice = 2 * common / (len(grams) + len(self.grams[position]))
+        return (dice + common / len(grams)) / 2
+
+    def match(self, name):
+        # (reference position, score) of the best candidate of the block
+        grams = ngrams(normalize(name))
+        candidates = {position for gram in grams for position in self.blocks[gram]}
+        best, best_score = -1, 0.0
+        for position in sorted(candidates):
+            score = self.score(grams, position)
+            if score > best_score:
+                best, best_score = position, score
+        return best, best_score
+
+    def resolve(self, names, overrides=OVERRIDES, aggregates=AGGREGATES):
+        # Mapping of the distinct names to ISO-3 codes, with the matched
+        # reference name and score. Overrides win, aggregates never resolve
+        # and weak matches stay NaN
+        aggregates = {normalize(aggregate) for aggregate in aggregates}
+        rows = []
+        for name in pd.unique(pd.Series(names).dropna().astype(str)):
+            position, score = self.match(name)
+            reference = self.names[position] if position >= 0 else None
+            if name in overrides:
+                iso, method = overrides[name], "manual"
+            elif normalize(name) in aggregates:
+                iso, method = None, "agregado"
+            elif score >= MIN_SCORE:
+                iso, method = self.codes[position], "fuzzy"
+            else:
+                iso, method = None, "sin resolver"
+            rows.append(
+                {
+                    "name": name,
+                    "ISO": iso,
+                    "reference": reference,
+                    "score": score,
+                    "method": method,
+                }
+            )
+        return pd.DataFrame(
+            rows, columns=["name", "ISO", "reference", "score", "method"]
+        )
+
+
+def load_index():
+    global _index
+    digest = dataset_hash(REFERENCE)
+    if _index is None or _index[0] != digest:
+        reference = pd.read_csv(os.path.join(DATASETS_DIR, REFERENCE))
+        _index = (digest, NameIndex(reference["name"], reference["ISO"]))
+    return _index[1]
+
+
+def mapping_digest(filename):
+    # Changes with the source, the reference, the hand-made lists and the
+    # settings
+    key = ":".join(
+        [
+            dataset_hash(filename),
+            dataset_hash(REFERENCE),
+            repr(sorted(OVERRIDES.items())),
+            repr(sorted(AGGREGATES)),
+            repr((NGRAM, MIN_SCORE, sorted(STOPWORDS))),
+        ]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def mapping_path(filename, digest):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(LOOKUP_DIR, f"{stem}-names-{digest[:16]}.parquet")
+
+
+def resolve_source(filename, column=None):
+    # Name -> ISO-3 mapping of every distinct name of a source, matched in
+    # one batch and cached until the source or the matcher changes
+    column = column or SOURCES[filename]
+    with _lock:
+        digest = mapping_digest(filename)
+        cached = _resolved.get(filename)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        path = mapping_path(filename, digest)
+        if os.path.exists(path):
+            mapping = pd.read_parquet(path, engine="pyarrow")
+        else:
+            names = pd.read_csv(os.path.join(DATASETS_DIR, filename), usecols=[column])
+            mapping = load_index().resolve(names[column])
+            write_parquet(mapping, path)
+
+        _resolved[filename] = (digest, mapping)
+        return mapping
+
+
+def resolve_names(names, mapping):
+    # ISO-3 code of each row through a resolved mapping
+    codes = mapping.set_index("name")["ISO"]
+    positions = codes.index.get_indexer(names.astype(str))
+    return pd.Series(
+        np.append(codes.to_numpy(dtype=object), np.nan)[positions],
+        index=names.index,
+        dtype=object,
+    )
+
+
+def resolve_column(names):
+    # ISO-3 code of each row of a name column, for names that are not the raw
+    # values of a source (e.g. renamed in a notebook)
+    return resolve_names(names, load_index().resolve(names))
+
+
+def main():
+    for filename, column in SOURCES.items():
+        mapping = resolve_source(filename, column)
+        counts = mapping["method"].value_counts()
+        print(
+            f"{filename} ({column}): {len(mapping)} nombres, "
+            f"{counts.get('fuzzy', 0)} automáticos, "
+            f"{counts.get('manual', 0)} manuales, "
+            f"{counts.get('agregado', 0)} agregados, "
+            f"{counts.get('sin resolver', 0)} sin resolver"
+        )
+        unresolved = mapping.loc[mapping["method"] == "sin resolver", "name"]
+        if len(unresolved):
+            print("  sin resolver:", ", ".join(unresolved))
+
+
+if __name__ == "__main__":
+    main()
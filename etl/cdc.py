@@ -0,0 +1,110 @@
+import pandas as pd
+
+from etl.load import load_table
+
+# Natural key of the entity metrics and the values fingerprinted per row
+METRICS_KEY = ["IDENTIDAD", "IDANIO"]
+METRICS_VALUES = ["IDH", "ESCOLARIDAD", "GNI", "POBLACION"]
+
+# Fingerprints of the rows loaded in METRICAS_ENTIDADES
+STORED_SQL = """
+SELECT h.IDENTIDAD, h.IDANIO, h.HUELLA, m.IDHECHOENTIDAD
+FROM HUELLAS_METRICAS h
+JOIN METRICAS_ENTIDADES m ON h.IDENTIDAD = m.IDENTIDAD AND h.IDANIO = m.IDANIO
+"""
+
+UPDATE_SQL = """
+UPDATE METRICAS_ENTIDADES AS m
+SET IDH = c.IDH, ESCOLARIDAD = c.ESCOLARIDAD, GNI = c.GNI, POBLACION = c.POBLACION
+FROM cambios AS c
+WHERE m.IDENTIDAD = c.IDENTIDAD AND m.IDANIO = c.IDANIO;
+
+UPDATE HUELLAS_METRICAS AS h
+SET HUELLA = c.HUELLA
+FROM cambios AS c
+WHERE h.IDENTIDAD = c.IDENTIDAD AND h.IDANIO = c.IDANIO;
+"""
+
+DELETE_SQL = """
+DELETE FROM METRICAS_ENTIDADES AS m
+USING borrados AS b
+WHERE m.IDENTIDAD = b.IDENTIDAD AND m.IDANIO = b.IDANIO;
+
+DELETE FROM HUELLAS_METRICAS AS h
+USING borrados AS b
+WHERE h.IDENTIDAD = b.IDENTIDAD AND h.IDANIO = b.IDANIO;
+"""
+
+
+# Next surrogate keys of METRICAS_ENTIDADES (SEQ_HECHOENTIDAD in datamart.py)
+NEXT_IDS_SQL = "SELECT nextval('SEQ_HECHOENTIDAD') AS ID FROM range(?) ORDER BY ID"
+
+
+def row_fingerprints(metrics):
+    # The values are widened first, so a column that gains or loses missing
+    # values (int <-> float) does not change every fingerprint
+    values = metrics[METRICS_VALUES].astype("float64")
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def metrics_changes(metrics, stored):
+    # Splits the rows of metricas_entidades_table into new, changed and
+    # removed ones by comparing their fingerprints with the stored ones
+    metrics = metrics.drop(columns="IDHECHOENTIDAD").assign(
+        HUELLA=row_fingerprints(metrics)
+    )
+
+    # Left joins keep the source order, so new rows get their keys in it
+    current = metrics.merge(
+        stored, on=METRICS_KEY, how="left", suffixes=("", "_CARGADA"), indicator=True
+    )
+    inserted = current[current["_merge"] == "left_only"]
+    updated = current[
+        (current["_merge"] == "both") & (current["HUELLA"] != current["HUELLA_CARGADA"])
+    ]
+
+    loaded = stored.merge(
+        metrics[METRICS_KEY], on=METRICS_KEY, how="left", indicator=True
+    )
+    deleted = loaded[loaded["_merge"] == "left_only"]
+
+    return (
+        inserted[metrics.columns],
+        updated[metrics.columns],
+        deleted[METRICS_KEY],
+    )
+
+
+def upsert_metricas(con, metrics, method="arrow"):
+    # Writes only the new, changed and removed rows. Returns the counters of
+    # the step log
+    stored = con.execute(STORED_SQL).df()
+    inserted, updated, deleted = metrics_changes(metrics, stored)
+
+    if len(deleted):
+        con.register("borrados", deleted)
+        try:
+            con.execute(DELETE_SQL)
+        finally:
+            con.unregister("borrados")
+
+    if len(updated):
+        con.register("cambios", updated)
+        try:
+            con.execute(UPDATE_SQL)
+        finally:
+            con.unregister("cambios")
+
+    if len(inserted):
+        # New rows take fresh surrogate keys from the sequence, so the keys
+        # of deleted rows are never reused
+        ids = con.execute(NEXT_IDS_SQL, [len(inserted)]).df()["ID"].to_numpy()
+        inserted = inserted.assign(IDHECHOENTIDAD=ids)
+        load_table(con, "METRICAS_ENTIDADES", inserted, method)
+        load_table(con, "HUELLAS_METRICAS", inserted, method)
+
+    return {
+        "LINES_WRITTEN": len(inserted),
+        "LINES_UPDATED": len(updated),
+        "LINES_DELETED": len(deleted),
+    }
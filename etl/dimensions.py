@@ -0,0 +1,175 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Range of the time dimension (anio.ktr) and of the entity metrics
+FIRST_YEAR = 1896
+LAST_YEAR = 2016
+FIRST_METRICS_YEAR = 1990
+
+# Placeholders used by the Pentaho transformations for missing values
+MISSING_TEXT = "na"
+NO_CONTINENT = "No continent"
+NO_MEDAL = "Sin Medalla"
+NO_CATEGORY = "Sin categoría"
+
+CATEGORY_PATTERN = r"\b(Men's|Women's|Mixed)\b"
+
+
+def sequence(length):
+    return np.arange(1, length + 1)
+
+
+def anio_table():
+    # anio.ktr: one row per year, generated rather than read
+    return pd.DataFrame({"IDANIO": np.arange(FIRST_YEAR, LAST_YEAR + 1)})
+
+
+def continente_table(iso_noc):
+    # continente.ktr: distinct non-null continents, sorted
+    continents = np.sort(iso_noc["continent"].dropna().unique().astype(str))
+    return pd.DataFrame(
+        {"IDCONTINENTE": sequence(len(continents)), "CONTINENTE": continents}
+    )
+
+
+def entidad_table(iso_noc, continente, olympics=None):
+    # entidad.ktr: one entity per row of the ISO-NOC table, nulls replaced
+    entities = pd.DataFrame(
+        {
+            "NOCENTIDAD": iso_noc["NOC"].astype(object).fillna(MISSING_TEXT),
+            "CONTINENTE": iso_noc["continent"].astype(object).fillna(NO_CONTINENT),
+            "ALPHA3ENTIDAD": iso_noc["ISO"].astype(object).fillna(MISSING_TEXT),
+            "ENTIDAD": iso_noc["name"].astype(object).fillna(MISSING_TEXT),
+        }
+    )
+    continent_ids = continente.set_index("CONTINENTE")["IDCONTINENTE"]
+    entities["IDCONTINENTE"] = entities["CONTINENTE"].map(continent_ids)
+    entities["IDENTIDAD"] = sequence(len(entities))
+    entities = entities.drop(columns="CONTINENTE")
+
+    if olympics is not None:
+        # NOCs that compete but are missing from the ISO-NOC table get their
+        # own entity, so no athlete row is lost
+        late = late_entities(
+            olympics[~olympics["NOC"].isin(entities["NOCENTIDAD"])], continente
+        )
+        late["IDENTIDAD"] = entities["IDENTIDAD"].max() + sequence(len(late))
+        entities = pd.concat([entities, late], ignore_index=True)
+    return entities
+
+
+def late_entities(olympics, continente):
+    # One entity per NOC of the rows, named after their region. Surrogate
+    # keys are assigned by the caller
+    missing = olympics.drop_duplicates(subset="NOC").sort_values("NOC")
+    continent_ids = continente.set_index("CONTINENTE")["IDCONTINENTE"]
+    return pd.DataFrame(
+        {
+            "NOCENTIDAD": missing["NOC"].astype(str).to_numpy(),
+            "ALPHA3ENTIDAD": missing["Region (ISO)"]
+            .astype(object)
+            .fillna(MISSING_TEXT)
+            .to_numpy(),
+            "ENTIDAD": missing["Region"]
+            .astype(object)
+            .fillna(missing["NOC"].astype(object))
+            .to_numpy(),
+            "IDCONTINENTE": continent_ids.get(NO_CONTINENT),
+        }
+    )
+
+
+def atleta_table(olympics):
+    # Atleta.ktr: first row of each athlete; birth year = year - age, with a
+    # missing age replaced by the year
+    athletes = olympics.drop_duplicates(subset="ID")
+    age = athletes["Age"].fillna(athletes["Year"])
+    return pd.DataFrame(
+        {
+            "IDATLETA": athletes["ID"].to_numpy(),
+            "NOMBREATLETA": athletes["Name"].astype(str).to_numpy(),
+            "SEXOATLETA": athletes["Sex"].astype(str).to_numpy(),
+            "ANIONACIMIENTO": (athletes["Year"] - age).astype("int64").to_numpy(),
+        }
+    )
+
+
+def deporte_table(olympics):
+    # deporte.ktr: distinct sports, sorted
+    sports = np.sort(olympics["Sport"].dropna().unique().astype(str))
+    return pd.DataFrame({"IDDEPORTE": sequence(len(sports)), "NOMBREDEPORTE": sports})
+
+
+def split_events(olympics):
+    # Vectorized version of the "Eliminar deporte de evento" and "Separar
+    # genero de evento" scripts: the sport name is removed from the event and
+    # the first Men's/Women's/Mixed becomes the category. Events left empty
+    # take the name of the sport
+    sport = olympics["Sport"].astype(str)
+    event = olympics["Event"].astype(str)
+
+    stripped = event.copy()
+    for name, rows in sport.groupby(sport).groups.items():
+        stripped[rows] = event[rows].str.replace(name, "", regex=False).str.strip()
+
+    category = stripped.str.extract(CATEGORY_PATTERN, flags=re.IGNORECASE, expand=False)
+    modality = (
+        stripped.str.replace(CATEGORY_PATTERN, "", n=1, case=False, regex=True)
+        .str.strip()
+        .where(category.notna(), stripped)
+    )
+    modality = modality.where(modality != "", sport)
+
+    return pd.DataFrame(
+        {
+            "NOMBREDEPORTE": sport,
+            "NOMBREMODALIDAD": modality,
+            "CATEGORIA": category.fillna(NO_CATEGORY),
+        },
+        index=olympics.index,
+    )
+
+
+def modalidad_table(olympics, deporte):
+    # modalidad.ktr: distinct (sport, modality, category) triples
+    modalities = (
+        split_events(olympics)
+        .drop_duplicates()
+        .sort_values(["NOMBREDEPORTE", "NOMBREMODALIDAD", "CATEGORIA"])
+    )
+    sport_ids = deporte.set_index("NOMBREDEPORTE")["IDDEPORTE"]
+    return pd.DataFrame(
+        {
+            "IDMODALIDAD": sequence(len(modalities)),
+            "IDDEPORTE": modalities["NOMBREDEPORTE"].map(sport_ids).to_numpy(),
+            "NOMBREMODALIDAD": modalities["NOMBREMODALIDAD"].to_numpy(),
+            "CATEGORIA": modalities["CATEGORIA"].to_numpy(),
+            # Not stored; part of the natural key of the modality
+            "NOMBREDEPORTE": modalities["NOMBREDEPORTE"].to_numpy(),
+        }
+    )
+
+
+def evento_deportivo_table(olympics):
+    # EventoDeportivo.ktr keeps one row per edition (Games). The key includes
+    # the city, because the 1956 Summer Games were held in two countries
+    games = olympics.drop_duplicates(subset=["Games", "City"]).sort_values(
+        ["Games", "City"]
+    )
+    columns = {
+        "NOMBREEVENTO": "Games",
+        "TEMPORADAEVENTO": "Season",
+        "CIUDADEVENTO": "City",
+        "PAISEVENTO": "Host Country",
+        "CODIGOPAISEVENTO": "Host Country (ISO)",
+    }
+    events = pd.DataFrame(
+        {
+            column: games[source].astype(object).fillna(MISSING_TEXT).to_numpy()
+            for column, source in columns.items()
+        }
+    )
+    events.insert(0, "IDEVENTODEPORTIVO", sequence(len(events)))
+    return events
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from etl.dimensions import (
+    FIRST_METRICS_YEAR,
+    LAST_YEAR,
+    MISSING_TEXT,
+    NO_MEDAL,
+    atleta_table,
+    deporte_table,
+    evento_deportivo_table,
+    late_entities,
+    modalidad_table,
+    sequence,
+    split_events,
+)
+
+CONTINENTE_SQL = "SELECT * FROM CONTINENTE"
+
+
+def age_range(age):
+    # "Calculo Rangos Etarios" script; a missing age is stored as 0
+    return np.select(
+        [age == 0, age <= 21, age < 35],
+        ["Sin Dato", "Joven", "Adulto"],
+        default="Veterano",
+    )
+
+
+def rendimiento_atletico_table(olympics, keys):
+    # hechoRendimientoAtletico.ktr. The StreamLookup steps become lookups in
+    # the key cache; members missing from a dimension are added to it
+    height = olympics["Height"].fillna(0).to_numpy(dtype="float64")
+    weight = olympics["Weight"].fillna(0).to_numpy(dtype="float64")
+    age = olympics["Age"].fillna(0).to_numpy(dtype="float64")
+
+    # "Calculo IMC" script: body mass index, 0 when height or weight is missing
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.where((height != 0) & (weight != 0), weight / (height / 100) ** 2, 0.0)
+
+    games = pd.DataFrame(
+        {
+            "Games": olympics["Games"].astype(object).fillna(MISSING_TEXT),
+            "City": olympics["City"].astype(object).fillna(MISSING_TEXT),
+        }
+    )
+    modalities = split_events(olympics)
+
+    def late_modalities(missing):
+        rows = olympics[missing]
+        keys.resolve(
+            "deporte",
+            rows[["Sport"]].astype(str),
+            late=lambda sports: deporte_table(rows[sports]),
+        )
+        return modalidad_table(rows, keys.frame("deporte"))
+
+    return pd.DataFrame(
+        {
+            # Source row order, so the first appearance of an athlete is kept
+            "IDHECHORENDIMIENTO": sequence(len(olympics)),
+            "IDANIO": keys.resolve(
+                "anio",
+                olympics[["Year"]],
+                late=lambda missing: pd.DataFrame(
+                    {"IDANIO": olympics.loc[missing, "Year"].unique()}
+                ),
+            ),
+            "IDEVENTODEPORTIVO": keys.resolve(
+                "evento",
+                games,
+                late=lambda missing: evento_deportivo_table(olympics[missing]),
+            ),
+            "IDENTIDAD": keys.resolve(
+                "entidad_noc",
+                olympics[["NOC"]],
+                late=lambda missing: late_entities(
+                    olympics[missing], keys.con.execute(CONTINENTE_SQL).df()
+                ),
+            ),
+            "IDATLETA": keys.resolve(
+                "atleta",
+                olympics[["ID"]],
+                late=lambda missing: atleta_table(olympics[missing]),
+            ),
+            "IDMODALIDAD": keys.resolve("modalidad", modalities, late=late_modalities),
+            "ESTATURA": height,
+            "PESO": np.round(weight).astype("int64"),
+            "IMC": bmi,
+            "EDAD": age.astype("int64"),
+            "TIPOPODIO": olympics["Medal"].astype(object).fillna(NO_MEDAL).to_numpy(),
+            "EQUIPO": olympics["Team"].astype(str).to_numpy(),
+            "RANGOETARIO": age_range(age),
+        }
+    )
+
+
+def metricas_entidades_table(countries, keys):
+    # hechoMetricasEntidades.ktr: 1990-2016 rows joined to their entity by
+    # ISO-3 code, with missing indicators stored as 0. Several NOCs share an
+    # ISO code; the metrics go to the first entity of the code
+    rows = countries[countries["Year"].between(FIRST_METRICS_YEAR, LAST_YEAR)]
+    metrics = pd.DataFrame(
+        {
+            "IDANIO": rows["Year"].to_numpy(),
+            "IDENTIDAD": keys.resolve("entidad_iso", rows[["Code"]]),
+            "IDH": rows["Human Development Index (UNDP)"].fillna(0).to_numpy(),
+            "ESCOLARIDAD": rows["Expected Years of Schooling (years)"]
+            .fillna(0)
+            .to_numpy(),
+            "GNI": rows["GNI per capita, PPP (constant 2017 international $)"]
+            .fillna(0)
+            .to_numpy(),
+            "POBLACION": rows["Count"].fillna(0).to_numpy(),
+        }
+    )
+
+    # Rows of codes without an entity cannot satisfy the foreign key
+    metrics = metrics.dropna(subset="IDENTIDAD").astype({"IDENTIDAD": "int64"})
+    metrics.insert(0, "IDHECHOENTIDAD", sequence(len(metrics)))
+    return metrics
@@ -0,0 +1,180 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import refresh_aggregates
+from data_store import DATASETS_DIR, load_dataset
+from etl.cdc import upsert_metricas
+from etl.dimensions import (
+    anio_table,
+    atleta_table,
+    continente_table,
+    deporte_table,
+    entidad_table,
+    evento_deportivo_table,
+    modalidad_table,
+)
+from etl.facts import metricas_entidades_table, rendimiento_atletico_table
+from etl.keys import KeyCache
+from etl.load import load_table
+
+# Cleaned datasets the datamart is built from
+SOURCES = {
+    "olympics": "olympics-cleaned.csv",
+    "iso_noc": "iso_noc-merged.csv",
+    "countries": "country-data-merged.csv",
+}
+
+
+def read_sources(names=None):
+    # Sources missing from datasets/ are left out, with the tables built from them
+    return {
+        name: load_dataset(filename)
+        for name, filename in SOURCES.items()
+        if (names is None or name in names)
+        and os.path.exists(os.path.join(DATASETS_DIR, filename))
+    }
+
+
+def log_step(log, name, table, step):
+    # step() returns the counters of the Pentaho step log it changed
+    start = time.perf_counter()
+    counters = step()
+    seconds = time.perf_counter() - start
+
+    entry = {
+        "TRANSNAME": name,
+        "TABLE": table,
+        "LINES_READ": 0,
+        "LINES_WRITTEN": 0,
+        "LINES_UPDATED": 0,
+        "LINES_DELETED": 0,
+    }
+    entry.update(counters)
+    entry["SECONDS"] = seconds
+    entry["ROWS_PER_SECOND"] = entry["LINES_READ"] / seconds if seconds else np.nan
+    log.append(entry)
+
+
+def run_transformation(con, log, name, table, build, keys, method):
+    # build() returns the rows to write and the number of rows it read. The
+    # rows written are added to the key cache
+    def step():
+        data, lines_read = build()
+        lines_written = load_table(con, table, data, method)
+        keys.register(table, data)
+        return {"LINES_READ": lines_read, "LINES_WRITTEN": lines_written}
+
+    log_step(log, name, table, step)
+
+
+def run_dimensiones(con, sources, log, keys, method="arrow"):
+    # Dimensiones.kjb
+    iso_noc = sources["iso_noc"]
+    olympics = sources.get("olympics")
+
+    def transformation(name, table, build):
+        run_transformation(con, log, name, table, build, keys, method)
+
+    def anio():
+        # Generated rows count as read, like the Generate Rows step
+        anio = anio_table()
+        return anio, len(anio)
+
+    def entidad():
+        continente = con.execute("SELECT * FROM CONTINENTE").df()
+        lines_read = len(iso_noc) + len(continente)
+        if olympics is not None:
+            lines_read += len(olympics)
+        return entidad_table(iso_noc, continente, olympics), lines_read
+
+    transformation("anio", "ANIO", anio)
+    transformation(
+        "continente", "CONTINENTE", lambda: (continente_table(iso_noc), len(iso_noc))
+    )
+    transformation("entidad", "ENTIDAD", entidad)
+
+    if olympics is None:
+        return
+
+    transformation("Atleta", "ATLETA", lambda: (atleta_table(olympics), len(olympics)))
+    transformation(
+        "deporte", "DEPORTE", lambda: (deporte_table(olympics), len(olympics))
+    )
+    transformation(
+        "modalidad",
+        "MODALIDAD",
+        lambda: (modalidad_table(olympics, keys.frame("deporte")), len(olympics)),
+    )
+    transformation(
+        "EventoDeportivo",
+        "EVENTO_DEPORTIVO",
+        lambda: (evento_deportivo_table(olympics), len(olympics)),
+    )
+
+
+def run_hechos(con, sources, log, keys, method="arrow"):
+    # hecho.kjb. The dimension keys come from the cache instead of reading
+    # the dimensions back
+    if "olympics" in sources:
+        olympics = sources["olympics"]
+        run_transformation(
+            con,
+            log,
+            "hechoRendimientoAtletico",
+            "RENDIMIENTO_ATLETICO",
+            lambda: (rendimiento_atletico_table(olympics, keys), len(olympics)),
+            keys,
+            method,
+        )
+
+    def agregados():
+        # Roll-ups of the athletic performance fact, rebuilt after each load
+        fact_rows = con.execute("SELECT COUNT(*) FROM RENDIMIENTO_ATLETICO").fetchone()
+        return {"LINES_READ": fact_rows[0], "LINES_WRITTEN": refresh_aggregates(con)}
+
+    log_step(log, "agregados", "AGREGADOS", agregados)
+
+    if "countries" in sources:
+        run_metricas(con, sources, log, keys, method)
+
+
+def run_metricas(con, sources, log, keys, method="arrow"):
+    # hechoMetricasEntidades.ktr as an incremental load: only the rows whose
+    # fingerprint changed since the last run are written
+    countries = sources["countries"]
+
+    def step():
+        metrics = metricas_entidades_table(countries, keys)
+        return {"LINES_READ": len(countries), **upsert_metricas(con, metrics, method)}
+
+    log_step(log, "hechoMetricasEntidades", "METRICAS_ENTIDADES", step)
+
+
+def run_general(con, method="arrow", keys=None):
+    # general.kjb: dimensions first, then the facts that reference them.
+    # Returns the step log as a DataFrame
+    sources = read_sources()
+    if keys is None:
+        keys = KeyCache(con, method)
+    log = []
+    run_dimensiones(con, sources, log, keys, method)
+    run_hechos(con, sources, log, keys, method)
+    return pd.DataFrame(log)
+
+
+# Sources whose changes can be applied to an existing datamart, with the job
+# that applies them. A change in any other source rebuilds the datamart
+INCREMENTAL_JOBS = {"countries": run_metricas}
+
+
+def run_incremental(con, changed, method="arrow"):
+    # changed: names of SOURCES whose content differs from the loaded one
+    sources = read_sources(changed)
+    keys = KeyCache(con, method)
+    log = []
+    for name in changed:
+        INCREMENTAL_JOBS[name](con, sources, log, keys, method)
+    return pd.DataFrame(log)
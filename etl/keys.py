@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from etl.dimensions import MISSING_TEXT
+from etl.load import load_table
+
+# Natural keys the facts are resolved by: lookup -> (dimension table, natural
+# key columns, surrogate key, placeholder). Rows whose key is the placeholder
+# are not indexed, since many rows share it
+LOOKUPS = {
+    "anio": ("ANIO", ["IDANIO"], "IDANIO", None),
+    "atleta": ("ATLETA", ["IDATLETA"], "IDATLETA", None),
+    "deporte": ("DEPORTE", ["NOMBREDEPORTE"], "IDDEPORTE", None),
+    "entidad_noc": ("ENTIDAD", ["NOCENTIDAD"], "IDENTIDAD", MISSING_TEXT),
+    "entidad_iso": ("ENTIDAD", ["ALPHA3ENTIDAD"], "IDENTIDAD", MISSING_TEXT),
+    "evento": (
+        "EVENTO_DEPORTIVO",
+        ["NOMBREEVENTO", "CIUDADEVENTO"],
+        "IDEVENTODEPORTIVO",
+        None,
+    ),
+    "modalidad": (
+        "MODALIDAD",
+        ["NOMBREDEPORTE", "NOMBREMODALIDAD", "CATEGORIA"],
+        "IDMODALIDAD",
+        None,
+    ),
+}
+
+# Dimension rows as the lookups read them; modalities carry their sport name
+TABLE_SQL = {
+    "MODALIDAD": """
+SELECT m.*, d.NOMBREDEPORTE
+FROM MODALIDAD m
+LEFT JOIN DEPORTE d ON m.IDDEPORTE = d.IDDEPORTE
+ORDER BY m.IDMODALIDAD
+""",
+}
+
+
+def key_index(keys):
+    # keys: one column per natural key column, in the lookup order
+    if keys.shape[1] == 1:
+        return pd.Index(keys.iloc[:, 0].astype(object))
+    return pd.MultiIndex.from_frame(keys.astype(object))
+
+
+class DimensionKeys:
+    # Hash map from the natural key of a dimension to its surrogate key
+
+    def __init__(self, table, columns, id_column, placeholder=None):
+        self.table = table
+        self.columns = columns
+        self.id_column = id_column
+        self.placeholder = placeholder
+        self.ids = pd.Series(dtype="int64")
+        self.hits = 0
+        self.misses = 0
+        self.late = 0
+
+    def add(self, rows):
+        # The first row of a key wins, like the StreamLookup steps
+        keys = rows[self.columns]
+        if self.placeholder is not None:
+            rows = rows[~keys.eq(self.placeholder).any(axis=1)]
+            keys = rows[self.columns]
+        ids = pd.Series(rows[self.id_column].to_numpy(), index=key_index(keys))
+        ids = ids[~ids.index.duplicated() & ~ids.index.isin(self.ids.index)]
+        if len(ids):
+            self.ids = pd.concat([self.ids, ids]) if len(self.ids) else ids
+
+    def lookup(self, keys):
+        # Surrogate keys of each fact row, NaN where the key is unknown
+        return self.ids.reindex(key_index(keys)).to_numpy(dtype="float64")
+
+
+class KeyCache:
+    # Surrogate keys of every dimension, read once per run and kept up to date
+    # as dimension rows are inserted. Facts are resolved with vectorized joins
+    # against it instead of reading the dimensions back
+
+    def __init__(self, con, method="arrow"):
+        self.con = con
+        self.method = method
+        self.lookups = {name: DimensionKeys(*spec) for name, spec in LOOKUPS.items()}
+        self.last_ids = {}
+
+        for table in dict.fromkeys(spec[0] for spec in LOOKUPS.values()):
+            sql = TABLE_SQL.get(table, f"SELECT * FROM {table}")
+            self.register(table, self.con.execute(sql).df())
+
+    def register(self, table, rows):
+        # Called with the rows just written to a dimension table
+        if rows.empty:
+            return
+        for lookup in self.lookups.values():
+            if lookup.table == table:
+                lookup.add(rows)
+                self.last_ids[table] = max(
+                    self.last_ids.get(table, 0), int(rows[lookup.id_column].max())
+                )
+
+    def frame(self, name):
+        # Natural and surrogate keys of a lookup as a dimension-like DataFrame
+        lookup = self.lookups[name]
+        index = lookup.ids.index
+        names = lookup.columns if index.nlevels > 1 else lookup.columns[0]
+        frame = index.to_frame(index=False, name=names)
+        frame[lookup.id_column] = lookup.ids.to_numpy()
+        return frame
+
+    def resolve(self, name, keys, late=None):
+        # Surrogate keys of each fact row. Rows whose key is missing from the
+        # dimension are passed to late(mask), which returns the dimension rows
+        # to insert for them (late-arriving dimension members); without it
+        # their key stays NaN
+        lookup = self.lookups[name]
+        ids = lookup.lookup(keys)
+        missing = np.isnan(ids)
+        lookup.hits += int((~missing).sum())
+        lookup.misses += int(missing.sum())
+
+        if late is not None and missing.any():
+            rows = late(missing)
+            if lookup.id_column not in lookup.columns:
+                # Surrogate keys continue after the last one of the table
+                first_id = self.last_ids.get(lookup.table, 0) + 1
+                rows = rows.assign(
+                    **{lookup.id_column: np.arange(first_id, first_id + len(rows))}
+                )
+            load_table(self.con, lookup.table, rows, self.method)
+            self.register(lookup.table, rows)
+            lookup.late += len(rows)
+            ids[missing] = lookup.lookup(keys[missing])
+            missing = np.isnan(ids)
+
+        # Integer keys when every row was resolved, as a reindex without gaps
+        return ids if missing.any() else ids.astype("int64")
+
+    def stats(self):
+        return pd.DataFrame(
+            [
+                {
+                    "LOOKUP": name,
+                    "TABLE": lookup.table,
+                    "KEYS": len(lookup.ids),
+                    "HITS": lookup.hits,
+                    "MISSES": lookup.misses,
+                    "LATE_ROWS": lookup.late,
+                }
+                for name, lookup in self.lookups.items()
+            ]
+        )
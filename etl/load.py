@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+# How the rows reach the database:
+# - arrow: DuckDB scans the DataFrame in place and inserts it in one statement
+# - copy: the frame is staged as a Parquet file and loaded with COPY
+# - batch: parameterized INSERTs committed every BATCH_SIZE rows, like the
+#   Pentaho table outputs (use_batch=Y, commit=1000)
+LOAD_METHODS = ("arrow", "copy", "batch")
+
+BATCH_SIZE = 1000
+
+
+def table_columns(con, table):
+    return [row[0] for row in con.execute(f"DESCRIBE {table}").fetchall()]
+
+
+def _load_arrow(con, table, data, columns):
+    con.register("staging", data)
+    try:
+        con.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM staging")
+    finally:
+        con.unregister("staging")
+
+
+def _load_copy(con, table, data, columns):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"{table}.parquet")
+        data.to_parquet(path, engine="pyarrow", index=False)
+        con.execute(f"COPY {table} ({columns}) FROM '{path}' (FORMAT PARQUET)")
+
+
+def _load_batch(con, table, data, columns):
+    placeholders = ", ".join("?" * data.shape[1])
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+    # to_dict converts the values to Python scalars, which the driver binds
+    rows = data.to_dict("split")["data"]
+    for start in range(0, len(rows), BATCH_SIZE):
+        con.execute("BEGIN TRANSACTION")
+        con.executemany(sql, rows[start : start + BATCH_SIZE])
+        con.execute("COMMIT")
+
+
+def load_table(con, table, data, method="arrow"):
+    # Returns the number of rows written
+    if method not in LOAD_METHODS:
+        raise ValueError(f"Método de carga desconocido: {method}")
+
+    names = table_columns(con, table)
+    data = data[names]
+    columns = ", ".join(names)
+
+    if method == "arrow":
+        _load_arrow(con, table, data, columns)
+    elif method == "copy":
+        _load_copy(con, table, data, columns)
+    else:
+        _load_batch(con, table, data, columns)
+    return len(data)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+
+import plotly
+import plotly.io as pio
+
+from data_store import STORE_DIR
+
+# Serialized figures shared by every worker process of the host, next to the
+# Parquet copies of the datasets, so they survive restarts
+FIGURES_DIR = os.path.join(STORE_DIR, "figures")
+
+# Size bound of the cache; the least recently used figures are evicted first
+MAX_BYTES = 64 * 1024 * 1024
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CHARTS_DIR = os.path.join(ROOT_DIR, "charts")
+
+# Modules outside charts/ whose code ends up in the figures
+SHARED_SOURCES = ["olympics_cube.py"]
+
+# (modification stamps of the sources, their content hash)
+_fingerprint = None
+
+
+def source_files():
+    # Every chart module plus the modules their figures are built from. A
+    # builder calls helpers of its own and of other modules, so the source of
+    # all of them is part of the key, not just the builder's bytecode
+    charts = [
+        os.path.join(CHARTS_DIR, name)
+        for name in sorted(os.listdir(CHARTS_DIR))
+        if name.endswith(".py")
+    ]
+    return charts + [os.path.join(ROOT_DIR, name) for name in SHARED_SOURCES]
+
+
+def source_fingerprint():
+    # Content hash of the chart sources, recomputed only when one of them is
+    # modified (same size and modification time -> same hash)
+    global _fingerprint
+    stamps = []
+    for path in source_files():
+        stat = os.stat(path)
+        stamps.append((path, stat.st_mtime_ns, stat.st_size))
+    if _fingerprint is None or _fingerprint[0] != stamps:
+        digest = hashlib.sha256()
+        for path, _, _ in stamps:
+            digest.update(os.path.relpath(path, ROOT_DIR).encode())
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        _fingerprint = (stamps, digest.hexdigest())
+    return _fingerprint[1]
+
+
+def figure_key(build, version, params):
+    # The chart function, the source of the charts, the plotly version that
+    # serialized the figure, the content hash of its dataset and its parameters
+    key = json.dumps(
+        [
+            build.__module__,
+            build.__qualname__,
+            source_fingerprint(),
+            plotly.__version__,
+            version,
+            params,
+        ],
+        default=str,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def figure_path(key):
+    return os.path.join(FIGURES_DIR, f"{key}.json")
+
+
+def read_figure(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            fig = pio.from_json(f.read())
+    except (OSError, ValueError):
+        return None
+
+    # Reading a figure makes it the most recently used one
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return fig
+
+
+def write_figure(fig, path):
+    # Written to a temporary file first so other workers never read a
+    # partial figure
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(pio.to_json(fig, validate=False))
+    os.replace(tmp_path, path)
+
+
+def evict(max_bytes=MAX_BYTES):
+    # Removes the figures used least recently until the cache fits. Another
+    # worker may be evicting at the same time, so missing files are skipped
+    entries = []
+    for entry in os.scandir(FIGURES_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def cached_figure(build, version, data, *params):
+    # Figure of build(data, *params), read from disk when the same chart was
+    # already built for this version of the dataset
+    path = figure_path(figure_key(build, version, params))
+    fig = read_figure(path)
+    if fig is None:
+        fig = build(data, *params)
+        write_figure(fig, path)
+        evict()
+    return fig
+
+
+def clear():
+    if not os.path.isdir(FIGURES_DIR):
+        return
+    for entry in os.scandir(FIGURES_DIR):
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
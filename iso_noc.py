@@ -0,0 +1,224 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_store import DATASETS_DIR, STORE_DIR, dataset_hash, write_parquet
+
+NOC_REGIONS = "noc_regions-parsed.csv"
+NOCS_LIST = "nocs_list.csv"
+ISO_CODES = "iso_codes.csv"
+MERGED = "iso_noc-merged.csv"
+
+SOURCES = [NOC_REGIONS, NOCS_LIST, ISO_CODES]
+
+# Placeholders of the merged table (iso_noc_merger.ipynb)
+NO_NAME = "N/A"
+NO_ISO = "N/A"
+
+# Continents of the regions missing from nocs_list.csv
+CONTINENTS = {
+    "Anguilla": "Americas",
+    "Antarctica": "Antarctica",
+    "Bonaire, Sint Eustatius and Saba": "Americas",
+    "Bouvet Island": "Antarctica",
+    "British Indian Ocean Territory": "Asia",
+    "Christmas Island": "Oceania",
+    "Cocos (Keeling) Islands": "Asia",
+    "Curaçao": "Americas",
+    "Czechia": "Europe",
+    "Falkland Islands (Malvinas)": "Americas",
+    "Faroe Islands": "Europe",
+    "French Guiana": "Americas",
+    "French Polynesia": "Oceania",
+    "French Southern Territories": "Antarctica",
+    "Gibraltar": "Europe",
+    "Greenland": "Americas",
+    "Guadeloupe": "Americas",
+    "Guernsey": "Europe",
+    "Heard Island and McDonald Islands": "Antarctica",
+    "Holy See": "Europe",
+    "IOC Refugee Olympic Team": "No continent",
+    "Independent Olympic Athletes": "No continent",
+    "Independent Olympic Participants": "No continent",
+    "Isle of Man": "Europe",
+    "Jersey": "Europe",
+    "Macao": "Asia",
+    "Martinique": "Americas",
+    "Mayotte": "Africa",
+    "Montserrat": "Americas",
+    "New Caledonia": "Oceania",
+    "Niue": "Oceania",
+    "Norfolk Island": "Oceania",
+    "Northern Mariana Islands": "Oceania",
+    "Pitcairn": "Oceania",
+    "Réunion": "Africa",
+    "Saint Barthélemy": "Americas",
+    "Saint Helena, Ascension and Tristan da Cunha": "Africa",
+    "Saint Martin (French part)": "Americas",
+    "Saint Pierre and Miquelon": "Americas",
+    "Sint Maarten (Dutch part)": "Americas",
+    "South Georgia and the South Sandwich Islands": "Antarctica",
+    "Svalbard and Jan Mayen": "Europe",
+    "Tokelau": "Oceania",
+    "Turks and Caicos Islands": "Americas",
+    "United States Minor Outlying Islands": "Oceania",
+    "Viet Nam": "Asia",
+    "Wallis and Futuna": "Oceania",
+    "Western Sahara": "Africa",
+    "Åland Islands": "Europe",
+}
+
+# The lookups are stored next to the Parquet copies of the datasets
+LOOKUP_DIR = os.path.join(STORE_DIR, "lookups")
+
+# (sources digest, NOC lookup, country name lookup), built once per process
+_lookups = None
+
+_lock = threading.Lock()
+
+
+def read_source(filename):
+    return pd.read_csv(os.path.join(DATASETS_DIR, filename))
+
+
+def build_iso_noc(noc_regions=None, nocs_list=None, iso_codes=None):
+    # iso_noc_merger.ipynb with the row loops replaced by column fills
+    if noc_regions is None:
+        noc_regions = read_source(NOC_REGIONS)
+    if nocs_list is None:
+        nocs_list = read_source(NOCS_LIST)
+    if iso_codes is None:
+        iso_codes = read_source(ISO_CODES)
+
+    merged = noc_regions.merge(nocs_list, on="NOC", how="outer")
+    merged = merged.drop(columns="notes")
+    merged["name"] = merged["name"].fillna(merged["region"]).fillna(NO_NAME)
+
+    merged = merged.merge(iso_codes, left_on="region", right_on="name", how="outer")
+    merged["name"] = merged["name_x"].combine_first(merged["name_y"])
+    merged = merged.drop(columns=["name_x", "name_y"])
+
+    # Rows of the same country fill each other's gaps. Like the notebook's
+    # groupby().apply(), the rows come out grouped by name, in name order
+    merged["name"] = merged["name"].fillna("missing")
+    merged = merged.sort_values("name", kind="stable", ignore_index=True)
+    filled = merged.groupby("name", sort=False).ffill()
+    filled = filled.groupby(merged["name"], sort=False).bfill()
+    merged[filled.columns] = filled
+    merged["name"] = merged["name"].replace("missing", np.nan)
+
+    merged = merged.drop(columns="region")
+    merged["continent"] = merged["continent"].fillna(merged["name"].map(CONTINENTS))
+    merged["ISO"] = merged["ISO"].fillna(NO_ISO)
+    return merged
+
+
+def build_lookups(noc_regions, iso_noc, iso_codes):
+    # Country name -> ISO-3 code, for the host countries
+    names = iso_codes.drop_duplicates(subset="name")[["name", "ISO"]]
+
+    # One row per NOC: the region the Olympics rows are labelled with, its
+    # ISO-3 code and the continent of the NOC's entity (the first one wins)
+    nocs = noc_regions[["NOC", "region"]].rename(columns={"region": "Region"})
+    nocs["ISO"] = nocs["Region"].map(names.set_index("name")["ISO"])
+    continents = iso_noc.dropna(subset="NOC").drop_duplicates(subset="NOC")
+    nocs = nocs.merge(
+        continents[["NOC", "continent"]], on="NOC", how="outer"
+    ).drop_duplicates(subset="NOC")
+    return nocs.reset_index(drop=True), names.reset_index(drop=True)
+
+
+def sources_hash():
+    digests = ":".join(dataset_hash(filename) for filename in SOURCES)
+    return hashlib.sha256(digests.encode()).hexdigest()
+
+
+def lookup_paths(digest):
+    return (
+        os.path.join(LOOKUP_DIR, f"noc-{digest[:16]}.parquet"),
+        os.path.join(LOOKUP_DIR, f"names-{digest[:16]}.parquet"),
+    )
+
+
+def load_lookups():
+    # NOC and country name lookups, read from disk once per process and
+    # rebuilt only when one of the source CSV files changes
+    global _lookups
+    with _lock:
+        digest = sources_hash()
+        if _lookups is not None and _lookups[0] == digest:
+            return _lookups[1], _lookups[2]
+
+        noc_path, names_path = lookup_paths(digest)
+        if os.path.exists(noc_path) and os.path.exists(names_path):
+            nocs = pd.read_parquet(noc_path, engine="pyarrow")
+            names = pd.read_parquet(names_path, engine="pyarrow")
+        else:
+            noc_regions = read_source(NOC_REGIONS)
+            iso_codes = read_source(ISO_CODES)
+            iso_noc = build_iso_noc(noc_regions, read_source(NOCS_LIST), iso_codes)
+            nocs, names = build_lookups(noc_regions, iso_noc, iso_codes)
+            write_parquet(nocs, noc_path)
+            write_parquet(names, names_path)
+
+        # Hash indexes, so each distinct key is found in constant time
+        nocs = nocs.set_index("NOC")
+        names = names.set_index("name")["ISO"]
+        _lookups = (digest, nocs, names)
+        return nocs, names
+
+
+def take(values, index, keys):
+    # Values of each key through the index; only the distinct keys are
+    # looked up, then spread back to the rows. Unknown keys give NaN
+    codes, uniques = pd.factorize(keys)
+    positions = index.get_indexer(uniques)
+    found = np.append(positions, -1)[codes]
+    result = np.append(values.to_numpy(dtype=object), np.nan)[found]
+    return pd.Series(result, index=keys.index, dtype=object)
+
+
+def noc_lookup(noc, column):
+    # "Region", "ISO" or "continent" of each NOC
+    nocs, _ = load_lookups()
+    return take(nocs[column], nocs.index, noc)
+
+
+def country_iso(names):
+    # ISO-3 code of each country name of iso_codes.csv
+    _, lookup = load_lookups()
+    return take(lookup, lookup.index, names)
+
+
+def insert_after(data, column, name, values):
+    data.insert(data.columns.get_loc(column) + 1, name, values)
+
+
+def add_iso_columns(ol_data):
+    # Cells 5 to 8 of olympics.ipynb: the region of each NOC, the ISO-3 codes
+    # of the region and of the host country, each right after its column
+    ol_data = ol_data.copy()
+    insert_after(ol_data, "NOC", "Region", noc_lookup(ol_data["NOC"], "Region"))
+    insert_after(ol_data, "Region", "Region (ISO)", noc_lookup(ol_data["NOC"], "ISO"))
+    insert_after(
+        ol_data,
+        "Host Country",
+        "Host Country (ISO)",
+        country_iso(ol_data["Host Country"]),
+    )
+    return ol_data
+
+
+def main():
+    iso_noc = build_iso_noc()
+    iso_noc.to_csv(os.path.join(DATASETS_DIR, MERGED), index=False)
+    nocs, names = load_lookups()
+    print(f"{MERGED}: {len(iso_noc)} filas")
+    print(f"Búsqueda por NOC: {len(nocs)} NOCs, {len(names)} países")
+
+
+if __name__ == "__main__":
+    main()
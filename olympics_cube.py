@@ -0,0 +1,117 @@
+import threading
+
+import pandas as pd
+
+from datamart import datamart_version, query
+
+CUBE_DIMENSIONS = [
+    "NOC",
+    "Region (ISO)",
+    "Host Country (ISO)",
+    "Year",
+    "Season",
+    "Sport",
+    "Event",
+    "Sex",
+    "Medal",
+]
+
+# Measures of the cube (see the MEDALLAS view in aggregates.py):
+# - Rows: athlete-event entries, i.e. the rows of the raw table
+# - Athletes: entries that are the athlete's first appearance in the table, so
+#   they add up to the number of distinct athletes. They are exactly the rows
+#   kept by drop_duplicates(subset="ID"), which the charts work with.
+# - Medal Events: medal entries that are the first of their team event, so
+#   team medals are counted once
+CUBE_MEASURES = ["Rows", "Athletes", "Medal Events"]
+
+# Number of athletes kept in the participation ranking
+TOP_ATHLETES = 100
+
+DIMENSIONS_SQL = ", ".join(f'"{dimension}"' for dimension in CUBE_DIMENSIONS)
+
+# Sums over MEDALLAS: the datamart answers them from the AGG_CUBO roll-up
+CUBE_SQL = f"""
+SELECT
+    {DIMENSIONS_SQL},
+    SUM("Rows")::BIGINT AS "Rows",
+    SUM("Athletes")::BIGINT AS "Athletes",
+    SUM("Medal Events")::BIGINT AS "Medal Events"
+FROM MEDALLAS
+GROUP BY {DIMENSIONS_SQL}
+"""
+
+# Age is kept out of the cube to keep it small; the age chart only needs
+# this roll-up over the athletes' first appearance. A missing age is stored
+# as 0 in the fact and left out, as the groupby over the raw ages did; the
+# chart notes it. Answered from AGG_EDAD
+AGES_SQL = """
+SELECT
+    "Age",
+    COALESCE(SUM("Athletes") FILTER (WHERE "Medal" IS NOT NULL), 0)::BIGINT AS "Medals",
+    SUM("Athletes")::BIGINT AS "Athletes"
+FROM MEDALLAS
+WHERE "Age" > 0
+GROUP BY "Age"
+HAVING SUM("Athletes") > 0
+ORDER BY "Age"
+"""
+
+# Athlete names are not a dimension either; keep only the top of the ranking.
+# Counting rows needs the fact itself
+TOP_ATHLETES_SQL = f"""
+SELECT "Name", "NOC", COUNT(*) AS "Participaciones"
+FROM MEDALLAS
+GROUP BY "Name", "NOC"
+ORDER BY "Participaciones" DESC, "Name", "NOC"
+LIMIT {TOP_ATHLETES}
+"""
+
+# In-memory cube of this process -> (datamart version, tables)
+_cube = None
+
+_lock = threading.Lock()
+
+
+def build_cube(version):
+    tables = {
+        "cube": query(CUBE_SQL),
+        "ages": query(AGES_SQL),
+        "top_athletes": query(TOP_ATHLETES_SQL),
+    }
+    # Same version token as the datasets of the data store
+    for table in tables.values():
+        table.attrs["version"] = version
+    return tables
+
+
+def load_cube():
+    # Queried once per version of the datamart
+    global _cube
+    version = datamart_version()
+
+    with _lock:
+        if _cube is None or _cube[0] != version:
+            _cube = (version, build_cube(version))
+        return _cube[1]
+
+
+def rollup(cube, by, measure):
+    # Sum a measure over the given dimensions, dropping empty groups and
+    # missing keys like a groupby over the raw rows would
+    series = cube.groupby(by, observed=True)[measure].sum()
+    return series[series > 0]
+
+
+def medals_and_athletes(cube, by):
+    # Medals won at the athletes' first appearance and distinct athletes,
+    # equivalent to .agg({"Medal": "count", "ID": pd.Series.nunique}) over
+    # the rows deduplicated by athlete
+    athletes = rollup(cube, by, "Athletes")
+    medals = (
+        cube[cube["Medal"].notna()]
+        .groupby(by, observed=True)["Athletes"]
+        .sum()
+        .reindex(athletes.index, fill_value=0)
+    )
+    return pd.DataFrame({"Medals": medals, "Atletas": athletes})
@@ -13,20 +13,33 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from langsmith import Client
 
+from data_store import DATASETS_DIR, load_dataset
+
 os.environ["LANGCHAIN_TRACING_V2"] = st.secrets.langsmith.tracing
 os.environ["LANGCHAIN_PROJECT"] = st.secrets.langsmith.project
 os.environ["LANGCHAIN_ENDPOINT"] = st.secrets.langsmith.endpoint
 os.environ["LANGCHAIN_API_KEY"] = st.secrets.langsmith.api_key
 
 
+# Datasets the agent can query. The raw Olympics table is not in the
+# repository; missing files are skipped
+AI_DATASETS = {
+    "Olympics": "olympics.csv",
+    "Income": "gross-national-income-per-capita.csv",
+    "Schooling": "expected-years-of-schooling.csv",
+    "HDI": "human-development-index.csv",
+    "HDI vs. HIHD": "extra/hdi-vs-hihd.csv",
+}
+
+
 @st.cache_data
 def load_csvs():
-    olympics = pd.read_csv("datasets/olympics.csv")
-    income = pd.read_csv("datasets/gross-national-income-per-capita.csv")
-    schooling = pd.read_csv("datasets/expected-years-of-schooling.csv")
-    hdi = pd.read_csv("datasets/human-development-index.csv")
-    hihd = pd.read_csv("datasets/hdi-vs-hihd.csv")
-    return olympics, income, schooling, hdi, hihd
+    # Loaded through the data store, with the compact types of the schema
+    return {
+        title: load_dataset(filename)
+        for title, filename in AI_DATASETS.items()
+        if os.path.exists(os.path.join(DATASETS_DIR, filename))
+    }
 
 
 @st.cache_resource
@@ -43,14 +56,14 @@ def choose_dataset():
             st.write(df)
             return df
     else:
-        olympics, income, schooling, hdi, hihd = load_csvs()
-        dataset_dict = {
-            "Olympics": olympics,
-            "Income": income,
-            "Schooling": schooling,
-            "HDI": hdi,
-            "HDI vs. HIHD": hihd,
-        }
+        dataset_dict = load_csvs()
+        missing = [
+            f"{DATASETS_DIR}/{filename}"
+            for title, filename in AI_DATASETS.items()
+            if title not in dataset_dict
+        ]
+        if missing:
+            st.error(f"Dataset files not found, skipped: {', '.join(missing)}")
 
         selected_dataset = st.selectbox(
             "Select a dataset to view",
@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Columns shared by the Our World in Data style datasets
+ENTITY_COLUMNS = {"Entity": "category", "Code": "category", "Year": "int16"}
+
+# Columns shared by the World Bank style datasets
+COUNTRY_COLUMNS = {"Country Name": "category", "Code": "category", "Year": "int16"}
+
+OLYMPICS_COLUMNS = {
+    "Sex": "category",
+    "Team": "category",
+    "NOC": "category",
+    "Region": "category",
+    "Region (ISO)": "category",
+    "Games": "category",
+    "Year": "int16",
+    "Season": "category",
+    "City": "category",
+    "Host Country": "category",
+    "Host Country (ISO)": "category",
+    "Sport": "category",
+    "Event": "category",
+    "Medal": "category",
+}
+
+SCHOOLING = "Expected Years of Schooling (years)"
+INCOME = "GNI per capita, PPP (constant 2017 international $)"
+HDI = "Human Development Index (UNDP)"
+
+# Column types of each dataset. Low-cardinality strings are stored as
+# categoricals and years as int16. The indicators stay float64: float32 rounds
+# values such as the GNI, and every statistic computed from them would drift
+# from the CSV
+SCHEMAS = {
+    "olympics.csv": OLYMPICS_COLUMNS,
+    "olympics-cleaned.csv": OLYMPICS_COLUMNS,
+    "expected-years-of-schooling.csv": {**ENTITY_COLUMNS, SCHOOLING: "float64"},
+    "expected-years-of-schooling-cleaned.csv": {
+        **ENTITY_COLUMNS,
+        SCHOOLING: "float64",
+    },
+    "gross-national-income-per-capita.csv": {**ENTITY_COLUMNS, INCOME: "float64"},
+    "gross-national-income-per-capita-cleaned.csv": {
+        **ENTITY_COLUMNS,
+        INCOME: "float64",
+    },
+    "human-development-index.csv": {**ENTITY_COLUMNS, HDI: "float64"},
+    "human-development-index-cleaned.csv": {**ENTITY_COLUMNS, HDI: "float64"},
+    "population_total_long.csv": COUNTRY_COLUMNS,
+    "population_total_long-cleaned.csv": COUNTRY_COLUMNS,
+    "country-data-merged.csv": {
+        **COUNTRY_COLUMNS,
+        HDI: "float64",
+        SCHOOLING: "float64",
+        INCOME: "float64",
+    },
+    "iso_noc-merged.csv": {"continent": "category"},
+}
+
+# Bumped whenever a type above changes, so the columnar copies and everything
+# cached by dataset version are rebuilt with the new types
+SCHEMA_VERSION = 2
+
+# Datasets without a schema: text columns with at most this share of distinct
+# values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def infer_schema(data):
+    schema = {}
+    for column in data.columns:
+        if column == "Year":
+            schema[column] = "int16"
+        elif data[column].dtype == object and data[column].nunique() <= max(
+            1, CATEGORY_MAX_RATIO * len(data)
+        ):
+            schema[column] = "category"
+    return schema
+
+
+def get_schema(filename, data):
+    return SCHEMAS.get(filename) or infer_schema(data)
+
+
+def _fits_int16(column):
+    # Only whole numbers without missing values can be stored as int16
+    if not pd.api.types.is_numeric_dtype(column) or column.isna().any():
+        return False
+    values = column.to_numpy()
+    info = np.iinfo(np.int16)
+    return bool(
+        (values == np.round(values)).all()
+        and values.min() >= info.min
+        and values.max() <= info.max
+    )
+
+
+def apply_schema(data, schema):
+    # Columns missing from the data, or whose values do not fit the target
+    # type, are left as they are
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in data or data[column].dtype == dtype:
+            continue
+        if dtype == "int16" and not _fits_int16(data[column]):
+            continue
+        if dtype == "float64" and not pd.api.types.is_numeric_dtype(data[column]):
+            continue
+        converted[column] = data[column].astype(dtype)
+
+    return data.assign(**converted) if converted else data
+
+
+def default_dtypes(data):
+    # The same frame with the types read_csv infers, for comparison
+    widened = {}
+    for column in data.columns:
+        dtype = data[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            widened[column] = data[column].astype(object)
+        elif pd.api.types.is_integer_dtype(dtype) and dtype != "int64":
+            widened[column] = data[column].astype("int64")
+        elif pd.api.types.is_float_dtype(dtype) and dtype != "float64":
+            widened[column] = data[column].astype("float64")
+    return data.assign(**widened)
+
+
+def memory_report(data):
+    before = default_dtypes(data)
+    report = pd.DataFrame(
+        {
+            "Columna": data.columns,
+            "Tipo original": before.dtypes.astype(str).to_numpy(),
+            "Tipo": data.dtypes.astype(str).to_numpy(),
+            "Antes (bytes)": before.memory_usage(deep=True, index=False).to_numpy(),
+            "Después (bytes)": data.memory_usage(deep=True, index=False).to_numpy(),
+        }
+    )
+    report["Ahorro"] = 1 - report["Después (bytes)"] / report["Antes (bytes)"]
+    return report
+
+
+def main():
+    from app import CHOSEN_DATASETS, OTHER_DATASETS
+    from data_store import DATASETS_DIR, get_memory_report
+
+    for title, filename in {**CHOSEN_DATASETS, **OTHER_DATASETS}.items():
+        if not os.path.exists(os.path.join(DATASETS_DIR, filename)):
+            print(f"Omitido {title}: no existe {DATASETS_DIR}/{filename}")
+            continue
+
+        report = get_memory_report(filename)
+        before = report["Antes (bytes)"].sum()
+        after = report["Después (bytes)"].sum()
+        print(
+            f"{title}: {before / 2**20:.2f} MiB -> {after / 2**20:.2f} MiB"
+            f" ({1 - after / before:.0%} menos)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,75 +2,179 @@ import numpy as np
 import pandas as pd
 
 
+def _factorized_counts(column):
+    # Categorical columns already carry their codes, so there is nothing to factorize
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        uniques = column.cat.categories
+    else:
+        codes, uniques = pd.factorize(column, sort=True)
+
+    # Nulls are encoded as -1 and excluded from the counts
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    return counts, uniques, int(valid.sum())
+
+
 def qualitative_stats(data, cols_cualitativas):
-    # Create a DataFrame with a single row of dummy data
+    total_rows = len(data)
+    rows = []
+
+    for col in cols_cualitativas:
+        counts, uniques, total_values = _factorized_counts(data[col])
+
+        # Moda: with sorted codes, argmax picks the smallest of the tied values,
+        # just like Series.mode()[0]
+        if total_values:
+            mode_code = counts.argmax()
+            moda = uniques[mode_code]
+            moda_count = int(counts[mode_code])
+        else:
+            moda = np.nan
+            moda_count = 0
+
+        valores_unicos = int(np.count_nonzero(counts))
+        rows.append(
+            (
+                col,
+                moda,
+                moda_count,
+                moda_count / total_rows * 100 if total_rows else np.nan,
+                total_values,
+                valores_unicos,
+                valores_unicos / total_rows * 100 if total_rows else np.nan,
+                (
+                    (total_rows - total_values) / total_rows * 100
+                    if total_rows
+                    else np.nan
+                ),
+            )
+        )
+
+    # Build the output frame once, keeping the 1-based index of the previous version
     estadisticas = pd.DataFrame(
+        rows,
+        columns=[
+            "Columna",
+            "Moda",
+            "Moda (#)",
+            "Moda (%)",
+            "Total de valores",
+            "Valores unicos (#)",
+            "Valores unicos (%)",
+            "Valores nulos (%)",
+        ],
+        index=pd.RangeIndex(1, len(rows) + 1),
+    )
+
+    return estadisticas
+
+
+DESCRIPTOR_ROWS = [
+    "count",
+    "mean",
+    "std",
+    "min",
+    "25%",
+    "50%",
+    "75%",
+    "max",
+    "skewness",
+    "kurtosis",
+    "IQR",
+]
+
+
+def _zero_out_fperr(value):
+    # Same tolerance pandas uses to treat floating point noise as zero
+    return 0.0 if abs(value) < 1e-14 else value
+
+
+def _sorted_quantile(sorted_values, q):
+    # Linear interpolation over an already sorted array (pandas' default method)
+    position = q * (len(sorted_values) - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (
+        fraction
+    )
+
+
+def _profile_column(column):
+    values = column.to_numpy(dtype="float64", na_value=np.nan)
+    values = np.sort(values[~np.isnan(values)])
+    n = len(values)
+
+    profile = dict.fromkeys(DESCRIPTOR_ROWS, np.nan)
+    profile["count"] = float(n)
+    if n == 0:
+        return profile
+
+    # Central moments from a single array of deviations
+    mean = values.sum() / n
+    deviations = values - mean
+    squared = deviations * deviations
+    m2 = _zero_out_fperr(squared.sum())
+    m3 = _zero_out_fperr((squared * deviations).sum())
+    m4 = (squared * squared).sum()
+
+    q1 = _sorted_quantile(values, 0.25)
+    q3 = _sorted_quantile(values, 0.75)
+
+    profile.update(
         {
-            "Columna": ["dummy"],
-            "Moda": ["dummy"],
-            "Moda (#)": [0],
-            "Moda (%)": [0.0],
-            "Total de valores": [0],
-            "Valores unicos (#)": [0],
-            "Valores unicos (%)": [0.0],
-            "Valores nulos (%)": [0.0],
+            "mean": mean,
+            "min": values[0],
+            "25%": q1,
+            "50%": _sorted_quantile(values, 0.5),
+            "75%": q3,
+            "max": values[-1],
+            "IQR": q3 - q1,
         }
     )
 
-    for col in cols_cualitativas:
-        # Moda
-        moda = data[col].mode()[0]
-        # Total non-null values
-        total_values = data[col].count()
-        # Cantidad de veces que se repite la moda
-        moda_count = data[col].value_counts().iloc[0]
-        # Porcentaje de la moda
-        moda_porcentaje = moda_count / len(data) * 100
-        # Cantidad de valores diferentes
-        valores_unicos = data[col].nunique()
-        # Porcentaje de cada tipo de valor
-        valor_porcentajes = data[col].nunique() / len(data) * 100
-        # Porcentaje de datos faltantes
-        porcentaje_nulos = data[col].isna().mean() * 100
-
-        # Agregar una fila al DataFrame de estadísticas
-        nueva_fila = pd.DataFrame(
-            {
-                "Columna": [col],
-                "Moda": [moda],
-                "Moda (#)": [moda_count],
-                "Moda (%)": [moda_porcentaje],
-                "Total de valores": [total_values],
-                "Valores unicos (#)": [valores_unicos],
-                "Valores unicos (%)": [valor_porcentajes],
-                "Valores nulos (%)": [porcentaje_nulos],
-            }
-        )
-        estadisticas = pd.concat([estadisticas, nueva_fila], ignore_index=True)
+    if n > 1:
+        profile["std"] = np.sqrt(m2 / (n - 1))
 
-    # Drop the dummy row
-    estadisticas = estadisticas.drop(estadisticas.index[0])
+    # Bias-corrected skewness and excess kurtosis, as computed by pandas
+    if n > 2:
+        if m2 == 0:
+            profile["skewness"] = 0.0
+        else:
+            profile["skewness"] = n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2**1.5)
+    if n > 3:
+        numerator = _zero_out_fperr(n * (n + 1) * (n - 1) * m4)
+        denominator = _zero_out_fperr((n - 2) * (n - 3) * m2**2)
+        if denominator == 0:
+            profile["kurtosis"] = 0.0
+        else:
+            adjustment = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+            profile["kurtosis"] = numerator / denominator - adjustment
 
-    return estadisticas
+    return profile
 
 
-def descriptors(data):
-    # Calculate skewness for numeric columns only
-    numeric_cols = data.select_dtypes(include=[np.number])
-    skewness = pd.DataFrame(numeric_cols.skew(), columns=["skewness"]).T
+def descriptors(data, columns=None):
+    # Profile only the requested columns, if any
+    if columns is not None:
+        data = data[columns]
 
-    # Calculate kurtosis for numeric columns only
-    kurtosis = pd.DataFrame(numeric_cols.kurt(), columns=["kurtosis"]).T
+    numeric_cols = data.select_dtypes(include=[np.number])
 
-    # Calculate IQR for numeric columns only
-    iqr = numeric_cols.apply(lambda x: x.quantile(0.75) - x.quantile(0.25))
-    iqr = pd.DataFrame(iqr, columns=["IQR"]).T
+    if data.columns.empty:
+        return pd.DataFrame(index=DESCRIPTOR_ROWS)
 
-    # Get the description for all columns
-    desc = data.describe()
+    # Without numeric columns keep the generic description pandas gives
+    if numeric_cols.columns.empty:
+        desc = data.describe()
+        return desc.reindex(list(desc.index) + ["skewness", "kurtosis", "IQR"])
 
-    # Append skewness, kurtosis, IQR, and total values to the description
-    desc = pd.concat([desc, skewness, kurtosis, iqr])
+    # One sort per column gives count, moments, quartiles and IQR
+    desc = pd.DataFrame(
+        {col: _profile_column(numeric_cols[col]) for col in numeric_cols.columns},
+        index=DESCRIPTOR_ROWS,
+    )
 
     return desc
 
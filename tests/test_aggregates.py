@@ -0,0 +1,94 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import AGGREGATES, COLUMNS, MEASURES, aggregate_sql, route
+
+
+@pytest.fixture(scope="module")
+def medallas():
+    # Random fact rows in a MEDALLAS table and its roll-ups built from it
+    rng = np.random.default_rng(0)
+    n = 2_000
+    rows = pd.DataFrame(
+        {
+            "IDHECHORENDIMIENTO": np.arange(1, n + 1),
+            "NOC": rng.choice(["CHI", "ARG", "USA", "FRA"], n),
+            "Region (ISO)": rng.choice(["CHL", "ARG", "USA", "FRA"], n),
+            "Continent": rng.choice(["America", "Europe"], n),
+            "Host Country (ISO)": rng.choice(["GBR", "USA"], n),
+            "Year": rng.choice([1992, 1996, 2000], n),
+            "Season": rng.choice(["Summer", "Winter"], n),
+            "Sport": rng.choice(["Swimming", "Skiing", "Judo"], n),
+            "Event": rng.choice(["100m", "Slalom", "Open"], n),
+            "Sex": rng.choice(["M", "F"], n),
+            "Name": rng.choice([f"Atleta {i}" for i in range(300)], n),
+            "Age": rng.integers(16, 40, n),
+            "Medal": rng.choice(["Gold", "Silver", "Bronze", None], n),
+            "Rows": 1,
+            "Athletes": rng.integers(0, 2, n),
+            "Medal Events": rng.integers(0, 2, n),
+        }
+    )
+    assert list(rows.columns) == COLUMNS + MEASURES
+
+    con = duckdb.connect()
+    con.execute("CREATE TABLE MEDALLAS AS SELECT * FROM rows")
+    sizes = {}
+    for table, columns in AGGREGATES.items():
+        con.execute(aggregate_sql(table, columns))
+        sizes[table] = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    yield con, sizes
+    con.close()
+
+
+def result(con, sql):
+    data = con.execute(sql).df()
+    return data.sort_values(list(data.columns)).reset_index(drop=True)
+
+
+ROUTED = [
+    'SELECT "NOC", "Year", SUM("Medal Events") AS "Medals" FROM MEDALLAS '
+    'WHERE "Medal" IS NOT NULL GROUP BY "NOC", "Year"',
+    'SELECT "Sport", "Sex", SUM("Athletes") AS "Athletes" FROM MEDALLAS '
+    'GROUP BY "Sport", "Sex"',
+    'SELECT "Continent", SUM("Rows") AS n FROM MEDALLAS '
+    "WHERE \"Medal\" IN ('Gold', 'Silver') GROUP BY \"Continent\"",
+    'SELECT "Sex", MIN("Age") AS youngest, MAX("Age") AS oldest FROM MEDALLAS '
+    'GROUP BY "Sex"',
+    'SELECT DISTINCT "Season", "Sport" FROM MEDALLAS',
+    'SELECT "Region (ISO)", SUM("Rows") AS n FROM MEDALLAS GROUP BY "Region (ISO)"',
+    'SELECT "Age", COALESCE(SUM("Athletes") FILTER (WHERE "Medal" IS NOT NULL), 0) '
+    'AS medals FROM MEDALLAS WHERE "Age" > 0 GROUP BY "Age"',
+]
+
+# Aggregates that do not add up over the groups of a roll-up
+NOT_ROUTED = [
+    "SELECT SUM(1) AS n FROM MEDALLAS WHERE \"Medal\" = 'Gold'",
+    'SELECT "Sex", SUM("Age") AS ages FROM MEDALLAS GROUP BY "Sex"',
+    'SELECT SUM(CASE WHEN "Medal" IS NOT NULL THEN 1 ELSE 0 END) AS medals '
+    "FROM MEDALLAS",
+    'SELECT "Sex", COUNT(*) AS n FROM MEDALLAS GROUP BY "Sex"',
+    'SELECT "Sex", AVG("Age") AS age FROM MEDALLAS GROUP BY "Sex"',
+    'SELECT "Sex", MIN("Rows") AS n FROM MEDALLAS GROUP BY "Sex"',
+    'SELECT "Sex", SUM("Rows") OVER (PARTITION BY "Sex") AS n FROM MEDALLAS',
+    'SELECT "Sex", "Medal" FROM MEDALLAS',
+    'SELECT "Sex", SUM("Rows" * "Age") AS ages FROM MEDALLAS GROUP BY "Sex"',
+]
+
+
+@pytest.mark.parametrize("sql", ROUTED)
+def test_additive_queries_use_a_rollup(medallas, sql):
+    con, sizes = medallas
+    routed = route(sql, sizes)
+    assert "MEDALLAS" not in routed
+    pd.testing.assert_frame_equal(
+        result(con, routed), result(con, sql), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("sql", NOT_ROUTED)
+def test_non_additive_queries_read_the_fact(medallas, sql):
+    _, sizes = medallas
+    assert route(sql, sizes) == sql
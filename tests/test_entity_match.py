@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from entity_match import NameIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    # A few ISO names that regions and the Koreas are easily mistaken for
+    reference = pd.DataFrame(
+        [
+            ("ZAF", "South Africa"),
+            ("CAF", "Central African Republic"),
+            ("USA", "United States of America"),
+            ("KOR", "Korea, Republic of"),
+            ("PRK", "Korea, Democratic People's Republic of"),
+            ("FSM", "Micronesia, Federated States of"),
+            ("CHL", "Chile"),
+        ],
+        columns=["ISO", "name"],
+    )
+    return NameIndex(reference["name"], reference["ISO"])
+
+
+def resolved(index, names):
+    return index.resolve(names).set_index("name")
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "Africa",
+        "South America",
+        "North America",
+        "Africa Western and Central",
+        "East Asia and Pacific",
+        "Micronesia (region)",
+        "World",
+    ],
+)
+def test_aggregates_never_match(index, name):
+    row = resolved(index, [name]).loc[name]
+    assert row["ISO"] is None
+    assert row["method"] == "agregado"
+
+
+def test_countries_next_to_aggregates_still_match(index):
+    mapping = resolved(index, ["South Africa", "Micronesia (country)", "Chile"])
+    assert mapping["ISO"].to_dict() == {
+        "South Africa": "ZAF",
+        "Micronesia (country)": "FSM",
+        "Chile": "CHL",
+    }
+
+
+def test_bare_korea_is_the_republic_of_korea(index):
+    mapping = resolved(index, ["Korea", "South Korea", "North Korea"])
+    assert mapping["ISO"].to_dict() == {
+        "Korea": "KOR",
+        "South Korea": "KOR",
+        "North Korea": "PRK",
+    }
+    assert mapping.loc["Korea", "method"] == "manual"
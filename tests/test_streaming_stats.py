@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from statistics_calc import (
+    descriptors,
+    generate_domain_df,
+    generate_range_df,
+    qualitative_stats,
+)
+from streaming_stats import StreamingProfiler
+
+EXACT_ROWS = ["count", "mean", "std", "min", "max", "skewness", "kurtosis"]
+QUARTILES = [0.25, 0.5, 0.75]
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    n = 50_000
+    values = rng.lognormal(3, 1, n)
+    values[rng.choice(n, 500, replace=False)] = np.nan
+    return pd.DataFrame(
+        {
+            "Year": rng.integers(1990, 2021, n),
+            "Value": values,
+            "Code": rng.choice([f"C{i:03d}" for i in range(300)], n, p=None),
+            "Group": rng.choice(["a", "b", "c", None], n, p=[0.5, 0.3, 0.1, 0.1]),
+        }
+    )
+
+
+def chunked(data, size):
+    profiler = StreamingProfiler(seed=0)
+    for start in range(0, len(data), size):
+        profiler.update(data.iloc[start : start + size])
+    return profiler
+
+
+def test_exact_moments_match_statistics_calc(data):
+    expected = descriptors(data)
+    result = chunked(data, 7_000).descriptors()
+    pd.testing.assert_frame_equal(
+        result.loc[EXACT_ROWS], expected.loc[EXACT_ROWS], rtol=1e-9
+    )
+    pd.testing.assert_frame_equal(
+        generate_range_df(data), chunked(data, 7_000).range_df()
+    )
+
+
+def test_quartiles_within_rank_error(data):
+    profiler = chunked(data, 7_000)
+    for column in ("Year", "Value"):
+        sketch = profiler.columns[column].quantiles
+        values = np.sort(data[column].dropna().to_numpy())
+        for q, estimate in zip(QUARTILES, sketch.quantiles(QUARTILES)):
+            # Ranks the estimate spans among the exact values (ties span many)
+            low = np.searchsorted(values, estimate, side="left") / len(values)
+            high = np.searchsorted(values, estimate, side="right") / len(values)
+            assert max(0, low - q, q - high) <= sketch.rank_error()
+
+
+def test_distinct_counts_within_error_bound(data):
+    profiler = chunked(data, 7_000)
+    domain = generate_domain_df(data).set_index("Columna")["Dominio"]
+    result = profiler.domain_df().set_index("Columna")["Dominio"]
+    for column in data.columns:
+        error = profiler.columns[column].distinct.relative_error()
+        # Three standard errors
+        assert abs(result[column] - domain[column]) <= 3 * error * domain[column]
+
+
+def test_mode_and_nulls_match_statistics_calc(data):
+    columns = ["Code", "Group"]
+    expected = qualitative_stats(data, columns)
+    result = chunked(data, 7_000).qualitative_stats()
+    for column in ["Columna", "Moda", "Total de valores", "Valores nulos (%)"]:
+        assert list(result[column]) == list(expected[column])
+
+
+def test_merged_partial_states_equal_a_single_pass(data):
+    half = len(data) // 2
+    merged = chunked(data.iloc[:half], 5_000).merge(chunked(data.iloc[half:], 5_000))
+    single = chunked(data, len(data))
+    pd.testing.assert_frame_equal(
+        merged.descriptors().loc[EXACT_ROWS],
+        single.descriptors().loc[EXACT_ROWS],
+        rtol=1e-9,
+    )
+    for column in data.columns:
+        assert (
+            merged.columns[column].distinct.count()
+            == single.columns[column].distinct.count()
+        )
+
+
+def test_descriptor_store_streams_large_files(data, tmp_path, monkeypatch):
+    import descriptor_store
+
+    datasets_dir = tmp_path / "datasets"
+    datasets_dir.mkdir()
+    data.to_csv(datasets_dir / "large.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(descriptor_store, "DATASETS_DIR", "datasets")
+    monkeypatch.setattr(descriptor_store, "STREAMING_MIN_BYTES", 0)
+    monkeypatch.setattr(descriptor_store, "load_dataset", None)
+
+    tables = descriptor_store.build_descriptors("large.csv")
+    expected = descriptors(data)
+    pd.testing.assert_frame_equal(
+        tables["quantitative"].loc[EXACT_ROWS], expected.loc[EXACT_ROWS], rtol=1e-9
+    )
+    assert (tmp_path / "descriptors" / "large-quantitative.csv").exists()
@@ -0,0 +1,85 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_store import dataset_hash, load_dataset
+
+# In-memory indexes keyed by filename -> (content hash, {column: ValueIndex})
+_indexes = {}
+
+_lock = threading.Lock()
+
+
+class ValueIndex:
+    # Sorted distinct values of a column with their frequencies, plus a
+    # case-insensitive, sorted string key for prefix search. Missing values,
+    # if any, are one more bucket after the sorted ones, as in
+    # value_counts(dropna=False)
+
+    def __init__(self, column):
+        try:
+            codes, uniques = pd.factorize(column, sort=True)
+        except TypeError:
+            # Mixed types cannot be compared: index their text instead
+            text = column.astype(str).where(column.notna())
+            codes, uniques = pd.factorize(text, sort=True)
+
+        valid = codes >= 0
+        values = pd.Series(uniques)
+        counts = np.bincount(codes[valid], minlength=len(uniques))
+        self.nulls = int((~valid).sum())
+
+        # Prefix search only covers the present values
+        keys = np.asarray(values.astype(str).str.casefold(), dtype=str)
+        self._key_order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._key_order]
+
+        if self.nulls:
+            values = pd.concat([values, pd.Series([np.nan])], ignore_index=True)
+            counts = np.append(counts, self.nulls)
+        self.values = values
+        self.counts = counts
+
+    def __len__(self):
+        # Same count as Series.unique(), where a missing value is one more value
+        return len(self.values)
+
+    def _matches(self, prefix):
+        if not prefix:
+            return np.arange(len(self.values))
+        prefix = prefix.casefold()
+        start = np.searchsorted(self._sorted_keys, prefix, side="left")
+        end = np.searchsorted(self._sorted_keys, prefix + "\U0010ffff", side="left")
+        return np.sort(self._key_order[start:end])
+
+    def count(self, prefix=""):
+        return len(self._matches(prefix))
+
+    def page(self, number=0, size=100, prefix=""):
+        # Returns one page of matching values and the total number of matches
+        matches = self._matches(prefix)
+        positions = matches[number * size : (number + 1) * size]
+        page = pd.DataFrame(
+            {
+                "Valor": self.values.iloc[positions].to_numpy(),
+                "Frecuencia": self.counts[positions],
+            }
+        )
+        return page, len(matches)
+
+
+def build_value_indexes(data):
+    return {column: ValueIndex(data[column]) for column in data.columns}
+
+
+def load_value_index(filename, column):
+    # Built once per dataset version for every column; switching columns is a lookup
+    digest = dataset_hash(filename)
+
+    with _lock:
+        cached = _indexes.get(filename)
+        if cached is None or cached[0] != digest:
+            cached = (digest, build_value_indexes(load_dataset(filename)))
+            _indexes[filename] = cached
+        return cached[1][column]
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+from data_store import DATASETS_DIR, dataset_hash
+
+# Natural Earth 1:110m countries, one feature per ISO-3 code
+GEOMETRY = "world-countries.geojson"
+
+# Douglas-Peucker tolerance of the served geometry, in degrees
+TOLERANCE = 0.1
+
+# plotly.js requests {topojsonURL}{scope}_{resolution}.json for the base map
+# of every geo chart. Streamlit serves ./static at app/static/
+# (.streamlit/config.toml), so the file is read from the app, not a CDN
+STATIC_DIR = "static"
+TOPOJSON = "world_110m.json"
+TOPOJSON_URL = "app/static/"
+
+# Layers of the plotly.js topojson that this geometry has no data for
+EMPTY_LAYERS = ["coastlines", "ocean", "lakes", "rivers", "subunits"]
+
+# Digest of the asset checked by this process
+_asset = None
+
+_lock = threading.Lock()
+
+
+def simplify_ring(points, tolerance):
+    # Douglas-Peucker over a closed ring, with an explicit stack. Rings that
+    # would collapse to fewer than 4 points are kept as they are
+    points = np.asarray(points, dtype="float64")
+    if len(points) <= 4 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1 : last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(np.cross(segment, inner)) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            middle = first + 1 + farthest
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+
+    simplified = points[keep]
+    return simplified if len(simplified) >= 4 else points
+
+
+def polygons(geometry):
+    # Rings of each polygon of a Polygon or MultiPolygon
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def to_topology(features, tolerance):
+    # TopoJSON in the layout plotly.js expects: a "countries" object whose
+    # geometries have the ISO-3 code as id, and a "land" object. Arcs are
+    # not shared between neighbours; each ring is its own arc
+    arcs = []
+    countries = []
+    for feature in features:
+        shape = []
+        for polygon in polygons(feature["geometry"]):
+            rings = []
+            for ring in polygon:
+                simplified = np.round(simplify_ring(ring, tolerance), 4)
+                rings.append([len(arcs)])
+                arcs.append(simplified.tolist())
+            shape.append(rings)
+        countries.append(
+            {
+                "type": "MultiPolygon",
+                "id": feature["id"],
+                "properties": {"name": feature["properties"]["name"]},
+                "arcs": shape,
+            }
+        )
+
+    land = [{"type": "MultiPolygon", "arcs": country["arcs"]} for country in countries]
+    objects = {
+        "countries": {"type": "GeometryCollection", "geometries": countries},
+        "land": {"type": "GeometryCollection", "geometries": land},
+    }
+    for layer in EMPTY_LAYERS:
+        objects[layer] = {"type": "GeometryCollection", "geometries": []}
+    return {"type": "Topology", "objects": objects, "arcs": arcs}
+
+
+def asset_digest(tolerance):
+    key = f"{dataset_hash(GEOMETRY)}:{tolerance}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def asset_path():
+    return os.path.join(STATIC_DIR, TOPOJSON)
+
+
+def stored_digest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("digest")
+    except (OSError, ValueError):
+        return None
+
+
+def build_asset(tolerance=TOLERANCE):
+    # Simplifies the bundled geometry and writes it where Streamlit serves it
+    with open(os.path.join(DATASETS_DIR, GEOMETRY), encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    topology = to_topology(features, tolerance)
+    topology["digest"] = asset_digest(tolerance)
+
+    path = asset_path()
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(topology, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return topology
+
+
+def ensure_asset(tolerance=TOLERANCE):
+    # The served topojson, rebuilt only when the geometry or the tolerance
+    # changes. Checked once per process
+    global _asset
+    with _lock:
+        digest = asset_digest(tolerance)
+        if _asset == digest:
+            return
+        if stored_digest(asset_path()) != digest:
+            build_asset(tolerance)
+        _asset = digest
+
+
+def map_config(tolerance=TOLERANCE):
+    # plotly.js config of the geo charts: the base map comes from the app
+    ensure_asset(tolerance)
+    return {"topojsonURL": TOPOJSON_URL}
+
+
+def main():
+    tolerance = float(sys.argv[1]) if len(sys.argv) > 1 else TOLERANCE
+    topology = build_asset(tolerance)
+    points = sum(len(arc) for arc in topology["arcs"])
+    size = os.path.getsize(asset_path())
+    print(
+        f"{asset_path()}: {len(topology['objects']['countries']['geometries'])} "
+        f"países, {points} puntos, {size / 1024:,.1f} KiB (tolerancia {tolerance})"
+    )
+
+
+if __name__ == "__main__":
+    main()